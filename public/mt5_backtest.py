@@ -0,0 +1,299 @@
+"""
+MT5 Trading Bridge - Backtester
+Runs the bridge's auto trading strategies over recorded bars or ticks and
+reports PnL, drawdown and trade statistics. SL/TP are placed exactly as the
+live engine places them (stop_loss_pips / take_profit_pips from the symbol's
+pip size) and filled when the bid (longs) or ask (shorts) touches them.
+
+Requirements:
+pip install numpy
+
+Usage:
+python mt5_backtest.py run --symbol EURUSD --strategy ema_crossover --sl 20 --tp 40
+python mt5_backtest.py run --symbol EURUSD --kind ticks --start 2024-01-01 --end 2024-02-01
+python mt5_backtest.py run --symbol EURUSD --synthetic-bars 2600000
+python mt5_backtest.py sweep --symbol EURUSD --grid stop_loss_pips=10,20,50 take_profit_pips=20,40,100 max_trades=1,3
+
+Data comes from the bridge's market data recorder (MT5_BRIDGE_DATA_DIR, see
+/start_recording), or from the built-in simulated terminal with
+--synthetic-bars. Signals are generated over the whole series at once with
+each strategy's signals() method; a signal on a completed bar is filled at
+the next bar's open (bars) or at the tick that completed the bar (ticks),
+which is when the live engine would send the order. When both SL and TP are
+inside the same bar the SL is assumed to fill first.
+"""
+
+import argparse
+import heapq
+import itertools
+import multiprocessing
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from mt5_market_data import BAR_RECORD_DTYPE, MarketDataStore
+from mt5_paths import RECORD_DIR
+from mt5_sim import SIM_SYMBOLS, SimulatedTerminal
+from mt5_strategies import STRATEGIES
+
+TRADE_DTYPE = np.dtype([("entry_time", "<i8"), ("exit_time", "<i8"), ("side", "i1"), ("entry", "<f8"),
+                        ("exit", "<f8"), ("pnl", "<f8"), ("reason", "U3")])
+
+class PricePath:
+    """Bid open/high/low per step plus the spread in price units.
+
+    For bars a step is one bar; for ticks open, high and low are all the
+    tick's bid, so the same exit search serves both.
+    """
+
+    def __init__(self, time_, bid_open, bid_high, bid_low, bid_close, spread):
+        self.time = np.asarray(time_, dtype=np.int64)
+        self.bid_open = np.asarray(bid_open, dtype=np.float64)
+        self.bid_high = np.asarray(bid_high, dtype=np.float64)
+        self.bid_low = np.asarray(bid_low, dtype=np.float64)
+        self.bid_close = np.asarray(bid_close, dtype=np.float64)
+        self.spread = np.asarray(spread, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.time)
+
+def _epoch(text):
+    if text is None:
+        return None
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+def load_bars(args, point: float):
+    """Bars for the signal generator and the price path the trades run on"""
+    store = MarketDataStore(args.data_dir)
+    if args.kind == "bars":
+        if args.synthetic_bars:
+            terminal = SimulatedTerminal(order_latency=0.0, seed=args.seed)
+            terminal.initialize()
+            rates = terminal.copy_rates_from_pos(args.symbol, terminal.TIMEFRAME_M1, 1, args.synthetic_bars)
+        else:
+            rates = store.read(args.symbol, "bars", _epoch(args.start), _epoch(args.end))
+        path = PricePath(rates["time"], rates["open"], rates["high"], rates["low"], rates["close"],
+                         rates["spread"] * point)
+        return rates, path, np.arange(1, len(rates) + 1)
+
+    ticks = store.read(args.symbol, "ticks", _epoch(args.start), _epoch(args.end))
+    path = PricePath(ticks["time_msc"] // 1000, ticks["bid"], ticks["bid"], ticks["bid"], ticks["bid"],
+                     ticks["ask"] - ticks["bid"])
+    # Fold ticks into M1 bars of the mid price, as BarStrategy.on_tick does live
+    mid = (ticks["bid"] + ticks["ask"]) / 2
+    minute = path.time - path.time % 60
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(minute)) + 1)) if len(ticks) else np.empty(0, dtype=np.int64)
+    rates = np.zeros(len(starts), dtype=BAR_RECORD_DTYPE)
+    if len(starts):
+        rates["time"] = minute[starts]
+        rates["open"] = mid[starts]
+        rates["high"] = np.maximum.reduceat(mid, starts)
+        rates["low"] = np.minimum.reduceat(mid, starts)
+        rates["close"] = mid[np.concatenate((starts[1:] - 1, [len(mid) - 1]))]
+    # Bar k completes on the first tick of bar k + 1; the last bar never completes
+    return rates, path, np.concatenate((starts[1:], [len(path)]))
+
+def _find_exit(path: PricePath, start: int, is_buy: bool, stop_loss: float, take_profit: float):
+    """(step, price, reason) of the first SL/TP touch at or after `start`"""
+    window = 64
+    while start < len(path):
+        end = min(len(path), start + window)
+        low, high = path.bid_low[start:end], path.bid_high[start:end]
+        if is_buy:
+            sl_hit, tp_hit = low <= stop_loss, high >= take_profit
+        else:
+            spread = path.spread[start:end]
+            sl_hit, tp_hit = high + spread >= stop_loss, low + spread <= take_profit
+        hits = np.flatnonzero(sl_hit | tp_hit)
+        if len(hits):
+            step = start + int(hits[0])
+            opening = path.bid_open[step] + (0.0 if is_buy else path.spread[step])
+            # A bar that opens beyond the level fills at the open, not at the level
+            if sl_hit[hits[0]]:
+                return step, (min(opening, stop_loss) if is_buy else max(opening, stop_loss)), "sl"
+            return step, (max(opening, take_profit) if is_buy else min(opening, take_profit)), "tp"
+        start = end
+        window *= 4
+    step = len(path) - 1
+    return step, path.bid_close[step] + (0.0 if is_buy else path.spread[step]), "end"
+
+def simulate(path: PricePath, entries: np.ndarray, sides: np.ndarray, settings: dict, digits: int,
+             contract_size: float):
+    """Fill signals in time order, honouring max_trades open positions at once"""
+    point = 10.0 ** -digits
+    pip = point * 10 if digits in (3, 5) else point
+    volume = settings.get("lot_size", 0.01)
+    sl_distance = settings.get("stop_loss_pips", 50) * pip
+    tp_distance = settings.get("take_profit_pips", 100) * pip
+    max_trades = settings.get("max_trades", 5)
+
+    trades = []
+    open_exits = []
+    skipped = 0
+    for step, side in zip(entries.tolist(), sides.tolist()):
+        if step >= len(path):
+            break
+        while open_exits and open_exits[0] <= step:
+            heapq.heappop(open_exits)
+        if len(open_exits) >= max_trades:
+            skipped += 1
+            continue
+        is_buy = side > 0
+        price = path.bid_open[step] + (path.spread[step] if is_buy else 0.0)
+        if is_buy:
+            stop_loss, take_profit = round(price - sl_distance, digits), round(price + tp_distance, digits)
+        else:
+            stop_loss, take_profit = round(price + sl_distance, digits), round(price - tp_distance, digits)
+        exit_step, exit_price, reason = _find_exit(path, step, is_buy, stop_loss, take_profit)
+        heapq.heappush(open_exits, exit_step)
+        pnl = (exit_price - price) * side * volume * contract_size
+        trades.append((path.time[step], path.time[exit_step], side, price, exit_price, pnl, reason))
+    return np.array(trades, dtype=TRADE_DTYPE), skipped
+
+def summarize(trades: np.ndarray, skipped: int) -> dict:
+    pnl = trades["pnl"]
+    ordered = pnl[np.argsort(trades["exit_time"], kind="stable")]
+    equity = np.concatenate(([0.0], np.cumsum(ordered)))
+    gross_profit = float(pnl[pnl > 0].sum())
+    gross_loss = float(abs(pnl[pnl < 0].sum()))
+    return {
+        "trades": len(trades),
+        "skipped_signals": skipped,
+        "net_pnl": float(pnl.sum()),
+        "gross_profit": gross_profit,
+        "gross_loss": gross_loss,
+        "profit_factor": gross_profit / gross_loss if gross_loss else float("inf") if gross_profit else 0.0,
+        "max_drawdown": float((np.maximum.accumulate(equity) - equity).max()),
+        "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+        "avg_trade": float(pnl.mean()) if len(pnl) else 0.0,
+        "avg_hold_seconds": float((trades["exit_time"] - trades["entry_time"]).mean()) if len(pnl) else 0.0,
+        "sl_hits": int((trades["reason"] == "sl").sum()),
+        "tp_hits": int((trades["reason"] == "tp").sum()),
+    }
+
+def backtest(settings: dict, rates: np.ndarray, path: PricePath, entry_steps: np.ndarray, digits: int,
+             contract_size: float) -> dict:
+    strategy = STRATEGIES[settings["trading_strategy"]](settings)
+    signals = strategy.signals(rates)
+    bars = np.flatnonzero(signals)
+    trades, skipped = simulate(path, entry_steps[bars], signals[bars], settings, digits, contract_size)
+    return summarize(trades, skipped)
+
+def base_settings(args) -> dict:
+    # The fields of the bridge's AutoTradingRequest, with its defaults
+    return {"symbol": args.symbol, "lot_size": args.lot_size, "stop_loss_pips": args.sl, "take_profit_pips": args.tp,
+            "max_trades": args.max_trades, "trading_strategy": args.strategy, "instance_id": "default",
+            "magic_number": 99999}
+
+def symbol_digits(args) -> int:
+    if args.digits is not None:
+        return args.digits
+    return SIM_SYMBOLS.get(args.symbol, (0, 5))[1]
+
+def contract_size(args) -> float:
+    if args.contract_size is not None:
+        return args.contract_size
+    return 100.0 if args.symbol.startswith("XAU") else 100000.0
+
+def print_summary(stats: dict):
+    for key, value in stats.items():
+        print(f"{key:<18} {value:,.4f}" if isinstance(value, float) else f"{key:<18} {value:,}")
+
+def run(args):
+    digits = symbol_digits(args)
+    started = time.perf_counter()
+    rates, path, entry_steps = load_bars(args, 10.0 ** -digits)
+    loaded = time.perf_counter()
+    stats = backtest(base_settings(args), rates, path, entry_steps, digits, contract_size(args))
+    finished = time.perf_counter()
+    print(f"{args.symbol} {args.strategy} on {len(rates):,} bars / {len(path):,} {args.kind} steps "
+          f"(load {loaded - started:.2f}s, backtest {finished - loaded:.2f}s); PnL in quote currency")
+    print_summary(stats)
+
+# Parameter sweep: each worker process loads the data once, then runs its share of the grid
+
+_worker_data = None
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _run_combo(settings: dict) -> tuple:
+    rates, path, entry_steps, digits, size = _worker_data
+    return settings, backtest(settings, rates, path, entry_steps, digits, size)
+
+def parse_grid(items) -> dict:
+    grid = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        grid[key] = [float(v) if "." in v else int(v) if v.lstrip("-").isdigit() else v for v in values.split(",")]
+    return grid
+
+def sweep(args):
+    digits = symbol_digits(args)
+    rates, path, entry_steps = load_bars(args, 10.0 ** -digits)
+    grid = parse_grid(args.grid)
+    base = base_settings(args)
+    combos = []
+    for values in itertools.product(*grid.values()):
+        overrides = dict(zip(grid, values))
+        # Known fields must convert to their type in a live /start_auto_trading request; the rest go to the strategy
+        known = {k: type(base[k])(v) for k, v in overrides.items() if k in base}
+        settings = {**base, **known}
+        settings.update(overrides)
+        combos.append(settings)
+
+    processes = args.processes or os.cpu_count() or 1
+    started = time.perf_counter()
+    data = (rates, path, entry_steps, digits, contract_size(args))
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(data,)) as pool:
+        results = list(pool.imap_unordered(_run_combo, combos))
+    elapsed = time.perf_counter() - started
+
+    results.sort(key=lambda r: r[1][args.sort], reverse=args.sort != "max_drawdown")
+    print(f"{len(combos)} combinations over {len(rates):,} bars on {processes} processes in {elapsed:.2f}s")
+    columns = ("net_pnl", "max_drawdown", "profit_factor", "win_rate", "trades")
+    print(" ".join(f"{key:>16}" for key in grid) + " " + " ".join(f"{c:>14}" for c in columns))
+    for settings, stats in results[:args.top]:
+        print(" ".join(f"{str(settings[key]):>16}" for key in grid) + " " +
+              " ".join(f"{stats[c]:>14,.4f}" if isinstance(stats[c], float) else f"{stats[c]:>14,}" for c in columns))
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest MT5 Trading Bridge strategies")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--symbol", default="EURUSD")
+    common.add_argument("--strategy", default="ema_crossover", choices=sorted(STRATEGIES))
+    common.add_argument("--lot-size", type=float, default=0.01)
+    common.add_argument("--sl", type=int, default=50, help="stop_loss_pips")
+    common.add_argument("--tp", type=int, default=100, help="take_profit_pips")
+    common.add_argument("--max-trades", type=int, default=5)
+    common.add_argument("--kind", choices=("bars", "ticks"), default="bars", help="price path the trades run on")
+    common.add_argument("--data-dir", default=RECORD_DIR, help="market data recorder directory")
+    common.add_argument("--start", help="UTC date YYYY-MM-DD, inclusive")
+    common.add_argument("--end", help="UTC date YYYY-MM-DD, exclusive")
+    common.add_argument("--synthetic-bars", type=int, default=0, help="use N simulated M1 bars instead of recorded data")
+    common.add_argument("--seed", type=int, default=1)
+    common.add_argument("--digits", type=int, default=None, help="price digits (default: known symbols, else 5)")
+    common.add_argument("--contract-size", type=float, default=None)
+
+    run_parser = sub.add_parser("run", parents=[common], help="backtest one set of settings")
+    run_parser.set_defaults(func=run)
+
+    sweep_parser = sub.add_parser("sweep", parents=[common], help="backtest a grid of settings on all cores")
+    sweep_parser.add_argument("--grid", nargs="+", required=True, help="key=v1,v2,... (auto trading or strategy settings)")
+    sweep_parser.add_argument("--processes", type=int, default=None)
+    sweep_parser.add_argument("--sort", default="net_pnl", choices=("net_pnl", "max_drawdown", "profit_factor", "win_rate"))
+    sweep_parser.add_argument("--top", type=int, default=20)
+    sweep_parser.set_defaults(func=sweep)
+
+    args = parser.parse_args()
+    if args.kind == "ticks" and args.synthetic_bars:
+        parser.error("--synthetic-bars only provides bars")
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
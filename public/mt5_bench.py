@@ -0,0 +1,525 @@
+"""
+MT5 Trading Bridge - Benchmarks
+Runs the bridge in-process on its built-in simulated terminal with artificial
+latency so its behaviour under load can be measured without a Windows MT5
+terminal. For HTTP load against a running bridge see mt5_loadtest.py.
+
+Requirements:
+pip install numpy fastapi uvicorn
+
+Usage:
+python mt5_bench.py status [--orders 8] [--latency 0.25] [--samples 200]
+python mt5_bench.py pollers [--clients 1 4 16 64] [--duration 5]
+python mt5_bench.py indicators [--symbols 200] [--ticks 2000]
+python mt5_bench.py sync [--duration 60] [--window 5] [--offline 10]
+python mt5_bench.py encoding [--positions 1000 10000] [--repeat 20]
+python mt5_bench.py lanes [--readers 128] [--call-latency 0.002] [--samples 100]
+python mt5_bench.py tickfeed [--readers 1 4 16] [--rate 20000] [--duration 3]
+python mt5_bench.py slicer [--parents 500] [--slices 5] [--duration 10]
+
+Scenarios:
+status  - /status latency percentiles, idle and while orders are in flight
+pollers - terminal calls per second as the number of dashboard pollers grows
+indicators - incremental indicator update cost across many symbols, checked against the batch path
+sync    - Supabase writes per minute from the bridge's sync worker against a local stub REST
+          server, compared with the dashboard re-posting the snapshot every 3 seconds
+encoding - /positions encode time and size: FastAPI's default encoder against orjson rows and
+           the columnar JSON / MessagePack formats
+lanes   - close latency on the MT5 executor under a flood of UI reads, in the close lane and,
+          as a FIFO baseline, queued behind the reads; plus read rejections and coalescing
+tickfeed - shared-memory tick feed: publish cost, and delivery latency and losses as reader
+           processes are added
+slicer  - many TWAP parent orders at once on the sliced-execution timer wheel: slice timing,
+          completion and the threads it takes
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+def load_bridge(call_latency: float = 0.0, order_latency: float = 0.25):
+    """Import mt5_bridge on the built-in simulated terminal.
+
+    Every terminal call takes `call_latency` seconds (order_send about
+    `order_latency`), and the simulator counts calls per function in
+    `bridge.mt5.backend.calls`.
+    """
+    os.environ["MT5_BRIDGE_BACKEND"] = "sim"
+    os.environ["MT5_SIM_CALL_LATENCY"] = str(call_latency)
+    os.environ["MT5_SIM_ORDER_LATENCY"] = str(order_latency)
+    os.environ.setdefault("MT5_SIM_SEED", "1")
+    # Every simulated client shares 127.0.0.1, so per-client read limits would only measure themselves
+    os.environ.setdefault("MT5_BRIDGE_CLIENT_RATE_READ", "0")
+    import mt5_bridge
+    return mt5_bridge
+
+def start_server(bridge):
+    import uvicorn
+    config = uvicorn.Config(bridge.app, host=HOST, port=PORT, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+def request(method: str, path: str, body: dict = None) -> float:
+    """Send one request and return its latency in milliseconds"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(f"http://{HOST}:{PORT}{path}", data=data, method=method,
+                                 headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": ordered[-1]}
+
+def print_row(label: str, stats: dict):
+    print(f"{label:<28} " + "  ".join(f"{k}={v:8.2f}ms" for k, v in stats.items()))
+
+def bench_status(args):
+    bridge = load_bridge(call_latency=args.latency / 10, order_latency=args.latency)
+    calls = bridge.mt5.backend.calls
+    server = start_server(bridge)
+    request("POST", "/connect", {"server": "Stub", "account_number": 1, "password": "x"})
+
+    idle = [request("GET", "/status") for _ in range(args.samples)]
+
+    stop = threading.Event()
+    order = {"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.01}
+
+    def order_flood():
+        while not stop.is_set():
+            request("POST", "/place_order", order)
+
+    workers = [threading.Thread(target=order_flood, daemon=True) for _ in range(args.orders)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.latency)
+    loaded = [request("GET", "/status") for _ in range(args.samples)]
+    stop.set()
+    for worker in workers:
+        worker.join()
+    server.should_exit = True
+
+    print(f"/status with order_send latency {args.latency * 1000:.0f}ms, {args.orders} concurrent order clients")
+    print_row("idle", percentiles(idle))
+    print_row("orders in flight", percentiles(loaded))
+    print(f"order_send calls: {calls.get('order_send', 0)}")
+
+def bench_pollers(args):
+    os.environ["MT5_BRIDGE_SNAPSHOT_INTERVAL"] = str(args.interval)
+    bridge = load_bridge(call_latency=0.005)
+    terminal = bridge.mt5.backend.calls
+    server = start_server(bridge)
+    request("POST", "/connect", {"server": "Stub", "account_number": 1, "password": "x"})
+    terminal_calls = lambda: terminal.get("account_info", 0) + terminal.get("positions_get", 0)
+
+    print(f"Dashboard pollers hitting /account_info + /positions every {args.poll_interval}s "
+          f"(snapshot interval {args.interval}s)")
+    for clients in args.clients:
+        stop = threading.Event()
+        polls = [0] * clients
+
+        def poller(index):
+            while not stop.is_set():
+                request("POST", "/account_info")
+                request("POST", "/positions")
+                polls[index] += 2
+                stop.wait(args.poll_interval)
+
+        threads = [threading.Thread(target=poller, args=(i,), daemon=True) for i in range(clients)]
+        before = terminal_calls()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        calls = terminal_calls() - before
+        print(f"{clients:>4} pollers: {sum(polls) / args.duration:8.1f} req/s  "
+              f"{calls / args.duration:6.1f} terminal calls/s")
+    server.should_exit = True
+
+def bench_indicators(args):
+    from mt5_indicators import ATR, EMA, MACD, RSI, Bollinger, atr_batch, bollinger_batch, ema_batch, macd_batch, rsi_batch
+    rng = np.random.default_rng(7)
+    prices = 1.1 + np.cumsum(rng.normal(0, 1e-4, (args.symbols, args.ticks)), axis=1)
+    high = prices + np.abs(rng.normal(0, 5e-5, prices.shape))
+    low = prices - np.abs(rng.normal(0, 5e-5, prices.shape))
+
+    indicators = {
+        "EMA(20)": (lambda: EMA(20), lambda ind, i, t: ind.update(prices[i][t]),
+                    lambda i: ema_batch(prices_batch[i], 20)),
+        "RSI(14)": (lambda: RSI(14), lambda ind, i, t: ind.update(prices[i][t]),
+                    lambda i: rsi_batch(prices_batch[i], 14)),
+        "MACD(12,26,9)": (lambda: MACD(), lambda ind, i, t: ind.update(prices[i][t]),
+                          lambda i: macd_batch(prices_batch[i])[2]),
+        "ATR(14)": (lambda: ATR(14), lambda ind, i, t: ind.update(high[i][t], low[i][t], prices[i][t]),
+                    lambda i: atr_batch(high_batch[i], low_batch[i], prices_batch[i], 14)),
+        "Bollinger(20,2)": (lambda: Bollinger(), lambda ind, i, t: ind.update(prices[i][t]),
+                            lambda i: bollinger_batch(prices_batch[i])[1]),
+    }
+    # Live ticks arrive as Python floats, so time the update path on plain lists
+    prices_batch, high_batch, low_batch = prices, high, low
+    prices, high, low = prices.tolist(), high.tolist(), low.tolist()
+    pick = {"MACD(12,26,9)": lambda v: v[2], "Bollinger(20,2)": lambda v: v[1]}
+
+    print(f"{args.symbols} symbols x {args.ticks} ticks, updates interleaved across symbols")
+    for name, (make, update, batch) in indicators.items():
+        state = [make() for _ in range(args.symbols)]
+        last = [None] * args.symbols
+        start = time.perf_counter()
+        for t in range(args.ticks):
+            for i in range(args.symbols):
+                last[i] = update(state[i], i, t)
+        elapsed = time.perf_counter() - start
+        updates = args.symbols * args.ticks
+
+        start = time.perf_counter()
+        expected = [batch(i)[-1] for i in range(args.symbols)]
+        batch_elapsed = time.perf_counter() - start
+        final = [pick.get(name, lambda v: v)(value) for value in last]
+        error = max(abs(a - b) for a, b in zip(final, expected) if a is not None)
+        print(f"{name:<16} {elapsed / updates * 1e9:8.0f} ns/update  "
+              f"{args.symbols / elapsed * args.ticks:12.0f} updates/s  "
+              f"batch {batch_elapsed * 1000:7.1f}ms  max |incremental - batch| = {error:.2e}")
+
+class StubSupabase(BaseHTTPRequestHandler):
+    """Accepts PostgREST-style POSTs, counting rows per table; 503s while `offline`"""
+
+    requests = {}
+    rows = {}
+    offline = False
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"[]")
+        if StubSupabase.offline:
+            self.send_response(503)
+            self.end_headers()
+            return
+        table = self.path.split("?")[0].rsplit("/", 1)[-1]
+        StubSupabase.requests[table] = StubSupabase.requests.get(table, 0) + 1
+        StubSupabase.rows[table] = StubSupabase.rows.get(table, 0) + len(body)
+        reply = json.dumps([dict(row, id="stub-account") for row in body]).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+def bench_sync(args):
+    stub = ThreadingHTTPServer((HOST, 0), StubSupabase)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    os.environ["MT5_BRIDGE_SUPABASE_URL"] = f"http://{HOST}:{stub.server_address[1]}"
+    os.environ["MT5_BRIDGE_SUPABASE_KEY"] = "stub-key"
+    os.environ["MT5_BRIDGE_SYNC_USER_ID"] = "00000000-0000-0000-0000-000000000000"
+    os.environ["MT5_BRIDGE_SYNC_WINDOW"] = str(args.window)
+    os.environ["MT5_BRIDGE_JOURNAL"] = os.path.join(tempfile.mkdtemp(), "journal.db")
+    bridge = load_bridge()
+    server = start_server(bridge)
+    request("POST", "/connect", {"server": "Stub", "account_number": 1, "password": "x"})
+
+    if args.offline:
+        time.sleep(args.window * 2)
+        StubSupabase.offline = True
+        time.sleep(args.offline)
+        StubSupabase.offline = False
+    time.sleep(max(0.0, args.duration - args.offline - (args.window * 2 if args.offline else 0)))
+    server.should_exit = True
+    stub.shutdown()
+
+    minutes = args.duration / 60
+    writes = sum(StubSupabase.requests.values())
+    # The dashboard posts an account update plus a sync log RPC every 3 seconds
+    baseline = 2 * 60 / 3
+    print(f"{args.duration:.0f}s, sync window {args.window}s, stub offline for {args.offline:.0f}s, no open positions")
+    for table in sorted(StubSupabase.requests):
+        print(f"{table:<24} {StubSupabase.requests[table] / minutes:6.1f} requests/min "
+              f"{StubSupabase.rows[table] / minutes:6.1f} rows/min")
+    print(f"{'bridge sync total':<24} {writes / minutes:6.1f} requests/min")
+    print(f"{'dashboard polling':<24} {baseline:6.1f} requests/min")
+    print(f"sync status: {bridge.supabase_sync.status()}")
+
+def bench_encoding(args):
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    bridge = load_bridge(order_latency=0.0)
+    terminal = bridge.mt5.backend
+    terminal.initialize()
+    symbols = ("EURUSD", "GBPUSD", "USDJPY")
+    formats = [("FastAPI default", None), ("rows", bridge.JSON_MEDIA_TYPE),
+               ("columnar json", bridge.COLUMNAR_MEDIA_TYPE)]
+    if bridge.msgpack is not None:
+        formats.append(("columnar msgpack", bridge.MSGPACK_MEDIA_TYPES[0]))
+    print(f"json backend: {'orjson' if bridge.orjson is not None else 'stdlib json'}, "
+          f"msgpack {'available' if bridge.msgpack is not None else 'not installed'}")
+
+    opened = 0
+    for count in sorted(args.positions):
+        while opened < count:
+            symbol = symbols[opened % len(symbols)]
+            tick = terminal.symbol_info_tick(symbol)
+            terminal.order_send({"action": terminal.TRADE_ACTION_DEAL, "symbol": symbol, "volume": 0.01,
+                                 "type": terminal.ORDER_TYPE_BUY, "price": tick.ask, "magic": 12345,
+                                 "comment": "bench"})
+            opened += 1
+        bridge.snapshot_cache._refresh()
+        view = bridge.snapshot_cache.current()
+        result = {"success": True, "positions": view["positions"], "snapshot": view["snapshot"]}
+
+        print(f"{count} positions")
+        baseline = None
+        for label, media_type in formats:
+            if media_type is None:
+                # What a plain dict return costs: jsonable_encoder, then the stdlib JSONResponse
+                encode = lambda: JSONResponse(jsonable_encoder(result)).body
+            else:
+                # Columnar reuses the per-version transpose, as repeated polls of one snapshot do
+                encode = lambda: bridge.table_response(
+                    result, "positions", bridge.POSITION_FIELDS, media_type,
+                    columns=lambda: bridge.snapshot_cache.position_columns(result)).body
+            body = encode()
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                encode()
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            baseline = baseline or (elapsed, len(body))
+            print(f"  {label:<18} {elapsed:8.2f}ms {len(body) / 1024:9.1f}KB  "
+                  f"{baseline[0] / elapsed:5.1f}x faster  {len(body) / baseline[1]:4.0%} of default size")
+
+def bench_lanes(args):
+    bridge = load_bridge(call_latency=args.call_latency, order_latency=args.call_latency)
+    bridge.mt5.backend.initialize()
+    executor = bridge.mt5_executor
+    calls = bridge.mt5.backend.calls
+    stop = threading.Event()
+    served, rejected = [0] * args.readers, [0] * args.readers
+
+    def reader(i):
+        while not stop.is_set():
+            try:
+                executor.call(bridge.mt5.account_info, lane="read")
+                served[i] += 1
+            except bridge.ExecutorOverloaded:
+                rejected[i] += 1
+                time.sleep(args.call_latency)
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    print(f"{args.readers} clients flooding reads, {args.call_latency * 1000:.1f}ms per terminal call, "
+          f"read lane limit {executor.limits.get('read') or 'none'}")
+    def closes(lane: str) -> list:
+        samples = []
+        for _ in range(args.samples):
+            start = time.perf_counter()
+            executor.call(bridge.mt5.positions_get, lane=lane)
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+        return samples
+
+    started = time.perf_counter()
+    print_row("close in the close lane", percentiles(closes("close")))
+    elapsed = time.perf_counter() - started
+    print(f"reads served {sum(served) / elapsed:8.1f}/s, rejected fast {sum(rejected) / elapsed:8.1f}/s")
+
+    # Baseline: the old single unbounded FIFO queue, i.e. the close queued behind every read
+    limit, executor.limits["read"] = executor.limits.get("read", 0), 0
+    print_row("close behind reads (FIFO)", percentiles(closes("read")))
+    executor.limits["read"] = limit
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    before = calls.get("account_info", 0)
+    futures = []
+    for _ in range(args.readers):
+        futures.append(executor.submit(bridge.mt5.account_info, lane="read", coalesce=True))
+    for future in futures:
+        future.result()
+    print(f"{args.readers} identical coalescing reads -> {calls.get('account_info', 0) - before} terminal calls")
+
+def _tickfeed_reader(name: str, symbols: list, ready, done, results):
+    from mt5_ticks import TickRingReader
+    with TickRingReader(name, timeout=5) as feed:
+        cursors = {symbol: feed.head(symbol) for symbol in symbols}
+        received, lost, ages = 0, 0, []
+        ready.wait()
+        while True:
+            finished = done.is_set()
+            idle = True
+            for symbol in symbols:
+                ticks, cursors[symbol], missed = feed.read(symbol, cursors[symbol])
+                if len(ticks):
+                    idle = False
+                    received += len(ticks)
+                    ages.append((time.time_ns() - int(ticks["published_ns"][-1])) / 1000)
+                lost += missed
+            if finished:
+                break
+            if idle:
+                time.sleep(0.0005)
+    results.put((received, lost, ages))
+
+def bench_tickfeed(args):
+    from mt5_ticks import TickRingWriter
+    name = f"mt5_bench_ticks_{os.getpid()}"
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    writer = TickRingWriter(name, max_symbols=len(symbols), slots=args.slots)
+    for symbol in symbols:
+        writer.add_symbol(symbol)
+    try:
+        started = time.perf_counter()
+        for n in range(100000):
+            writer.publish(symbols[n % len(symbols)], n, 1.1, 1.1001)
+        cost = (time.perf_counter() - started) / 100000 * 1e6
+        print(f"publish: {cost:.2f}us per tick; {args.rate} ticks/s over {len(symbols)} symbols, "
+              f"{args.slots} slots per symbol")
+
+        context = multiprocessing.get_context("spawn")
+        for readers in args.readers:
+            results, ready, done = context.Queue(), context.Barrier(readers + 1), context.Event()
+            processes = [context.Process(target=_tickfeed_reader, args=(name, symbols, ready, done, results))
+                         for _ in range(readers)]
+            for process in processes:
+                process.start()
+            ready.wait()
+            published = 0
+            interval = 1.0 / args.rate
+            started = time.perf_counter()
+            while time.perf_counter() - started < args.duration:
+                target = int((time.perf_counter() - started) / interval)
+                while published < target:
+                    writer.publish(symbols[published % len(symbols)], published, 1.1, 1.1001)
+                    published += 1
+                time.sleep(0.0002)
+            done.set()
+            collected = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            ages = sorted(age for _, _, samples in collected for age in samples)
+            received = sum(r for r, _, _ in collected) / readers
+            lost = sum(l for _, l, _ in collected) / readers
+            pick = lambda q: ages[min(len(ages) - 1, int(q * len(ages)))] if ages else 0.0
+            print(f"{readers:>4} readers: {received / published:6.1%} of {published} ticks each, lost {lost:.0f}, "
+                  f"age at read p50={pick(0.5):7.1f}us p99={pick(0.99):7.1f}us")
+    finally:
+        writer.close()
+
+def bench_slicer(args):
+    from mt5_sim import SIM_SYMBOLS
+    bridge = load_bridge(order_latency=args.order_latency)
+    bridge.mt5.backend.initialize()
+    bridge.mt5_connected = True
+    bridge.logger.setLevel(logging.WARNING)
+    scheduler = bridge.slice_scheduler
+    symbols = list(SIM_SYMBOLS)
+
+    async def run():
+        threads = threading.active_count()
+        started = time.perf_counter()
+        for i in range(args.parents):
+            result = await scheduler.start(bridge.SlicedOrderRequest(
+                symbol=symbols[i % len(symbols)], trade_type="BUY" if i % 2 else "SELL", volume=0.01 * args.slices,
+                algo="twap", duration_seconds=args.duration, slices=args.slices, magic_number=i))
+            assert result["success"], result
+        print(f"{args.parents} TWAP parents x {args.slices} slices over {args.duration:.0f}s, "
+              f"order_send {args.order_latency * 1000:.1f}ms, timer tick {scheduler.wheel.tick * 1000:.0f}ms")
+        while scheduler.working():
+            await asyncio.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        orders = list(scheduler.orders.values())
+        children = sum(len(order.children) for order in orders)
+        completed = sum(order.status == "completed" for order in orders)
+        finish = sorted(order.finished_at - order.started_at for order in orders)
+        lateness = scheduler.wheel.lateness.summary()
+        print(f"completed {completed}/{len(orders)} parents, {children} child orders in {elapsed:.1f}s "
+              f"({children / elapsed:.0f}/s); threads before/after {threads}/{threading.active_count()}")
+        print(f"parent duration p50={finish[len(finish) // 2]:.2f}s max={finish[-1]:.2f}s; "
+              f"timer lateness p50={lateness['p50']:.1f}ms p99={lateness['p99']:.1f}ms")
+
+    asyncio.run(run())
+    bridge.mt5_executor.call(bridge._close_positions)
+
+def main():
+    parser = argparse.ArgumentParser(description="MT5 Trading Bridge benchmarks")
+    sub = parser.add_subparsers(dest="scenario", required=True)
+
+    status = sub.add_parser("status", help="/status latency while orders are in flight")
+    status.add_argument("--orders", type=int, default=8, help="concurrent order clients")
+    status.add_argument("--latency", type=float, default=0.25, help="simulated order_send latency in seconds")
+    status.add_argument("--samples", type=int, default=200)
+    status.set_defaults(func=bench_status)
+
+    pollers = sub.add_parser("pollers", help="terminal call count as pollers are added")
+    pollers.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    pollers.add_argument("--duration", type=float, default=5.0, help="seconds per client count")
+    pollers.add_argument("--poll-interval", type=float, default=0.5, help="seconds between polls per client")
+    pollers.add_argument("--interval", type=float, default=1.0, help="bridge snapshot refresh interval")
+    pollers.set_defaults(func=bench_pollers)
+
+    indicators = sub.add_parser("indicators", help="incremental indicator cost across many symbols")
+    indicators.add_argument("--symbols", type=int, default=200)
+    indicators.add_argument("--ticks", type=int, default=2000)
+    indicators.set_defaults(func=bench_indicators)
+
+    sync = sub.add_parser("sync", help="Supabase writes from the sync worker against a stub REST server")
+    sync.add_argument("--duration", type=float, default=60.0)
+    sync.add_argument("--window", type=float, default=5.0, help="bridge sync window in seconds")
+    sync.add_argument("--offline", type=float, default=0.0, help="seconds the stub rejects writes")
+    sync.set_defaults(func=bench_sync)
+
+    encoding = sub.add_parser("encoding", help="/positions encode time and payload size per format")
+    encoding.add_argument("--positions", type=int, nargs="+", default=[1000, 10000])
+    encoding.add_argument("--repeat", type=int, default=20, help="encodes timed per format")
+    encoding.set_defaults(func=bench_encoding)
+
+    lanes = sub.add_parser("lanes", help="close latency under a read flood with priority lanes")
+    lanes.add_argument("--readers", type=int, default=128, help="threads flooding the read lane")
+    lanes.add_argument("--call-latency", type=float, default=0.002, help="simulated seconds per terminal call")
+    lanes.add_argument("--samples", type=int, default=100)
+    lanes.set_defaults(func=bench_lanes)
+
+    tickfeed = sub.add_parser("tickfeed", help="shared-memory tick feed publish cost and reader fan-out")
+    tickfeed.add_argument("--readers", type=int, nargs="+", default=[1, 4, 16], help="reader process counts")
+    tickfeed.add_argument("--rate", type=int, default=20000, help="ticks published per second")
+    tickfeed.add_argument("--symbols", type=int, default=20)
+    tickfeed.add_argument("--slots", type=int, default=4096, help="ring slots per symbol")
+    tickfeed.add_argument("--duration", type=float, default=3.0, help="seconds per reader count")
+    tickfeed.set_defaults(func=bench_tickfeed)
+
+    slicer = sub.add_parser("slicer", help="many sliced parent orders on one timer wheel")
+    slicer.add_argument("--parents", type=int, default=500)
+    slicer.add_argument("--slices", type=int, default=5, help="TWAP slices per parent")
+    slicer.add_argument("--duration", type=float, default=10.0, help="TWAP duration in seconds")
+    slicer.add_argument("--order-latency", type=float, default=0.0002, help="simulated order_send seconds")
+    slicer.set_defaults(func=bench_slicer)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -4,32 +4,172 @@ MT5 Trading Bridge - FastAPI Server
 This script connects to your local MT5 terminal and provides an API for trading operations.
 
 Requirements:
-pip install MetaTrader5 fastapi uvicorn requests websockets
+pip install MetaTrader5 numpy fastapi uvicorn requests websockets httpx  (httpx[http2] for HTTP/2 Supabase sync)
+Optional: pip install orjson msgpack  (faster JSON responses, MessagePack columnar responses; stdlib json otherwise)
+mt5_sim.py, mt5_metrics.py, mt5_indicators.py, mt5_strategies.py, mt5_journal.py, mt5_market_data.py,
+mt5_paths.py and mt5_ticks.py must sit next to this script.
 
 Usage:
 python mt5_bridge.py
+python mt5_bridge.py --backend sim    # built-in simulated terminal, no MT5 needed
 
 The server will run on http://localhost:8000
+
+The trade journal, sync outboxes and recorded market data are written to a
+per-user data directory (%LOCALAPPDATA%\\MT5Bridge on Windows,
+~/.local/share/mt5bridge elsewhere), or to MT5_BRIDGE_HOME when it is set; see
+mt5_paths.py.
 """
 
-import MetaTrader5 as mt5
-from fastapi import FastAPI, HTTPException
+import numpy as np
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi import Header
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel
 import uvicorn
+import argparse
+import asyncio
+import math
+import multiprocessing
 import threading
+import queue
 import time
 import random
-from typing import Optional, Dict, Any
+import uuid
+import os
+import json
+import sqlite3
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Optional, Dict, Any, List
 import logging
 
+from mt5_journal import (DONE_RETCODE, EXECUTION_DTYPE, JOURNAL_ADDED_COLUMNS, JOURNAL_COLUMNS, JOURNAL_SCHEMA,
+                         REQUOTE_RETCODES, SLIPPAGE_BUCKETS, JournalReader, summarize_executions)
+from mt5_market_data import BAR_RECORD_DTYPE, TICK_RECORD_DTYPE, MarketDataStore
+from mt5_metrics import MetricsRegistry
+from mt5_paths import JOURNAL_PATH, RECORD_DIR, account_journal_path
+from mt5_sim import SimulatedTerminal
+from mt5_strategies import STRATEGIES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MT5 Trading Bridge", version="1.0.0")
+# Response encoding
+#
+# Responses are encoded with orjson when it is installed (stdlib json
+# otherwise). /positions and /history also speak a columnar format, one
+# array per field instead of one object per row, chosen by the Accept header:
+#   application/json                         rows (default)
+#   application/vnd.mt5bridge.columnar+json  columns as JSON
+#   application/msgpack                      columns as MessagePack (pip install msgpack)
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.mt5bridge.columnar+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def dumps_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, separators=(",", ":"), default=str).encode()
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """Pick a media type for a table response; None when nothing acceptable is available"""
+    if not accept:
+        return JSON_MEDIA_TYPE
+    ranked = []
+    for order, part in enumerate(accept.split(",")):
+        media, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, order, media.strip().lower()))
+    for negative_q, _, media in sorted(ranked):
+        if negative_q == 0:
+            break
+        if media == COLUMNAR_MEDIA_TYPE or (media in MSGPACK_MEDIA_TYPES and msgpack is not None):
+            return media
+        if media in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return None
 
-# Enable CORS
+def to_columns(rows: List[Dict[str, Any]], fields) -> Dict[str, list]:
+    return {field: [row[field] for row in rows] for field in fields}
+
+def table_response(result: Dict[str, Any], key: str, fields, accept: Optional[str], columns=None) -> Response:
+    """Encode a {"success": ..., key: [rows]} result in the negotiated format.
+
+    `columns`, if given, is called for the columnar form instead of
+    transposing the rows, so a cached transpose can be reused.
+    """
+    media_type = negotiate(accept)
+    if media_type is None:
+        return FastJSONResponse({"success": False, "error": f"Not acceptable: {accept}. Supported: "
+                                 f"{JSON_MEDIA_TYPE}, {COLUMNAR_MEDIA_TYPE}"
+                                 + (f", {MSGPACK_MEDIA_TYPES[0]}" if msgpack is not None else "")},
+                                status_code=406)
+    if media_type == JSON_MEDIA_TYPE or not result.get("success"):
+        return Response(dumps_json(result), media_type=JSON_MEDIA_TYPE)
+    payload = dict(result)
+    payload["format"] = "columnar"
+    payload["count"] = len(result[key])
+    payload[key] = columns() if columns is not None else to_columns(result[key], fields)
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return Response(msgpack.packb(payload, use_bin_type=True), media_type=media_type)
+    return Response(dumps_json(payload), media_type=media_type)
+
+app = FastAPI(title="MT5 Trading Bridge", version="1.0.0", default_response_class=FastJSONResponse)
+
+@app.middleware("http")
+async def admission_control(request, call_next):
+    # Registered before record_request_metrics, so rejections are still counted there. Preflights
+    # never reach the terminal and must not spend a token
+    lane = ROUTE_LANES.get(request.url.path)
+    if lane is not None and request.method != "OPTIONS":
+        client = request.client.host if request.client else "unknown"
+        retry_after = client_rate_limiter.acquire(client, lane)
+        if retry_after:
+            CLIENT_RATE_LIMITED.inc((lane,))
+            return FastJSONResponse({"success": False, "error": f"Too many {lane} requests from {client}"},
+                                    status_code=429, headers={"Retry-After": str(max(1, round(retry_after)))})
+    return await call_next(request)
+
+@app.middleware("http")
+async def record_request_metrics(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        labels = (request.method, route.path if route is not None else "unmatched")
+        HTTP_LATENCY.observe(time.perf_counter() - start, labels)
+        HTTP_REQUESTS.inc(labels + (status,))
+
+# Enable CORS. Added last so it is the outermost layer: 429s and 503s carry the CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -40,15 +180,800 @@ app.add_middleware(
 
 # Global variables
 mt5_connected = False
-auto_trading_active = False
-auto_trading_settings = {}
-auto_trading_thread = None
+
+# Terminal backend: "mt5" for a real MetaTrader5 terminal, "sim" for the built-in simulator
+MT5_BACKEND = os.environ.get("MT5_BRIDGE_BACKEND", "mt5")
+
+# Seconds between background account/position refreshes
+SNAPSHOT_REFRESH_INTERVAL = float(os.environ.get("MT5_BRIDGE_SNAPSHOT_INTERVAL", "1.0"))
+# Seconds before cached symbol metadata is re-read from the terminal
+SYMBOL_INFO_TTL = float(os.environ.get("MT5_BRIDGE_SYMBOL_TTL", "300"))
+# Seconds between strategy engine market data polls
+TICK_POLL_INTERVAL = float(os.environ.get("MT5_BRIDGE_TICK_INTERVAL", "0.1"))
+# Seconds between /ws producer cycles
+STREAM_INTERVAL = float(os.environ.get("MT5_BRIDGE_STREAM_INTERVAL", "0.25"))
+# Market data recording: symbols recorded from connect, capture interval, file size cap (the directory,
+# RECORD_DIR, is in mt5_paths.py)
+RECORD_SYMBOLS = [s for s in os.environ.get("MT5_BRIDGE_RECORD_SYMBOLS", "").split(",") if s]
+RECORD_INTERVAL = float(os.environ.get("MT5_BRIDGE_RECORD_INTERVAL", "1.0"))
+RECORD_MAX_BYTES = int(float(os.environ.get("MT5_BRIDGE_RECORD_MAX_MB", "256")) * 1024 * 1024)
+# Shared-memory tick feed (see mt5_ticks.py): segment name, ticks kept per symbol, most symbols, symbols published from connect
+TICK_FEED_NAME = os.environ.get("MT5_BRIDGE_TICK_FEED", "mt5_bridge_ticks")
+TICK_FEED_SLOTS = int(os.environ.get("MT5_BRIDGE_TICK_FEED_SLOTS", "4096"))
+TICK_FEED_MAX_SYMBOLS = int(os.environ.get("MT5_BRIDGE_TICK_FEED_MAX_SYMBOLS", "64"))
+TICK_FEED_SYMBOLS = [s for s in os.environ.get("MT5_BRIDGE_TICK_FEED_SYMBOLS", "").split(",") if s]
+# Market executions kept in memory for /execution_stats
+EXECUTION_WINDOW = int(os.environ.get("MT5_BRIDGE_EXECUTION_WINDOW", "20000"))
+# Market orders: deviation in points, most points a requoted order may be re-priced against the trader (0 for
+# no cap), and the time and attempts spent re-pricing requotes and trying other filling modes before giving up
+ORDER_DEVIATION = int(os.environ.get("MT5_BRIDGE_DEVIATION", "20"))
+ORDER_MAX_SLIPPAGE = float(os.environ.get("MT5_BRIDGE_MAX_SLIPPAGE", "40"))
+ORDER_RETRY_BUDGET = float(os.environ.get("MT5_BRIDGE_RETRY_BUDGET_MS", "1000")) / 1000
+ORDER_RETRY_ATTEMPTS = int(os.environ.get("MT5_BRIDGE_RETRY_ATTEMPTS", "5"))
+# Sliced orders: timer wheel resolution in seconds, and failed child orders in a row before a parent gives up
+SLICE_TIMER_TICK = float(os.environ.get("MT5_BRIDGE_SLICE_TICK", "0.01"))
+SLICE_MAX_FAILURES = int(os.environ.get("MT5_BRIDGE_SLICE_MAX_FAILURES", "5"))
+# Supabase sync: project URL, service key and owning user; unset disables it. The outbox shares the journal database
+SUPABASE_URL = os.environ.get("MT5_BRIDGE_SUPABASE_URL", "")
+SUPABASE_KEY = os.environ.get("MT5_BRIDGE_SUPABASE_KEY", "")
+SYNC_USER_ID = os.environ.get("MT5_BRIDGE_SYNC_USER_ID", "")
+# Seconds of changes coalesced into one upsert, and the longest gap between upserts of an unchanged account
+SYNC_WINDOW = float(os.environ.get("MT5_BRIDGE_SYNC_WINDOW", "5"))
+SYNC_HEARTBEAT = float(os.environ.get("MT5_BRIDGE_SYNC_HEARTBEAT", "60"))
+# Account worker processes: seconds between health pings, and how long a routed call may take
+WORKER_HEALTH_INTERVAL = float(os.environ.get("MT5_BRIDGE_WORKER_HEALTH_INTERVAL", "2"))
+WORKER_CALL_TIMEOUT = float(os.environ.get("MT5_BRIDGE_WORKER_TIMEOUT", "30"))
+# Session supervisor: heartbeat period and timeout, failed heartbeats before reconnecting, and how long
+# calls wait for a reconnect before failing
+HEARTBEAT_INTERVAL = float(os.environ.get("MT5_BRIDGE_HEARTBEAT_INTERVAL", "0.5"))
+HEARTBEAT_TIMEOUT = float(os.environ.get("MT5_BRIDGE_HEARTBEAT_TIMEOUT", "2"))
+HEARTBEAT_FAILURES = int(os.environ.get("MT5_BRIDGE_HEARTBEAT_FAILURES", "2"))
+RECONNECT_HOLD = float(os.environ.get("MT5_BRIDGE_RECONNECT_HOLD", "2"))
+# Idempotency keys: seconds a completed key is remembered, and the most keys kept
+IDEMPOTENCY_TTL = float(os.environ.get("MT5_BRIDGE_IDEMPOTENCY_TTL", "600"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("MT5_BRIDGE_IDEMPOTENCY_MAX_KEYS", "10000"))
+# Pre-trade risk limits, e.g. MT5_BRIDGE_RISK_MAX_DAILY_LOSS=500; 0 disables a check
+RISK_LIMITS = {
+    name: float(os.environ.get(f"MT5_BRIDGE_RISK_{name.upper()}", "0"))
+    for name in ("max_order_lots", "max_symbol_lots", "max_currency_lots", "max_positions", "max_daily_loss",
+                 "min_margin_level", "max_orders_per_second")
+}
+# MT5 executor lanes, most urgent first: closes and risk actions (and session heartbeats), new orders,
+# strategy market data, dashboard/UI reads
+EXECUTOR_LANES = ("close", "order", "market_data", "read")
+# Most jobs a lane may queue before new ones are rejected, e.g. MT5_BRIDGE_LANE_LIMIT_READ=64; 0 is unbounded
+LANE_LIMITS = {
+    lane: int(os.environ.get(f"MT5_BRIDGE_LANE_LIMIT_{lane.upper()}", default))
+    for lane, default in (("close", "0"), ("order", "256"), ("market_data", "64"), ("read", "64"))
+}
+# Per-client HTTP request rate and burst per lane, e.g. MT5_BRIDGE_CLIENT_RATE_READ=20; 0 disables the limit
+CLIENT_RATE_LIMITS = {
+    lane: (float(os.environ.get(f"MT5_BRIDGE_CLIENT_RATE_{lane.upper()}", rate)),
+           float(os.environ.get(f"MT5_BRIDGE_CLIENT_BURST_{lane.upper()}", burst)))
+    for lane, rate, burst in (("close", "0", "0"), ("order", "0", "0"), ("market_data", "0", "0"), ("read", "20", "40"))
+}
+
+# Terminal backends: the MetaTrader5 module, or the simulated terminal in mt5_sim.py
+
+def load_backend(name: str):
+    """Return the terminal module for MT5_BRIDGE_BACKEND / --backend"""
+    if name == "sim":
+        return SimulatedTerminal.from_env()
+    if name == "mt5":
+        import MetaTrader5
+        return MetaTrader5
+    raise ValueError(f"Unknown terminal backend: {name} (expected 'mt5' or 'sim')")
+
+# Metrics
+#
+# The bridge's own series; the registry and metric types are in mt5_metrics.py.
+
+metrics = MetricsRegistry()
+HTTP_LATENCY = metrics.histogram("bridge_http_request_duration_seconds", "HTTP handler latency", ("method", "route"))
+HTTP_REQUESTS = metrics.counter("bridge_http_requests_total", "HTTP requests by status", ("method", "route", "status"))
+MT5_CALL_LATENCY = metrics.histogram("bridge_mt5_call_duration_seconds", "MetaTrader5 function latency", ("function",))
+MT5_CALL_ERRORS = metrics.counter("bridge_mt5_call_errors_total", "MetaTrader5 calls that raised", ("function",))
+MT5_QUEUE_WAIT = metrics.histogram("bridge_mt5_queue_wait_seconds", "Time jobs wait for the MT5 executor thread",
+                                   ("lane",))
+MT5_LANE_REJECTED = metrics.counter("bridge_mt5_lane_rejected_total", "Jobs rejected because their lane was full",
+                                    ("lane",))
+MT5_LANE_COALESCED = metrics.counter("bridge_mt5_lane_coalesced_total", "Reads served by an identical queued job",
+                                     ("lane",))
+ORDER_RETCODES = metrics.counter("bridge_order_send_total", "order_send results by retcode", ("retcode",))
+STRATEGY_DECISION = metrics.histogram("bridge_strategy_decision_seconds", "Tick to strategy decision latency", ("instance",))
+STRATEGY_CYCLE = metrics.histogram("bridge_strategy_cycle_seconds", "Tick to end of strategy cycle, including orders", ("instance",))
+
+class InstrumentedTerminal:
+    """Stand-in for the MetaTrader5 module that times every function call.
+
+    Constants pass straight through; functions are wrapped once and cached.
+    """
+
+    def __init__(self, module):
+        self._module = module
+        self._wrapped = {}
+
+    @property
+    def backend(self):
+        return self._module
+
+    def use(self, module):
+        """Swap the underlying terminal module, e.g. for --backend"""
+        self._module = module
+        self._wrapped = {}
+
+    def __getattr__(self, name: str):
+        if self._module is None:
+            raise RuntimeError("MetaTrader5 is not installed: pip install MetaTrader5, or run with --backend sim")
+        attr = getattr(self._module, name)
+        if not callable(attr):
+            return attr
+        wrapped = self._wrapped.get(name)
+        if wrapped is None:
+            wrapped = self._wrapped[name] = self._wrap(name, attr)
+        return wrapped
+
+    def _wrap(self, name: str, fn):
+        labels = (name,)
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                MT5_CALL_ERRORS.inc(labels)
+                raise
+            finally:
+                MT5_CALL_LATENCY.observe(time.perf_counter() - start, labels)
+            if name == "order_send":
+                ORDER_RETCODES.inc((result.retcode if result is not None else "none",))
+            return result
+        call.__name__ = name
+        return call
+
+try:
+    mt5 = InstrumentedTerminal(load_backend(MT5_BACKEND))
+except ImportError:
+    # Resolved in __main__ when started with --backend sim
+    mt5 = InstrumentedTerminal(None)
+
+class ExecutorOverloaded(RuntimeError):
+    """Raised instead of queueing a job when its executor lane is full"""
+
+class MT5Executor:
+    """Single thread that owns the MT5 terminal.
+
+    The MetaTrader5 module is blocking and not thread-safe, so every call goes
+    through this executor and runs on one dedicated thread. Async handlers
+    await the returned future instead of blocking the event loop.
+
+    Jobs queue in priority lanes (EXECUTOR_LANES) and the thread always takes
+    the oldest job of the most urgent non-empty lane, so a close waits for at
+    most the call already running, never for a backlog of reads. A lane at
+    its limit rejects new jobs with ExecutorOverloaded, and a coalescing
+    submit joins an identical job that is still queued.
+    """
+
+    def __init__(self, name: str = "mt5-executor", limits: Optional[Dict[str, int]] = None):
+        self.limits = dict(limits or {})
+        self._lanes = {lane: deque() for lane in EXECUTOR_LANES}
+        self._queued = {}
+        self._ready = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _next(self):
+        # Caller holds the condition
+        for lane in EXECUTOR_LANES:
+            jobs = self._lanes[lane]
+            if jobs:
+                job = jobs.popleft()
+                if job[5] is not None:
+                    self._queued.pop(job[5], None)
+                return lane, job
+        return None, None
+
+    def _run(self):
+        while True:
+            with self._ready:
+                lane, job = self._next()
+                while job is None:
+                    self._ready.wait()
+                    lane, job = self._next()
+            future, fn, args, kwargs, queued_at, _ = job
+            MT5_QUEUE_WAIT.observe(time.perf_counter() - queued_at, (lane,))
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, fn, *args, lane: str = "order", coalesce: bool = False, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) on a lane for the terminal thread.
+
+        With coalesce=True an identical call (same fn and arguments) that is
+        still queued is joined instead of queueing another one.
+        """
+        # Calls made from the terminal thread itself run inline to avoid deadlock
+        future = Future()
+        if threading.current_thread() is self._thread:
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        key = (fn, args, tuple(sorted(kwargs.items()))) if coalesce else None
+        with self._ready:
+            if key is not None and key in self._queued:
+                MT5_LANE_COALESCED.inc((lane,))
+                return self._queued[key]
+            jobs = self._lanes[lane]
+            limit = self.limits.get(lane, 0)
+            if limit and len(jobs) >= limit:
+                MT5_LANE_REJECTED.inc((lane,))
+                raise ExecutorOverloaded(f"MT5 {lane} lane is full ({limit} jobs queued), try again shortly")
+            jobs.append((future, fn, args, kwargs, time.perf_counter(), key))
+            if key is not None:
+                self._queued[key] = future
+            self._ready.notify()
+        return future
+
+    def call(self, fn, *args, lane: str = "order", coalesce: bool = False, **kwargs):
+        """Blocking call for worker threads such as the auto trading bot"""
+        return self.submit(fn, *args, lane=lane, coalesce=coalesce, **kwargs).result()
+
+    async def run(self, fn, *args, lane: str = "order", coalesce: bool = False, **kwargs):
+        """Awaitable call for async request handlers"""
+        future = asyncio.wrap_future(self.submit(fn, *args, lane=lane, coalesce=coalesce, **kwargs))
+        # A shared job must not be cancelled by one caller going away
+        return await (asyncio.shield(future) if coalesce else future)
+
+    def queue_depth(self) -> int:
+        return sum(self.lane_depths().values())
+
+    def lane_depths(self) -> Dict[str, int]:
+        with self._ready:
+            return {lane: len(jobs) for lane, jobs in self._lanes.items()}
+
+mt5_executor = MT5Executor(limits=LANE_LIMITS)
+
+# Admission control
+#
+# HTTP requests are rate limited per client and lane before they can queue
+# terminal work: clients are told apart by peer address only (a header the
+# caller picks could be rotated for a fresh bucket on every request), and
+# get a 429 once their bucket is empty. A job refused by a full executor lane
+# surfaces as a 503. Both carry Retry-After.
+
+CLIENT_RATE_LIMITED = metrics.counter("bridge_client_rate_limited_total", "HTTP requests refused by per-client limits",
+                                      ("lane",))
+
+# The executor lane each terminal-bound route queues its work on
+ROUTE_LANES = {
+    "/close_order": "close", "/close_orders": "close", "/close_all": "close", "/kill_switch": "close",
+    "/modify_position": "close", "/cancel_order": "close", "/trailing_stop": "close",
+    "/place_order": "order", "/place_orders": "order", "/place_pending_order": "order", "/modify_order": "order",
+    "/connect": "order",
+    "/positions": "read", "/account_info": "read", "/orders": "read",
+}
+
+class ClientRateLimiter:
+    """Token bucket per (client address, lane), least recently seen clients forgotten first"""
+
+    def __init__(self, limits: Dict[str, tuple], max_clients: int = 10000):
+        self.limits = dict(limits)
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client: str, lane: str) -> float:
+        """0 if the request may go ahead, otherwise seconds until it could"""
+        rate, burst = self.limits.get(lane, (0.0, 0.0))
+        if not rate:
+            return 0.0
+        burst = max(burst, 1.0)
+        now = time.monotonic()
+        with self._lock:
+            tokens, refilled_at = self._buckets.pop((client, lane), (burst, now))
+            tokens = min(burst, tokens + (now - refilled_at) * rate)
+            wait = 0.0 if tokens >= 1.0 else (1.0 - tokens) / rate
+            self._buckets[(client, lane)] = (tokens - 1.0 if not wait else tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+client_rate_limiter = ClientRateLimiter(CLIENT_RATE_LIMITS)
+
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded(request, exc: ExecutorOverloaded):
+    return FastJSONResponse({"success": False, "error": str(exc)}, status_code=503, headers={"Retry-After": "1"})
+
+class SymbolSpec:
+    """Trading constraints for one symbol, read once from symbol_info"""
+
+    def __init__(self, info):
+        self.name = info.name
+        self.point = info.point
+        self.digits = info.digits
+        self.volume_min = info.volume_min
+        self.volume_max = info.volume_max
+        self.volume_step = info.volume_step
+        self.stops_level = info.trade_stops_level
+        self.filling_mode = info.filling_mode
+        self.currency_base = getattr(info, "currency_base", info.name[:3])
+        self.currency_profit = getattr(info, "currency_profit", info.name[3:6])
+        self.loaded_at = time.monotonic()
+
+    @property
+    def pip(self) -> float:
+        # Fractional-pip quotes (5 and 3 digits) have a pip of ten points
+        return self.point * 10 if self.digits in (3, 5) else self.point
+
+    def round_price(self, price: float) -> float:
+        return round(price, self.digits)
+
+    def normalize_volume(self, volume: float) -> float:
+        """Round volume to the symbol's step, rejecting it if out of range"""
+        step = self.volume_step or 0.01
+        steps = round(volume / step)
+        decimals = len(f"{step:.8f}".rstrip("0").split(".")[1])
+        normalized = round(steps * step, decimals)
+        if normalized < self.volume_min:
+            raise ValueError(f"Volume {volume} is below the minimum {self.volume_min} for {self.name}")
+        if normalized > self.volume_max:
+            raise ValueError(f"Volume {volume} is above the maximum {self.volume_max} for {self.name}")
+        return normalized
+
+    def check_stops(self, is_buy: bool, price: float, stop_loss: Optional[float], take_profit: Optional[float]):
+        """Reject SL/TP on the wrong side of the price or inside the stop level"""
+        min_distance = self.stops_level * self.point
+        if stop_loss:
+            distance = price - stop_loss if is_buy else stop_loss - price
+            if distance <= 0:
+                raise ValueError(f"Stop loss {stop_loss} is on the wrong side of {price}")
+            if distance < min_distance:
+                raise ValueError(f"Stop loss {stop_loss} is closer than {self.stops_level} points to {price}")
+        if take_profit:
+            distance = take_profit - price if is_buy else price - take_profit
+            if distance <= 0:
+                raise ValueError(f"Take profit {take_profit} is on the wrong side of {price}")
+            if distance < min_distance:
+                raise ValueError(f"Take profit {take_profit} is closer than {self.stops_level} points to {price}")
+
+    def filling_type(self) -> int:
+        if self.filling_mode & mt5.SYMBOL_FILLING_IOC:
+            return mt5.ORDER_FILLING_IOC
+        if self.filling_mode & mt5.SYMBOL_FILLING_FOK:
+            return mt5.ORDER_FILLING_FOK
+        return mt5.ORDER_FILLING_RETURN
+
+class SymbolCache:
+    """symbol_info results per symbol, re-read after SYMBOL_INFO_TTL seconds"""
+
+    def __init__(self, executor: MT5Executor, ttl: float):
+        self.executor = executor
+        self.ttl = ttl
+        self._specs = {}
+
+    def get(self, symbol: str) -> Optional[SymbolSpec]:
+        spec = self._specs.get(symbol)
+        if spec is None or time.monotonic() - spec.loaded_at > self.ttl:
+            info = self.executor.call(mt5.symbol_info, symbol, coalesce=True)
+            if info is None:
+                return spec
+            spec = SymbolSpec(info)
+            self._specs[symbol] = spec
+        return spec
+
+    def require(self, symbol: str) -> SymbolSpec:
+        spec = self.get(symbol)
+        if spec is None:
+            raise ValueError(f"Unknown symbol {symbol}")
+        return spec
+
+symbol_cache = SymbolCache(mt5_executor, SYMBOL_INFO_TTL)
+
+# Trade journal
+#
+# Every order_send (API, batch and bot) is appended to a SQLite database in
+# WAL mode. The order path only enqueues the row; a writer thread inserts
+# whatever has queued up in one transaction, so fills never wait on disk.
+# The schema and the read side are in mt5_journal.py.
+
+JOURNAL_WRITES = metrics.counter("bridge_journal_rows_total", "Trade journal rows by outcome", ("outcome",))
+
+class TradeJournal(JournalReader):
+    """Write-behind SQLite journal of order requests and their results"""
+
+    def __init__(self, path: str, batch_size: int = 500, max_pending: int = 100000):
+        super().__init__(path)
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            with self._connect() as connection:
+                connection.executescript(JOURNAL_SCHEMA)
+                existing = {row[1] for row in connection.execute("PRAGMA table_info(journal)")}
+                for column, sql_type in JOURNAL_ADDED_COLUMNS.items():
+                    if column not in existing:
+                        connection.execute(f"ALTER TABLE journal ADD COLUMN {column} {sql_type}")
+            self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+            self._thread.start()
+
+    def record(self, row: Dict[str, Any]):
+        """Queue one row; never blocks the caller"""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(tuple(row.get(column) for column in JOURNAL_COLUMNS))
+        except queue.Full:
+            JOURNAL_WRITES.inc(("dropped",))
+            logger.error("Trade journal queue is full, dropping a row")
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        connection = self._connect()
+        insert = f"INSERT INTO journal ({', '.join(JOURNAL_COLUMNS)}) VALUES ({', '.join('?' * len(JOURNAL_COLUMNS))})"
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with connection:
+                    connection.executemany(insert, batch)
+                JOURNAL_WRITES.inc(("written",), len(batch))
+            except sqlite3.Error as e:
+                JOURNAL_WRITES.inc(("failed",), len(batch))
+                logger.error(f"Trade journal write failed: {e}")
+
+trade_journal = TradeJournal(JOURNAL_PATH)
+
+# Execution quality
+#
+# Every market open and close is also kept in a fixed-size in-memory ring:
+# the requested price (from the tick read to price the order), the fill, the
+# slippage between them in points, the order_send round trip and the retcode.
+# /execution_stats summarizes the ring, or the journal for longer periods, by
+# symbol, UTC hour, magic, filling mode, side or kind with
+# summarize_executions() from mt5_journal.py, which mt5_execution_report.py
+# uses to print the same summary offline.
+
+ORDER_SLIPPAGE = metrics.histogram("bridge_order_slippage_points", "Fill against requested price in points, positive when adverse",
+                                   ("symbol", "kind"), SLIPPAGE_BUCKETS)
+ORDER_FILL_LATENCY = metrics.histogram("bridge_order_fill_seconds", "order_send round trip of market orders by outcome",
+                                       ("symbol", "outcome"))
+
+class ExecutionStats:
+    """Ring of the most recent market executions"""
+
+    def __init__(self, window: int):
+        self._records = np.zeros(window, EXECUTION_DTYPE)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def record(self, order_request: Dict[str, Any], kind: str, retcode: int, slippage: Optional[float],
+               latency_ms: float):
+        symbol = order_request.get("symbol") or ""
+        filled = retcode == DONE_RETCODE
+        row = (time.time(), symbol, order_request.get("magic") or 0, kind,
+               1 if _order_side(order_request.get("type")) == "BUY" else -1,
+               order_request.get("type_filling", -1), retcode, order_request.get("deviation", -1),
+               np.nan if slippage is None else slippage, latency_ms)
+        with self._lock:
+            self._records[self._count % len(self._records)] = row
+            self._count += 1
+        if slippage is not None:
+            ORDER_SLIPPAGE.observe(slippage, (symbol, kind))
+        outcome = "filled" if filled else "requote" if retcode in REQUOTE_RETCODES else "rejected"
+        ORDER_FILL_LATENCY.observe(latency_ms / 1000, (symbol, outcome))
+
+    def records(self, symbol: Optional[str] = None, magic: Optional[int] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> np.ndarray:
+        """Copy of the window, oldest first, filtered like TradeJournal.executions"""
+        with self._lock:
+            window = len(self._records)
+            if self._count <= window:
+                records = self._records[:self._count].copy()
+            else:
+                start = self._count % window
+                records = np.concatenate((self._records[start:], self._records[:start]))
+        mask = np.ones(len(records), dtype=bool)
+        if symbol is not None:
+            mask &= records["symbol"] == symbol
+        if magic is not None:
+            mask &= records["magic"] == magic
+        if since is not None:
+            mask &= records["time"] >= since
+        if until is not None:
+            mask &= records["time"] < until
+        return records if mask.all() else records[mask]
+
+    def __len__(self) -> int:
+        return min(self._count, len(self._records))
+
+execution_stats = ExecutionStats(EXECUTION_WINDOW)
+
+# Idempotency keys
+#
+# /place_order and /close_order accept an optional idempotency_key. The first
+# request with a key does the work; a retry with the same key waits on that
+# first attempt, or gets its stored result, instead of sending a second order.
+
+IDEMPOTENCY_REQUESTS = metrics.counter("bridge_idempotency_requests_total", "Requests carrying an idempotency key",
+                                       ("outcome",))
+
+class IdempotencyTable:
+    """Bounded table of idempotency keys with a TTL, each holding the first attempt's future.
+
+    Keys are kept in creation order and expire ttl seconds after they were
+    first claimed, however often they are replayed. A key whose first
+    attempt is still running is never evicted, even when the table is full:
+    a retry would otherwise become a new owner and send a second order.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float, room: int = 0):
+        # Caller holds the lock. Oldest first, skipping keys that are still in flight
+        excess = len(self._entries) + room - self.max_entries
+        stale = []
+        for key, (future, _, created) in self._entries.items():
+            if excess <= 0 and now - created < self.ttl:
+                break
+            if future.done():
+                stale.append(key)
+                excess -= 1
+        for key in stale:
+            del self._entries[key]
+
+    def claim(self, key: str, fingerprint: str):
+        """(future, owner): the owner must resolve the future; everyone else awaits it"""
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(key)
+            if entry is not None:
+                future, known_fingerprint, _ = entry
+                if known_fingerprint != fingerprint:
+                    raise ValueError(f"Idempotency key {key} was already used for a different request")
+                return future, False
+            if len(self._entries) >= self.max_entries:
+                self._evict(now, 1)
+            future = Future()
+            self._entries[key] = (future, fingerprint, now)
+            return future, True
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+idempotency_table = IdempotencyTable(IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS)
+
+async def _idempotent(request: BaseModel, run) -> Dict[str, Any]:
+    """Run `run()` at most once per request.idempotency_key"""
+    key = request.idempotency_key
+    if not key:
+        return await run()
+    fingerprint = json.dumps(request.dict(exclude={"idempotency_key", "account_id"}), sort_keys=True)
+    try:
+        future, owner = idempotency_table.claim(key, fingerprint)
+    except ValueError as e:
+        IDEMPOTENCY_REQUESTS.inc(("conflict",))
+        return {"success": False, "error": str(e)}
+    if not owner:
+        IDEMPOTENCY_REQUESTS.inc(("replayed" if future.done() else "joined",))
+        try:
+            return {**(await asyncio.wrap_future(future)), "idempotent_replay": True}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    IDEMPOTENCY_REQUESTS.inc(("new",))
+
+    def settle(task):
+        if task.cancelled() or task.exception() is not None:
+            # No result was produced, so a retry may try again
+            idempotency_table.discard(key)
+            future.set_exception(task.exception() if not task.cancelled() else asyncio.CancelledError())
+        else:
+            future.set_result(task.result())
+
+    # The work outlives this request, so a client that gives up and retries joins it rather than repeating it
+    task = asyncio.ensure_future(run())
+    task.add_done_callback(settle)
+    return await asyncio.shield(task)
+
+# Pre-trade risk
+#
+# ExposureBook mirrors the open positions and the lots they add up to per
+# symbol and per currency. Fills update it as they happen and every snapshot
+# refresh re-syncs it (positions also close on SL/TP), so RiskEngine.check()
+# is a handful of dict lookups with no terminal call.
+
+RISK_REJECTIONS = metrics.counter("bridge_risk_rejections_total", "Orders rejected by pre-trade risk checks",
+                                  ("check",))
+
+class ExposureBook:
+    """Open positions and the net exposure they add up to"""
+
+    def __init__(self):
+        self.positions = {}
+        self.symbol_lots = {}
+        self.currency_lots = {}
+        self.counts = {}
+        self.balance = None
+        self.equity = None
+        self.margin_level = None
+        self.day = None
+        self.day_start_balance = None
+        self._currencies = {}
+        self._lock = threading.Lock()
+
+    def currencies(self, symbol: str):
+        pair = self._currencies.get(symbol)
+        if pair is None:
+            spec = symbol_cache.get(symbol)
+            pair = (spec.currency_base, spec.currency_profit) if spec else (symbol[:3], symbol[3:6])
+            self._currencies[symbol] = pair
+        return pair
+
+    def _apply(self, symbol: str, lots: float, magic: int, count: int):
+        # Caller holds the lock; lots are signed (+ long, - short)
+        base, quote = self.currencies(symbol)
+        self.symbol_lots[symbol] = self.symbol_lots.get(symbol, 0.0) + lots
+        self.currency_lots[base] = self.currency_lots.get(base, 0.0) + lots
+        self.currency_lots[quote] = self.currency_lots.get(quote, 0.0) - lots
+        self.counts[(symbol, magic)] = self.counts.get((symbol, magic), 0) + count
+
+    def apply_fill(self, order_request: Dict[str, Any], result):
+        volume = result.volume or order_request.get("volume", 0.0)
+        with self._lock:
+            ticket = order_request.get("position")
+            if ticket:
+                position = self.positions.get(ticket)
+                if position is None:
+                    return
+                symbol, lots, magic = position
+                closed = min(volume, abs(lots)) * (1 if lots > 0 else -1)
+                remaining = round(lots - closed, 8)
+                self._apply(symbol, -closed, magic, 0 if remaining else -1)
+                if remaining:
+                    self.positions[ticket] = (symbol, remaining, magic)
+                else:
+                    del self.positions[ticket]
+            else:
+                symbol = order_request["symbol"]
+                lots = volume if order_request.get("type") == mt5.ORDER_TYPE_BUY else -volume
+                magic = order_request.get("magic", 0)
+                self.positions[result.order] = (symbol, lots, magic)
+                self._apply(symbol, lots, magic, 1)
+
+    def reconcile(self, positions: List[Dict[str, Any]], account: Optional[Dict[str, Any]]):
+        """Rebuild from a fresh snapshot; runs on the executor thread after each refresh"""
+        for position in positions:
+            self.currencies(position["symbol"])
+        with self._lock:
+            self.positions, self.symbol_lots, self.currency_lots, self.counts = {}, {}, {}, {}
+            for position in positions:
+                lots = position["volume"] if position["type"] == "BUY" else -position["volume"]
+                self.positions[position["ticket"]] = (position["symbol"], lots, position["magic"])
+                self._apply(position["symbol"], lots, position["magic"], 1)
+            if account is not None:
+                day = time.strftime("%Y-%m-%d", time.gmtime())
+                if day != self.day:
+                    self.day, self.day_start_balance = day, account["balance"]
+                self.balance, self.equity = account["balance"], account["equity"]
+                self.margin_level = account["margin_level"] if account["margin"] else None
+
+    def count(self, symbol: str, magic: int) -> int:
+        return self.counts.get((symbol, magic), 0)
+
+    def daily_loss(self) -> float:
+        if self.day_start_balance is None or self.equity is None:
+            return 0.0
+        return self.day_start_balance - self.equity
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "positions": len(self.positions),
+                "symbol_lots": {k: round(v, 8) for k, v in self.symbol_lots.items() if abs(v) > 1e-9},
+                "currency_lots": {k: round(v, 8) for k, v in self.currency_lots.items() if abs(v) > 1e-9},
+                "daily_loss": round(self.daily_loss(), 2),
+                "margin_level": self.margin_level
+            }
+
+class RiskEngine:
+    """O(1) pre-trade checks against the exposure book, plus a kill switch"""
+
+    def __init__(self, book: ExposureBook, limits: Dict[str, float]):
+        self.book = book
+        self.limits = dict(limits)
+        self.halted = False
+        self._tokens = 0.0
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reject(self, check: str, message: str) -> str:
+        RISK_REJECTIONS.inc((check,))
+        return message
+
+    def _take_token(self, rate: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            # Room for at least one token, or a rate below 1/s could never allow an order
+            self._tokens = min(max(rate, 1.0), self._tokens + (now - self._refilled_at) * rate)
+            self._refilled_at = now
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def check(self, symbol: str, is_buy: bool, volume: float) -> Optional[str]:
+        """None if an opening order may go out, otherwise the reason it may not"""
+        if self.halted:
+            return self._reject("kill_switch", "Trading is halted by the kill switch")
+        limits, book = self.limits, self.book
+        lots = volume if is_buy else -volume
+        if limits["max_order_lots"] and volume > limits["max_order_lots"]:
+            return self._reject("max_order_lots", f"Volume {volume} is above the {limits['max_order_lots']} lot limit")
+        if limits["max_symbol_lots"] and abs(book.symbol_lots.get(symbol, 0.0) + lots) > limits["max_symbol_lots"]:
+            return self._reject("max_symbol_lots", f"{symbol} exposure would exceed {limits['max_symbol_lots']} lots")
+        if limits["max_currency_lots"]:
+            base, quote = book.currencies(symbol)
+            for currency, change in ((base, lots), (quote, -lots)):
+                if abs(book.currency_lots.get(currency, 0.0) + change) > limits["max_currency_lots"]:
+                    return self._reject("max_currency_lots",
+                                        f"{currency} exposure would exceed {limits['max_currency_lots']} lots")
+        if limits["max_positions"] and len(book.positions) >= limits["max_positions"]:
+            return self._reject("max_positions", f"{len(book.positions)} positions are already open")
+        if limits["max_daily_loss"] and book.daily_loss() >= limits["max_daily_loss"]:
+            return self._reject("max_daily_loss", f"Daily loss limit of {limits['max_daily_loss']} reached")
+        if limits["min_margin_level"] and book.margin_level is not None and book.margin_level < limits["min_margin_level"]:
+            return self._reject("min_margin_level", f"Margin level {book.margin_level}% is below {limits['min_margin_level']}%")
+        if limits["max_orders_per_second"] and not self._take_token(limits["max_orders_per_second"]):
+            return self._reject("max_orders_per_second", "Order rate limit reached")
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        return {"halted": self.halted, "limits": self.limits, "exposure": self.book.summary()}
+
+exposure_book = ExposureBook()
+risk_engine = RiskEngine(exposure_book, RISK_LIMITS)
 
 # Pydantic models
+class AccountRequest(BaseModel):
+    account_id: Optional[str] = None
+
 class ConnectionRequest(BaseModel):
     server: str
     account_number: int
     password: str
+    account_id: Optional[str] = None
+    terminal_path: Optional[str] = None
 
 class OrderRequest(BaseModel):
     symbol: str
@@ -59,9 +984,72 @@ class OrderRequest(BaseModel):
     take_profit: Optional[float] = None
     comment: Optional[str] = ""
     magic_number: Optional[int] = 12345
+    deviation: Optional[int] = None  # points; MT5_BRIDGE_DEVIATION when unset
+    max_slippage_points: Optional[float] = None  # MT5_BRIDGE_MAX_SLIPPAGE when unset
+    account_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
 
 class CloseOrderRequest(BaseModel):
     ticket: int
+    deviation: Optional[int] = None
+    max_slippage_points: Optional[float] = None
+    account_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+class PendingOrderRequest(BaseModel):
+    symbol: str
+    order_type: str  # BUY_LIMIT, SELL_LIMIT, BUY_STOP or SELL_STOP
+    volume: float
+    price: float
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    expiration: Optional[float] = None  # Unix time; GTC when unset
+    comment: Optional[str] = ""
+    magic_number: Optional[int] = 12345
+    account_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+class ModifyPositionRequest(BaseModel):
+    ticket: int
+    stop_loss: Optional[float] = None  # None keeps the current level, 0 removes it
+    take_profit: Optional[float] = None
+    account_id: Optional[str] = None
+
+class ModifyOrderRequest(BaseModel):
+    ticket: int
+    price: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    expiration: Optional[float] = None
+    account_id: Optional[str] = None
+
+class CancelOrderRequest(BaseModel):
+    ticket: int
+    account_id: Optional[str] = None
+
+class TrailingStopRequest(BaseModel):
+    ticket: int
+    distance_pips: float
+    step_pips: float = 1.0
+    activation_pips: float = 0.0
+    account_id: Optional[str] = None
+
+class CancelTrailingStopRequest(BaseModel):
+    ticket: int
+    account_id: Optional[str] = None
+
+class PlaceOrdersRequest(BaseModel):
+    orders: List[OrderRequest]
+    account_id: Optional[str] = None
+
+class CloseOrdersRequest(BaseModel):
+    tickets: List[int]
+    account_id: Optional[str] = None
+
+class CloseAllRequest(BaseModel):
+    symbol: Optional[str] = None
+    magic_number: Optional[int] = None
+    account_id: Optional[str] = None
 
 class AutoTradingRequest(BaseModel):
     symbol: str
@@ -70,14 +1058,91 @@ class AutoTradingRequest(BaseModel):
     take_profit_pips: int
     max_trades: int
     trading_strategy: str
+    instance_id: Optional[str] = "default"
+    magic_number: Optional[int] = 99999
 
-@app.post("/connect")
-async def connect_mt5(request: ConnectionRequest):
+class StopAutoTradingRequest(BaseModel):
+    instance_id: Optional[str] = None
+
+class RecordingRequest(BaseModel):
+    symbols: List[str] = []
+
+class TickFeedRequest(BaseModel):
+    symbols: List[str] = []
+
+class RiskLimitsRequest(BaseModel):
+    max_order_lots: Optional[float] = None
+    max_symbol_lots: Optional[float] = None
+    max_currency_lots: Optional[float] = None
+    max_positions: Optional[float] = None
+    max_daily_loss: Optional[float] = None
+    min_margin_level: Optional[float] = None
+    max_orders_per_second: Optional[float] = None
+
+class SlicedOrderRequest(BaseModel):
+    symbol: str
+    trade_type: str
+    volume: float
+    algo: str = "twap"  # "twap": even slices over duration_seconds; "iceberg": visible_volume at a time
+    duration_seconds: float = 300
+    slices: Optional[int] = None  # TWAP slice count; one slice every interval_seconds when unset
+    interval_seconds: float = 10  # TWAP slice spacing, or the pause after each iceberg clip fills
+    visible_volume: Optional[float] = None
+    max_slice_volume: Optional[float] = None
+    limit_price: Optional[float] = None  # slices wait while the price is worse than this
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    deviation: Optional[int] = None
+    max_slippage_points: Optional[float] = None
+    comment: Optional[str] = None  # child order comment; "slice <parent_id>" when unset
+    magic_number: Optional[int] = 12345
+    account_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+
+class AmendSlicedOrderRequest(BaseModel):
+    parent_id: str
+    volume: Optional[float] = None  # new total, at least what has already filled
+    duration_seconds: Optional[float] = None
+    slices: Optional[int] = None
+    interval_seconds: Optional[float] = None
+    visible_volume: Optional[float] = None
+    max_slice_volume: Optional[float] = None
+    limit_price: Optional[float] = None  # 0 removes the limit
+    account_id: Optional[str] = None
+
+class SlicedOrderIdRequest(BaseModel):
+    parent_id: Optional[str] = None
+    account_id: Optional[str] = None
+
+class KillSwitchRequest(BaseModel):
+    flatten: bool = True
+
+class HistoryRequest(BaseModel):
+    account_id: Optional[str] = None
+    ticket: Optional[int] = None
+    symbol: Optional[str] = None
+    magic_number: Optional[int] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    cursor: Optional[int] = None
+    limit: int = 100
+
+class ExecutionStatsRequest(BaseModel):
+    account_id: Optional[str] = None
+    symbol: Optional[str] = None
+    magic_number: Optional[int] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    group_by: Optional[str] = "symbol"
+    source: str = "memory"  # "memory" (the last MT5_BRIDGE_EXECUTION_WINDOW executions) or "journal"
+
+def _connect(request: ConnectionRequest):
     global mt5_connected
     
     try:
-        # Initialize MT5
-        if not mt5.initialize():
+        # Initialize MT5, optionally a specific terminal installation
+        initialized = mt5.initialize(path=request.terminal_path) if request.terminal_path else mt5.initialize()
+        if not initialized:
             return {"success": False, "error": "Failed to initialize MT5"}
         
         # Login to account
@@ -116,280 +1181,2988 @@ async def connect_mt5(request: ConnectionRequest):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/place_order")
-async def place_order(request: OrderRequest):
-    if not mt5_connected:
-        return {"success": False, "error": "MT5 not connected"}
-    
+def _tick(symbol: str, ticks: Optional[Dict[str, Any]] = None):
+    """symbol_info_tick, reusing a tick already read in the same batch"""
+    if ticks is None:
+        return mt5.symbol_info_tick(symbol)
+    if symbol not in ticks:
+        ticks[symbol] = mt5.symbol_info_tick(symbol)
+    return ticks[symbol]
+
+PENDING_ORDER_TYPES = ("BUY_LIMIT", "SELL_LIMIT", "BUY_STOP", "SELL_STOP")
+
+def _order_side(order_type: Optional[int]) -> Optional[str]:
+    if order_type is None:
+        return None
+    if order_type in (mt5.ORDER_TYPE_BUY, mt5.ORDER_TYPE_BUY_LIMIT, mt5.ORDER_TYPE_BUY_STOP):
+        return "BUY"
+    return "SELL"
+
+def _slippage_points(order_request: Dict[str, Any], fill_price: float) -> Optional[float]:
+    """Fill against the requested price in points, positive when the fill cost us"""
+    requested = order_request.get("price")
+    spec = symbol_cache.get(order_request.get("symbol"))
+    if not requested or not fill_price or spec is None:
+        return None
+    moved = fill_price - requested if _order_side(order_request.get("type")) == "BUY" else requested - fill_price
+    return round(moved / spec.point, 1)
+
+def _send_order(order_request: Dict[str, Any], kind: str, source: str, quote=None):
+    """order_send plus a trade journal entry for the request and its result.
+
+    quote is the tick the order was priced from, kept with the execution.
+    """
+    start = time.perf_counter()
+    result, error = None, None
+    try:
+        result = mt5.order_send(order_request)
+        if result is None or result.retcode == mt5.TRADE_RETCODE_CONNECTION:
+            session_supervisor.wake()
+        elif result.retcode == mt5.TRADE_RETCODE_DONE and order_request.get("action") == mt5.TRADE_ACTION_DEAL:
+            exposure_book.apply_fill(order_request, result)
+        return result
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        market = order_request.get("action") == mt5.TRADE_ACTION_DEAL and result is not None
+        slippage = None
+        if market and result.retcode == mt5.TRADE_RETCODE_DONE:
+            try:
+                slippage = _slippage_points(order_request, result.price)
+            except Exception:
+                pass
+        trade_journal.record({
+            "time": time.time(),
+            "kind": kind,
+            "source": source,
+            "ticket": (order_request.get("position") or order_request.get("order")
+                       or (result.order if result is not None else None)),
+            "deal": result.deal if result is not None else None,
+            "symbol": order_request.get("symbol"),
+            "magic": order_request.get("magic"),
+            "side": _order_side(order_request.get("type")),
+            "volume": order_request.get("volume"),
+            "price": order_request.get("price"),
+            "fill_price": result.price if result is not None else None,
+            "sl": order_request.get("sl"),
+            "tp": order_request.get("tp"),
+            "retcode": result.retcode if result is not None else None,
+            "comment": result.comment if result is not None else None,
+            "error": error if error is not None else (None if result is not None else str(mt5.last_error())),
+            "latency_ms": latency_ms,
+            "request": json.dumps(order_request),
+            "deviation": order_request.get("deviation"),
+            "filling": order_request.get("type_filling"),
+            "quote_bid": quote.bid if quote is not None else None,
+            "quote_ask": quote.ask if quote is not None else None,
+            "quote_time_msc": quote.time_msc if quote is not None else None,
+            "slippage_points": slippage,
+        })
+        if market:
+            execution_stats.record(order_request, kind, result.retcode, slippage, latency_ms)
+
+ORDER_RETRIES = metrics.counter("bridge_order_retries_total", "Market order re-sends by reason", ("reason",))
+
+class FillingModes:
+    """Filling mode each symbol last filled with, learned from TRADE_RETCODE_INVALID_FILL.
+
+    symbol_info's filling flags are only a first guess: some brokers refuse a
+    flagged mode, or only take RETURN. Runs on the executor thread only.
+    """
+
+    def __init__(self):
+        self._working = {}
+        self._refused = {}
+
+    def candidates(self, spec: SymbolSpec) -> list:
+        working = self._working.get(spec.name)
+        refused = self._refused.get(spec.name, set())
+        modes = [] if working is None else [working]
+        for mode in (spec.filling_type(), mt5.ORDER_FILLING_IOC, mt5.ORDER_FILLING_FOK, mt5.ORDER_FILLING_RETURN):
+            if mode not in modes and mode not in refused:
+                modes.append(mode)
+        # Everything refused once: the broker may have changed its mind, start over
+        return modes or [spec.filling_type()]
+
+    def refused(self, symbol: str, mode: int):
+        self._refused.setdefault(symbol, set()).add(mode)
+        if self._working.get(symbol) == mode:
+            del self._working[symbol]
+
+    def filled(self, symbol: str, mode: int):
+        self._working[symbol] = mode
+        self._refused.get(symbol, set()).discard(mode)
+
+    def status(self) -> Dict[str, int]:
+        return dict(self._working)
+
+filling_modes = FillingModes()
+
+def _execute_market(order_request: Dict[str, Any], kind: str, source: str, quote=None,
+                    ticks: Optional[Dict[str, Any]] = None, max_slippage: Optional[float] = None):
+    """Send a market open or close, retrying inside the bridge instead of failing back to the client.
+
+    A refused filling mode is retried at once with the symbol's next
+    candidate. A requote is re-priced from a fresh tick and resent while
+    the retry budget lasts and the new price is within max_slippage points
+    of the first one; each attempt's deviation is cut so the fill cannot
+    end up further than that either. Returns (result, attempts, why retrying
+    stopped early or None).
+    """
+    symbol = order_request["symbol"]
+    spec = symbol_cache.require(symbol)
+    is_buy = order_request["type"] == mt5.ORDER_TYPE_BUY
+    max_slippage = ORDER_MAX_SLIPPAGE if max_slippage is None else max_slippage
+    deviation = order_request.get("deviation", ORDER_DEVIATION)
+    first_price = order_request["price"]
+    adverse = lambda price: (price - first_price if is_buy else first_price - price) / spec.point
+    modes = filling_modes.candidates(spec)
+    order_request["type_filling"] = modes.pop(0)
+    deadline = time.perf_counter() + ORDER_RETRY_BUDGET
+    attempts = 0
+    while True:
+        attempts += 1
+        if max_slippage:
+            order_request["deviation"] = int(max(0, min(deviation, max_slippage - max(0.0, adverse(order_request["price"])))))
+        result = _send_order(order_request, kind, source, quote)
+        if result is None:
+            return result, attempts, None
+        if result.retcode == mt5.TRADE_RETCODE_DONE:
+            filling_modes.filled(symbol, order_request["type_filling"])
+            return result, attempts, None
+        if result.retcode == mt5.TRADE_RETCODE_INVALID_FILL:
+            filling_modes.refused(symbol, order_request["type_filling"])
+            if not modes:
+                return result, attempts, "no filling mode left to try"
+            retry = "filling"
+        elif result.retcode in REQUOTE_RETCODES:
+            retry = "requote"
+        else:
+            return result, attempts, None
+        if attempts >= ORDER_RETRY_ATTEMPTS:
+            return result, attempts, f"retry limit of {ORDER_RETRY_ATTEMPTS} attempts reached"
+        if time.perf_counter() >= deadline:
+            return result, attempts, f"retry budget of {ORDER_RETRY_BUDGET * 1000:.0f}ms spent"
+        
+        if retry == "filling":
+            order_request["type_filling"] = modes.pop(0)
+        else:
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                return result, attempts, "no fresh price to retry at"
+            if ticks is not None:
+                ticks[symbol] = tick
+            price = spec.round_price(tick.ask if is_buy else tick.bid)
+            if max_slippage and adverse(price) > max_slippage:
+                return result, attempts, (f"price moved {adverse(price):.1f} points against the order, "
+                                          f"over max_slippage_points {max_slippage:g}")
+            order_request["price"] = price
+            quote = tick
+        ORDER_RETRIES.inc((retry,))
+
+def _execution_error(action: str, result, attempts: int, stopped: Optional[str]) -> str:
+    error = f"{action} failed: {result.comment}"
+    if attempts > 1:
+        error += f" after {attempts} attempts"
+    return f"{error} ({stopped})" if stopped else error
+
+def _place_order(request: OrderRequest, ticks: Optional[Dict[str, Any]] = None, source: str = "api"):
     try:
         # Get current price if not provided
+        tick = None
         if request.price is None:
-            tick = mt5.symbol_info_tick(request.symbol)
+            tick = _tick(request.symbol, ticks)
             if tick is None:
                 return {"success": False, "error": f"Failed to get price for {request.symbol}"}
             request.price = tick.ask if request.trade_type == "BUY" else tick.bid
         
+        # Validate and round locally so bad orders never reach the terminal
+        spec = symbol_cache.require(request.symbol)
+        is_buy = request.trade_type == "BUY"
+        price = spec.round_price(request.price)
+        stop_loss = spec.round_price(request.stop_loss) if request.stop_loss else None
+        take_profit = spec.round_price(request.take_profit) if request.take_profit else None
+        spec.check_stops(is_buy, price, stop_loss, take_profit)
+        volume = spec.normalize_volume(request.volume)
+        
+        rejection = risk_engine.check(request.symbol, is_buy, volume)
+        if rejection:
+            return {"success": False, "error": f"Risk check failed: {rejection}"}
+        
         # Prepare order request
-        order_type = mt5.ORDER_TYPE_BUY if request.trade_type == "BUY" else mt5.ORDER_TYPE_SELL
+        order_type = mt5.ORDER_TYPE_BUY if is_buy else mt5.ORDER_TYPE_SELL
         
         order_request = {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": request.symbol,
-            "volume": request.volume,
+            "volume": volume,
             "type": order_type,
-            "price": request.price,
-            "deviation": 20,
+            "price": price,
+            "deviation": request.deviation if request.deviation is not None else ORDER_DEVIATION,
             "magic": request.magic_number,
             "comment": request.comment,
             "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
         
-        if request.stop_loss:
-            order_request["sl"] = request.stop_loss
-        if request.take_profit:
-            order_request["tp"] = request.take_profit
+        if stop_loss:
+            order_request["sl"] = stop_loss
+        if take_profit:
+            order_request["tp"] = take_profit
         
-        # Send order
-        result = mt5.order_send(order_request)
+        # Send order, re-priced on requotes
+        result, attempts, stopped = _execute_market(order_request, "open", source, tick, ticks,
+                                                    request.max_slippage_points)
         
+        if result is None:
+            return {"success": False, "error": f"Order failed: {mt5.last_error()}"}
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            return {"success": False, "error": f"Order failed: {result.comment}"}
+            return {"success": False, "error": _execution_error("Order", result, attempts, stopped)}
         
         return {
             "success": True,
             "trade_info": {
                 "ticket": result.order,
-                "open_price": result.price
+                "open_price": result.price,
+                "attempts": attempts
             }
         }
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/close_order")
-async def close_order(request: CloseOrderRequest):
-    if not mt5_connected:
-        return {"success": False, "error": "MT5 not connected"}
-    
+def _close_position(position, ticks: Optional[Dict[str, Any]] = None, source: str = "api",
+                    deviation: Optional[int] = None, max_slippage: Optional[float] = None):
     try:
-        # Get position info
-        positions = mt5.positions_get(ticket=request.ticket)
-        if not positions:
-            return {"success": False, "error": "Position not found"}
-        
-        position = positions[0]
-        
         # Prepare close request
         close_request = {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": position.symbol,
             "volume": position.volume,
             "type": mt5.ORDER_TYPE_SELL if position.type == mt5.ORDER_TYPE_BUY else mt5.ORDER_TYPE_BUY,
-            "position": request.ticket,
-            "deviation": 20,
+            "position": position.ticket,
+            "deviation": deviation if deviation is not None else ORDER_DEVIATION,
             "magic": position.magic,
             "comment": "Close position",
             "type_time": mt5.ORDER_TIME_GTC,
-            "type_filling": mt5.ORDER_FILLING_IOC,
         }
         
         # Get current price
-        tick = mt5.symbol_info_tick(position.symbol)
+        tick = _tick(position.symbol, ticks)
         if tick is None:
             return {"success": False, "error": "Failed to get current price"}
         
         close_request["price"] = tick.bid if position.type == mt5.ORDER_TYPE_BUY else tick.ask
         
-        # Close position
-        result = mt5.order_send(close_request)
+        # Close position, re-priced on requotes
+        result, attempts, stopped = _execute_market(close_request, "close", source, tick, ticks, max_slippage)
         
+        if result is None:
+            return {"success": False, "error": f"Close failed: {mt5.last_error()}"}
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            return {"success": False, "error": f"Close failed: {result.comment}"}
+            return {"success": False, "error": _execution_error("Close", result, attempts, stopped)}
         
         return {
             "success": True,
             "close_price": result.price,
-            "profit": position.profit
+            "profit": position.profit,
+            "attempts": attempts
         }
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/account_info")
-async def get_account_info():
-    if not mt5_connected:
-        return {"success": False, "error": "MT5 not connected"}
-    
+def _close_order(request: CloseOrderRequest):
     try:
-        account_info = mt5.account_info()
-        if account_info is None:
-            return {"success": False, "error": "Failed to get account info"}
+        # Get position info
+        positions = mt5.positions_get(ticket=request.ticket)
+        if not positions:
+            return {"success": False, "error": "Position not found"}
         
-        return {
-            "success": True,
-            "account_info": {
-                "balance": account_info.balance,
-                "equity": account_info.equity,
-                "margin": account_info.margin,
-                "free_margin": account_info.margin_free,
-                "margin_level": account_info.margin_level
-            }
-        }
+        return _close_position(positions[0], deviation=request.deviation, max_slippage=request.max_slippage_points)
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/positions")
-async def get_positions():
-    if not mt5_connected:
-        return {"success": False, "error": "MT5 not connected"}
-    
+def _place_pending_order(request: PendingOrderRequest, source: str = "api"):
     try:
-        positions = mt5.positions_get()
-        if positions is None:
-            return {"success": True, "positions": []}
-        
-        position_list = []
-        for pos in positions:
-            position_list.append({
-                "ticket": pos.ticket,
-                "symbol": pos.symbol,
-                "type": "BUY" if pos.type == mt5.ORDER_TYPE_BUY else "SELL",
-                "volume": pos.volume,
-                "price_open": pos.price_open,
-                "profit": pos.profit,
-                "swap": pos.swap,
-                "comment": pos.comment
-            })
-        
-        return {"success": True, "positions": position_list}
+        if request.order_type not in PENDING_ORDER_TYPES:
+            return {"success": False, "error": f"Unknown order type {request.order_type}, expected one of "
+                                               f"{', '.join(PENDING_ORDER_TYPES)}"}
+        
+        spec = symbol_cache.require(request.symbol)
+        is_buy = request.order_type.startswith("BUY")
+        price = spec.round_price(request.price)
+        stop_loss = spec.round_price(request.stop_loss) if request.stop_loss else None
+        take_profit = spec.round_price(request.take_profit) if request.take_profit else None
+        spec.check_stops(is_buy, price, stop_loss, take_profit)
+        volume = spec.normalize_volume(request.volume)
+        
+        # Checked as if it filled now; the exposure book picks the fill up on a later snapshot
+        rejection = risk_engine.check(request.symbol, is_buy, volume)
+        if rejection:
+            return {"success": False, "error": f"Risk check failed: {rejection}"}
+        
+        order_request = {
+            "action": mt5.TRADE_ACTION_PENDING,
+            "symbol": request.symbol,
+            "volume": volume,
+            "type": getattr(mt5, f"ORDER_TYPE_{request.order_type}"),
+            "price": price,
+            "magic": request.magic_number,
+            "comment": request.comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": mt5.ORDER_FILLING_RETURN,
+        }
+        if request.expiration:
+            order_request["type_time"] = mt5.ORDER_TIME_SPECIFIED
+            order_request["expiration"] = int(request.expiration)
+        if stop_loss:
+            order_request["sl"] = stop_loss
+        if take_profit:
+            order_request["tp"] = take_profit
+        
+        result = _send_order(order_request, "pending", source)
+        
+        if result is None:
+            return {"success": False, "error": f"Order failed: {mt5.last_error()}"}
+        if result.retcode not in (mt5.TRADE_RETCODE_DONE, mt5.TRADE_RETCODE_PLACED):
+            return {"success": False, "error": f"Order failed: {result.comment}"}
+        
+        return {"success": True, "order_info": {"ticket": result.order, "price": price}}
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def auto_trading_bot():
-    """Auto trading bot logic"""
-    global auto_trading_active, auto_trading_settings
-    
-    logger.info("Auto trading bot started")
-    
-    while auto_trading_active:
-        try:
-            if not mt5_connected:
-                time.sleep(5)
-                continue
-            
-            settings = auto_trading_settings
-            symbol = settings.get("symbol", "EURUSD")
-            lot_size = settings.get("lot_size", 0.01)
-            strategy = settings.get("trading_strategy", "scalping")
-            max_trades = settings.get("max_trades", 5)
-            
-            # Get current positions count
-            positions = mt5.positions_get(symbol=symbol)
-            current_positions = len(positions) if positions else 0
-            
-            # Check if we can place more trades
-            if current_positions >= max_trades:
-                time.sleep(10)
-                continue
-            
-            # Get market data
-            tick = mt5.symbol_info_tick(symbol)
-            if tick is None:
-                time.sleep(5)
-                continue
-            
-            # Simple trading logic based on strategy
-            if strategy == "scalping":
-                # Random scalping strategy (for demo purposes)
-                if random.random() > 0.95:  # 5% chance to trade each cycle
-                    trade_type = "BUY" if random.random() > 0.5 else "SELL"
-                    price = tick.ask if trade_type == "BUY" else tick.bid
-                    
-                    # Calculate SL and TP
-                    pip_value = 0.0001 if "JPY" not in symbol else 0.01
-                    sl_pips = settings.get("stop_loss_pips", 50)
-                    tp_pips = settings.get("take_profit_pips", 100)
-                    
-                    if trade_type == "BUY":
-                        stop_loss = price - (sl_pips * pip_value)
-                        take_profit = price + (tp_pips * pip_value)
-                    else:
-                        stop_loss = price + (sl_pips * pip_value)
-                        take_profit = price - (tp_pips * pip_value)
-                    
-                    # Place order
-                    order_request = {
-                        "action": mt5.TRADE_ACTION_DEAL,
-                        "symbol": symbol,
-                        "volume": lot_size,
-                        "type": mt5.ORDER_TYPE_BUY if trade_type == "BUY" else mt5.ORDER_TYPE_SELL,
-                        "price": price,
-                        "sl": stop_loss,
-                        "tp": take_profit,
-                        "deviation": 20,
-                        "magic": 99999,
-                        "comment": f"Auto Bot - {strategy}",
-                        "type_time": mt5.ORDER_TIME_GTC,
-                        "type_filling": mt5.ORDER_FILLING_IOC,
-                    }
-                    
-                    result = mt5.order_send(order_request)
-                    if result.retcode == mt5.TRADE_RETCODE_DONE:
-                        logger.info(f"Auto trade placed: {trade_type} {lot_size} {symbol} at {price}")
-            
-            # Sleep before next cycle
-            time.sleep(5)
-            
+def _modify_position(request: ModifyPositionRequest, source: str = "api"):
+    try:
+        positions = mt5.positions_get(ticket=request.ticket)
+        if not positions:
+            return {"success": False, "error": "Position not found"}
+        position = positions[0]
+        
+        spec = symbol_cache.require(position.symbol)
+        is_buy = position.type == mt5.ORDER_TYPE_BUY
+        stop_loss = position.sl if request.stop_loss is None else spec.round_price(request.stop_loss)
+        take_profit = position.tp if request.take_profit is None else spec.round_price(request.take_profit)
+        tick = mt5.symbol_info_tick(position.symbol)
+        if tick is None:
+            return {"success": False, "error": "Failed to get current price"}
+        spec.check_stops(is_buy, tick.bid if is_buy else tick.ask, stop_loss or None, take_profit or None)
+        
+        result = _send_order({
+            "action": mt5.TRADE_ACTION_SLTP,
+            "symbol": position.symbol,
+            "position": position.ticket,
+            "sl": stop_loss,
+            "tp": take_profit,
+            "magic": position.magic,
+        }, "modify", source)
+        
+        if result is None:
+            return {"success": False, "error": f"Modify failed: {mt5.last_error()}"}
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            return {"success": False, "error": f"Modify failed: {result.comment}"}
+        
+        trailing_stops.on_modified(position.ticket, stop_loss, take_profit)
+        return {"success": True, "ticket": position.ticket, "stop_loss": stop_loss, "take_profit": take_profit}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def _modify_order(request: ModifyOrderRequest):
+    try:
+        orders = mt5.orders_get(ticket=request.ticket)
+        if not orders:
+            return {"success": False, "error": "Order not found"}
+        order = orders[0]
+        
+        spec = symbol_cache.require(order.symbol)
+        is_buy = _order_side(order.type) == "BUY"
+        price = order.price_open if request.price is None else spec.round_price(request.price)
+        stop_loss = order.sl if request.stop_loss is None else spec.round_price(request.stop_loss)
+        take_profit = order.tp if request.take_profit is None else spec.round_price(request.take_profit)
+        spec.check_stops(is_buy, price, stop_loss or None, take_profit or None)
+        expiration = order.time_expiration if request.expiration is None else int(request.expiration)
+        
+        result = _send_order({
+            "action": mt5.TRADE_ACTION_MODIFY,
+            "symbol": order.symbol,
+            "order": order.ticket,
+            "type": order.type,
+            "price": price,
+            "sl": stop_loss,
+            "tp": take_profit,
+            "type_time": mt5.ORDER_TIME_SPECIFIED if expiration else mt5.ORDER_TIME_GTC,
+            "expiration": expiration,
+        }, "modify", "api")
+        
+        if result is None:
+            return {"success": False, "error": f"Modify failed: {mt5.last_error()}"}
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            return {"success": False, "error": f"Modify failed: {result.comment}"}
+        
+        return {"success": True, "ticket": order.ticket, "price": price, "stop_loss": stop_loss,
+                "take_profit": take_profit, "expiration": expiration}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def _cancel_orders(tickets: Optional[List[int]] = None, source: str = "api"):
+    started = time.perf_counter()
+    try:
+        orders = mt5.orders_get() or ()
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    
+    by_ticket = {order.ticket: order for order in orders}
+    results = []
+    for ticket in (tickets if tickets is not None else list(by_ticket)):
+        order = by_ticket.get(ticket)
+        if order is None:
+            results.append({"ticket": ticket, "success": False, "error": "Order not found", "latency_ms": 0.0})
+            continue
+        sent = time.perf_counter()
+        try:
+            result = _send_order({"action": mt5.TRADE_ACTION_REMOVE, "order": ticket, "symbol": order.symbol,
+                                  "type": order.type, "magic": order.magic}, "cancel", source)
+            if result is None:
+                outcome = {"success": False, "error": f"Cancel failed: {mt5.last_error()}"}
+            elif result.retcode == mt5.TRADE_RETCODE_DONE:
+                outcome = {"success": True}
+            else:
+                outcome = {"success": False, "error": f"Cancel failed: {result.comment}"}
+        except Exception as e:
+            outcome = {"success": False, "error": str(e)}
+        results.append({"ticket": ticket, **outcome, "latency_ms": round((time.perf_counter() - sent) * 1000, 3)})
+    return _batch_response(results, started)
+
+def _order_dict(order) -> Dict[str, Any]:
+    names = {getattr(mt5, f"ORDER_TYPE_{name}"): name for name in PENDING_ORDER_TYPES}
+    return {
+        "ticket": order.ticket,
+        "symbol": order.symbol,
+        "type": names.get(order.type, str(order.type)),
+        "volume": order.volume_current,
+        "price_open": order.price_open,
+        "price_current": order.price_current,
+        "sl": order.sl,
+        "tp": order.tp,
+        "expiration": order.time_expiration or None,
+        "magic": order.magic,
+        "comment": order.comment
+    }
+
+def _pending_orders():
+    orders = mt5.orders_get()
+    if orders is None:
+        return {"success": False, "error": f"Failed to get orders: {mt5.last_error()}"}
+    return {"success": True, "orders": [_order_dict(order) for order in orders]}
+
+def _timed(fn, *args) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = fn(*args)
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+def _batch_response(results: list, started: float) -> Dict[str, Any]:
+    failed = sum(1 for result in results if not result["success"])
+    return {
+        "success": failed == 0,
+        "succeeded": len(results) - failed,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        "results": results
+    }
+
+def _place_orders(requests: List[OrderRequest]):
+    # One executor job for the whole basket: one tick per symbol, back-to-back sends
+    started = time.perf_counter()
+    ticks = {}
+    results = [_timed(_place_order, request, ticks, "batch") for request in requests]
+    return _batch_response(results, started)
+
+def _close_positions(tickets: Optional[List[int]] = None, symbol: Optional[str] = None, magic: Optional[int] = None):
+    # Positions are read once and ticks once per symbol for the whole batch
+    started = time.perf_counter()
+    try:
+        positions = mt5.positions_get() or ()
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    
+    by_ticket = {position.ticket: position for position in positions}
+    if tickets is None:
+        tickets = [
+            position.ticket for position in positions
+            if (symbol is None or position.symbol == symbol) and (magic is None or position.magic == magic)
+        ]
+    
+    ticks = {}
+    results = []
+    for ticket in tickets:
+        position = by_ticket.get(ticket)
+        if position is None:
+            result = {"success": False, "error": "Position not found", "latency_ms": 0.0}
+        else:
+            result = _timed(_close_position, position, ticks, "batch")
+        results.append({"ticket": ticket, **result})
+    return _batch_response(results, started)
+
+def _account_dict(account_info) -> Dict[str, Any]:
+    return {
+        "balance": account_info.balance,
+        "equity": account_info.equity,
+        "margin": account_info.margin,
+        "free_margin": account_info.margin_free,
+        "margin_level": account_info.margin_level
+    }
+
+POSITION_FIELDS = ("ticket", "symbol", "type", "volume", "price_open", "sl", "tp", "profit", "swap", "magic", "comment")
+
+def _position_dict(pos) -> Dict[str, Any]:
+    return {
+        "ticket": pos.ticket,
+        "symbol": pos.symbol,
+        "type": "BUY" if pos.type == mt5.ORDER_TYPE_BUY else "SELL",
+        "volume": pos.volume,
+        "price_open": pos.price_open,
+        "sl": pos.sl,
+        "tp": pos.tp,
+        "profit": pos.profit,
+        "swap": pos.swap,
+        "magic": pos.magic,
+        "comment": pos.comment
+    }
+
+class SnapshotCache:
+    """Latest account and position state, shared by every poller.
+
+    A background refresher reads the terminal every `interval` seconds no
+    matter how many clients poll /account_info and /positions. After an
+    order or close the cache is invalidated and the next reader waits for one
+    coalesced refresh, so fills show up immediately.
+    """
+
+    def __init__(self, executor: MT5Executor, interval: float):
+        self.executor = executor
+        self.interval = interval
+        self.account = None
+        self.positions = []
+        self.version = 0
+        self.updated_at = 0.0
+        self.error = None
+        self._dirty = True
+        self._pending = None
+        self._columns = (0, None)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mt5-snapshot", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not mt5_connected:
+                continue
+            try:
+                self.request_refresh().result()
+            except Exception as e:
+                logger.error(f"Snapshot refresh error: {e}")
+
+    def _refresh(self):
+        # Runs on the MT5 executor thread
+        with self._lock:
+            self._dirty = False
+        account_info = mt5.account_info()
+        positions = mt5.positions_get()
+        with self._lock:
+            if account_info is None:
+                self.error = "Failed to get account info"
+            else:
+                self.account = _account_dict(account_info)
+                self.error = None
+            self.positions = [_position_dict(pos) for pos in positions] if positions else []
+            self.version += 1
+            self.updated_at = time.time()
+        exposure_book.reconcile(self.positions, self.account)
+
+    def request_refresh(self) -> Future:
+        """Start a refresh, or join the one already queued"""
+        with self._lock:
+            if self._pending is None or self._pending.done():
+                self._pending = self.executor.submit(self._refresh, lane="read")
+            return self._pending
+
+    def invalidate(self):
+        with self._lock:
+            self._dirty = True
+        self._wake.set()
+
+    async def latest(self) -> Dict[str, Any]:
+        if self._dirty or self.version == 0:
+            await asyncio.wrap_future(self.request_refresh())
+        return self._view()
+
+    def peek(self) -> Dict[str, Any]:
+        """The latest view as it is, without waiting for a refresh"""
+        return self._view()
+
+    def current(self) -> Dict[str, Any]:
+        """Blocking variant of latest() for worker threads"""
+        if self._dirty or self.version == 0:
+            self.request_refresh().result()
+        return self._view()
+
+    def position_columns(self, view: Dict[str, Any]) -> Dict[str, list]:
+        """Columnar positions of a view, transposed once per snapshot version"""
+        version = view["snapshot"]["version"]
+        cached_version, columns = self._columns
+        if cached_version != version or columns is None:
+            columns = to_columns(view["positions"], POSITION_FIELDS)
+            self._columns = (version, columns)
+        return columns
+
+    def _view(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "account": self.account,
+                "positions": self.positions,
+                "error": self.error,
+                "snapshot": {
+                    "version": self.version,
+                    "age_ms": round((time.time() - self.updated_at) * 1000, 1)
+                }
+            }
+
+snapshot_cache = SnapshotCache(mt5_executor, SNAPSHOT_REFRESH_INTERVAL)
+
+# Supabase sync
+#
+# The bridge keeps mt5_connected_accounts up to date itself. Every window
+# the account snapshot is compared with what was last pushed and only the
+# changed columns are upserted; a row that has not moved is re-sent once per
+# heartbeat so last_sync and is_connected stay fresh. Pending upserts and
+# sync log rows live in a SQLite outbox until Supabase accepts them, so
+# nothing is lost while offline.
+
+SYNC_WRITES = metrics.counter("bridge_sync_requests_total", "Supabase sync requests by table and outcome",
+                              ("table", "outcome"))
+SYNC_LATENCY = metrics.histogram("bridge_sync_request_seconds", "Supabase sync request latency", ("table",))
+
+SYNC_OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+"""
+
+# Snapshot fields are compared at the precision the dashboard shows
+SYNC_PRECISION = {"balance": 2, "equity": 2, "margin": 2, "free_margin": 2, "margin_level": 1}
+
+class SupabaseSync:
+    """Delta-only, batched account sync to Supabase's REST API"""
+
+    def __init__(self, url: str, key: str, user_id: str, outbox_path: str, window: float, heartbeat: float,
+                 log_batch: int = 50):
+        self.url = url.rstrip("/")
+        self.key = key
+        self.user_id = user_id
+        self.outbox_path = outbox_path
+        self.window = window
+        self.heartbeat = heartbeat
+        self.log_batch = log_batch
+        self.account_id = None
+        self.pushed = {}
+        self.last_push = 0.0
+        self.last_error = None
+        self.requests = 0
+        self._identity = None
+        self._static = {}
+        self._backoff = 0.0
+        self._failures = 0
+        self._last_log_flush = 0.0
+        self._client = None
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url and self.key and self.user_id)
+
+    def start(self, account_number: int, server: str, account_info: Dict[str, Any]):
+        """Begin syncing the account that /connect just logged in to"""
+        self._identity = {"user_id": self.user_id, "account_number": account_number, "server": server}
+        self._static = {
+            "account_name": account_info.get("name"),
+            "broker": account_info.get("company"),
+            "currency": account_info.get("currency"),
+            "leverage": account_info.get("leverage"),
+        }
+        self.pushed = {}
+        self.account_id = None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="supabase-sync", daemon=True)
+            self._thread.start()
+
+    def _outbox(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.outbox_path)), exist_ok=True)
+        connection = sqlite3.connect(self.outbox_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SYNC_OUTBOX_SCHEMA)
+        return connection
+
+    def _http(self):
+        if self._client is None:
+            import httpx
+            headers = {"apikey": self.key, "Authorization": f"Bearer {self.key}", "Content-Type": "application/json"}
+            try:
+                # One pooled connection for every request; HTTP/2 when the h2 package is installed
+                self._client = httpx.Client(http2=True, headers=headers, timeout=10.0)
+            except ImportError:
+                self._client = httpx.Client(headers=headers, timeout=10.0)
+        return self._client
+
+    def _run(self):
+        outbox = self._outbox()
+        while True:
+            time.sleep(self.window + self._backoff)
+            try:
+                self._collect(outbox)
+                self._flush(outbox)
+                self._backoff = 0.0
+                self._failures = 0
+                self.last_error = None
+            except Exception as e:
+                # Jittered exponential backoff; the outbox keeps everything for the next attempt
+                self._failures += 1
+                self._backoff = min(60.0, self.window * 2 ** self._failures) * random.uniform(0.5, 1.0)
+                self.last_error = str(e)
+                logger.error(f"Supabase sync failed, retrying in {self.window + self._backoff:.1f}s: {e}")
+
+    def _collect(self, outbox: sqlite3.Connection):
+        """Queue the columns that changed since the last push"""
+        if self._identity is None:
+            return
+        row = dict(self._static, is_connected=mt5_connected)
+        account = snapshot_cache.current()["account"] if mt5_connected else None
+        if account is not None:
+            row.update({key: round(account[key], digits) for key, digits in SYNC_PRECISION.items()})
+        delta = {key: value for key, value in row.items() if self.pushed.get(key) != value}
+        if not delta and time.time() - self.last_push < self.heartbeat:
+            return
+        with outbox:
+            outbox.execute("INSERT INTO sync_outbox (kind, body) VALUES ('account', ?)", (json.dumps(delta),))
+        self.pushed.update(delta)
+        self.last_push = time.time()
+
+    def _post(self, table: str, path: str, body, prefer: str):
+        started = time.perf_counter()
+        try:
+            response = self._http().post(f"{self.url}/rest/v1/{path}", json=body, headers={"Prefer": prefer})
+            response.raise_for_status()
+        except Exception:
+            SYNC_WRITES.inc((table, "error"))
+            raise
+        finally:
+            SYNC_LATENCY.observe(time.perf_counter() - started, (table,))
+        self.requests += 1
+        SYNC_WRITES.inc((table, "ok"))
+        return response, (time.perf_counter() - started) * 1000
+
+    def _flush(self, outbox: sqlite3.Connection):
+        rows = outbox.execute("SELECT id, kind, body FROM sync_outbox ORDER BY id").fetchall()
+        updates = [(row_id, json.loads(body)) for row_id, kind, body in rows if kind == "account"]
+        if updates:
+            # Everything queued while offline collapses into one upsert of the newest values
+            merged = dict(self._identity, last_sync=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+            for _, delta in updates:
+                merged.update(delta)
+            response, duration_ms = self._post(
+                "mt5_connected_accounts", "mt5_connected_accounts?on_conflict=user_id,account_number,server",
+                [merged], "resolution=merge-duplicates,return=representation")
+            saved = response.json()
+            if saved:
+                self.account_id = saved[0].get("id", self.account_id)
+            log = {"sync_status": "success", "sync_data": merged, "sync_duration_ms": int(round(duration_ms))}
+            with outbox:
+                outbox.executemany("DELETE FROM sync_outbox WHERE id = ?", [(row_id,) for row_id, _ in updates])
+                outbox.execute("INSERT INTO sync_outbox (kind, body) VALUES ('log', ?)", (json.dumps(log),))
+
+        logs = outbox.execute("SELECT id, body FROM sync_outbox WHERE kind = 'log' ORDER BY id").fetchall()
+        due = len(logs) >= self.log_batch or time.time() - self._last_log_flush >= self.heartbeat
+        if logs and self.account_id and due:
+            body = [dict(json.loads(log), account_id=self.account_id) for _, log in logs]
+            self._post("account_sync_logs", "account_sync_logs", body, "return=minimal")
+            with outbox:
+                outbox.executemany("DELETE FROM sync_outbox WHERE id = ?", [(row_id,) for row_id, _ in logs])
+            self._last_log_flush = time.time()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self._thread is not None,
+            "account_id": self.account_id,
+            "requests": self.requests,
+            "last_error": self.last_error
+        }
+
+supabase_sync = SupabaseSync(SUPABASE_URL, SUPABASE_KEY, SYNC_USER_ID, JOURNAL_PATH, SYNC_WINDOW, SYNC_HEARTBEAT)
+
+# Session supervisor
+#
+# Heartbeats the terminal through the executor and, after consecutive
+# failures, logs back in with the credentials of the last /connect. While a
+# reconnect is under way handlers hold new calls for up to
+# RECONNECT_HOLD seconds and then fail them fast instead of letting them hang.
+#
+# The heartbeat shares the terminal thread with real work, so a heartbeat
+# still queued behind a slow call (a long order_send, /close_all over many
+# positions, a large history read) is not a miss: only a heartbeat that
+# itself ran past the timeout, or a terminal reporting itself disconnected,
+# counts towards a reconnect.
+
+SESSION_RECONNECTS = metrics.counter("bridge_mt5_reconnects_total", "Terminal reconnect attempts by outcome",
+                                     ("outcome",))
+SESSION_OUTAGE = metrics.histogram("bridge_mt5_outage_seconds", "Detected disconnect to restored session",
+                                   buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0))
+SESSION_DOWNTIME = metrics.counter("bridge_mt5_downtime_seconds_total", "Seconds spent without a terminal session")
+
+class SessionSupervisor:
+    """Detects dropped terminal sessions and reconnects with jittered backoff"""
+
+    def __init__(self, executor: MT5Executor, interval: float, timeout: float, max_failures: int, hold: float,
+                 base_backoff: float = 0.25, max_backoff: float = 10.0):
+        self.executor = executor
+        self.interval = interval
+        self.timeout = timeout
+        self.max_failures = max_failures
+        self.hold = hold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = "disconnected"
+        self.outages = 0
+        self.reconnect_attempts = 0
+        self.last_outage_seconds = None
+        self.last_error = None
+        self._credentials = None
+        self._wake = threading.Event()
+        self._thread = None
+        self.reconnect_timeout = max(timeout, 30.0)
+        self._pending = None
+        self._beat_started = None
+
+    def start(self, credentials: ConnectionRequest):
+        self._credentials = credentials
+        self.state = "connected"
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mt5-session", daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Check the session now, e.g. after an order failed for lack of connection"""
+        self._wake.set()
+
+    def _beat(self) -> bool:
+        # Runs on the MT5 executor thread
+        self._beat_started = time.monotonic()
+        info = mt5.terminal_info()
+        return info is not None and bool(info.connected)
+
+    def _heartbeat(self) -> Optional[bool]:
+        """Whether the session is healthy, or None while the heartbeat waits behind other terminal work"""
+        # A heartbeat that timed out is waited on again rather than queueing another behind it
+        if self._pending is None or self._pending.done():
+            self._beat_started = None
+            self._pending = self.executor.submit(self._beat, lane="close")
+        try:
+            return self._pending.result(timeout=self.timeout)
+        except FutureTimeout:
+            started = self._beat_started
+            if started is None or time.monotonic() - started < self.timeout:
+                return None
+            self.last_error = f"Heartbeat timed out after {self.timeout}s"
         except Exception as e:
-            logger.error(f"Auto trading error: {e}")
-            time.sleep(10)
+            self.last_error = str(e)
+        return False
+
+    def _run(self):
+        failures = 0
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            healthy = self._heartbeat()
+            if healthy is None:
+                continue
+            failures = 0 if healthy else failures + 1
+            if failures >= self.max_failures:
+                self._recover()
+                failures = 0
+
+    def _reconnect(self) -> Dict[str, Any]:
+        # Runs on the MT5 executor thread
+        mt5.shutdown()
+        return _connect(self._credentials)
+
+    def _recover(self):
+        global mt5_connected
+        down_at = time.monotonic()
+        mt5_connected = False
+        self.state = "reconnecting"
+        self.outages += 1
+        logger.error(f"MT5 session lost ({self.last_error or 'terminal disconnected'}), reconnecting")
+        attempt = 0
+        pending = None
+        while True:
+            if pending is None:
+                self.reconnect_attempts += 1
+                pending = self.executor.submit(self._reconnect, lane="close")
+            try:
+                result = pending.result(timeout=self.reconnect_timeout)
+                pending = None
+            except FutureTimeout:
+                # Still queued: withdraw it, or it would tear down the session a later attempt
+                # restored. Already running: wait on it again rather than queueing another
+                if pending.cancel():
+                    pending = None
+                result = {"success": False, "error": f"Reconnect timed out after {self.reconnect_timeout}s"}
+            except Exception as e:
+                pending = None
+                result = {"success": False, "error": str(e)}
+            if result["success"]:
+                break
+            SESSION_RECONNECTS.inc(("failed",))
+            self.last_error = result["error"]
+            attempt += 1
+            time.sleep(min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(0.5, 1.0))
+        outage = time.monotonic() - down_at
+        SESSION_RECONNECTS.inc(("ok",))
+        SESSION_OUTAGE.observe(outage)
+        SESSION_DOWNTIME.inc((), outage)
+        self.last_outage_seconds = round(outage, 3)
+        self.state = "connected"
+        snapshot_cache.invalidate()
+        logger.info(f"MT5 session restored after {outage:.2f}s ({attempt + 1} attempts)")
+
+    async def check(self) -> Optional[Dict[str, Any]]:
+        """None when the session is usable, otherwise the error response for the handler"""
+        if mt5_connected:
+            return None
+        if self.state == "reconnecting":
+            deadline = time.monotonic() + self.hold
+            while self.state == "reconnecting" and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            if mt5_connected:
+                return None
+            return {"success": False, "error": "MT5 reconnecting, retry shortly"}
+        return {"success": False, "error": "MT5 not connected"}
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "outages": self.outages,
+            "reconnect_attempts": self.reconnect_attempts,
+            "last_outage_seconds": self.last_outage_seconds,
+            "last_error": self.last_error
+        }
+
+session_supervisor = SessionSupervisor(mt5_executor, HEARTBEAT_INTERVAL, HEARTBEAT_TIMEOUT, HEARTBEAT_FAILURES,
+                                       RECONNECT_HOLD)
+
+STREAM_TOPICS = ("ticks", "positions", "account")
+
+def _read_ticks(symbols):
+    # Runs on the MT5 executor thread: one queue hop for every streamed symbol
+    return {symbol: mt5.symbol_info_tick(symbol) for symbol in symbols}
+
+def _merge_position_deltas(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a newer positions delta into one the client has not received yet"""
+    added = {pos["ticket"]: dict(pos) for pos in old["added"]}
+    changed = {fields["ticket"]: dict(fields) for fields in old["changed"]}
+    closed = set(old["closed"])
+    for pos in new["added"]:
+        closed.discard(pos["ticket"])
+        changed.pop(pos["ticket"], None)
+        added[pos["ticket"]] = dict(pos)
+    for fields in new["changed"]:
+        target = added.get(fields["ticket"]) or changed.setdefault(fields["ticket"], {})
+        target.update(fields)
+    for ticket in new["closed"]:
+        changed.pop(ticket, None)
+        if added.pop(ticket, None) is None:
+            closed.add(ticket)
+    return {"topic": "positions", "added": list(added.values()), "changed": list(changed.values()), "closed": sorted(closed)}
+
+def _merge_account_deltas(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    return {"topic": "account", "changed": {**old["changed"], **new["changed"]}}
+
+class StreamSubscriber:
+    """One /ws client.
+
+    Outgoing messages are kept in one slot per topic (per symbol for ticks).
+    A slow client never builds a backlog: a newer message replaces or is
+    merged into the one still waiting, and the drop is counted.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.topics = set()
+        self.symbols = set()
+        self.pending = {}
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, key, message, merge=None):
+        if key in self.pending:
+            self.dropped += 1
+            if merge is not None:
+                message = merge(self.pending[key], message)
+        self.pending[key] = message
+        self.ready.set()
+
+    async def send_loop(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            pending, self.pending = self.pending, {}
+            for message in pending.values():
+                await self.websocket.send_json(message)
+
+class StreamHub:
+    """Single producer loop that fans deltas out to every /ws subscriber.
+
+    Ticks for the union of subscribed symbols are read in one executor call
+    per cycle, and positions/account are diffed from the shared snapshot
+    cache whenever its version changes, so terminal load does not grow with
+    the number of clients and account reads stay at one per
+    SNAPSHOT_REFRESH_INTERVAL (plus one after each fill).
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.subscribers = set()
+        self.ticks = {}
+        self.positions = {}
+        self.account = {}
+        self.snapshot_version = 0
+        self._task = None
+
+    def subscribe(self, subscriber: StreamSubscriber, topics, symbols):
+        new_topics = set(topics) - subscriber.topics
+        new_symbols = set(symbols) - subscriber.symbols
+        subscriber.topics |= set(topics)
+        subscriber.symbols |= set(symbols)
+        self.subscribers.add(subscriber)
+
+        # Bring the client up to date; deltas follow from the producer
+        if "ticks" in subscriber.topics:
+            resend = subscriber.symbols if "ticks" in new_topics else new_symbols
+            for symbol in resend:
+                if symbol in self.ticks:
+                    subscriber.push(("tick", symbol), {"topic": "tick", "symbol": symbol, **self.ticks[symbol]})
+        if "positions" in new_topics:
+            subscriber.push(("positions",), {"topic": "positions", "added": list(self.positions.values()), "changed": [], "closed": []},
+                            _merge_position_deltas)
+        if "account" in new_topics and self.account:
+            subscriber.push(("account",), {"topic": "account", "changed": dict(self.account)}, _merge_account_deltas)
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._produce())
+
+    def unsubscribe(self, subscriber: StreamSubscriber, topics, symbols):
+        subscriber.topics -= set(topics)
+        subscriber.symbols -= set(symbols)
+
+    def remove(self, subscriber: StreamSubscriber):
+        self.subscribers.discard(subscriber)
+
+    async def _produce(self):
+        try:
+            while self.subscribers:
+                started = time.perf_counter()
+                try:
+                    if mt5_connected:
+                        await self._publish()
+                except Exception as e:
+                    logger.error(f"Stream producer error: {e}")
+                await asyncio.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+        finally:
+            self._task = None
+
+    async def _publish(self):
+        subscribers = list(self.subscribers)
+
+        symbols = set()
+        for subscriber in subscribers:
+            if "ticks" in subscriber.topics:
+                symbols |= subscriber.symbols
+        if symbols:
+            ticks = await mt5_executor.run(_read_ticks, tuple(sorted(symbols)), lane="read", coalesce=True)
+            for symbol, tick in ticks.items():
+                if tick is None:
+                    continue
+                quote = {"bid": tick.bid, "ask": tick.ask, "last": tick.last, "time_msc": tick.time_msc}
+                if self.ticks.get(symbol) == quote:
+                    continue
+                self.ticks[symbol] = quote
+                message = {"topic": "tick", "symbol": symbol, **quote}
+                for subscriber in subscribers:
+                    if "ticks" in subscriber.topics and symbol in subscriber.symbols:
+                        subscriber.push(("tick", symbol), message)
+
+        if not any("positions" in s.topics or "account" in s.topics for s in subscribers):
+            return
+        snapshot = await snapshot_cache.latest()
+        if snapshot["snapshot"]["version"] == self.snapshot_version:
+            return
+        self.snapshot_version = snapshot["snapshot"]["version"]
+
+        positions = {pos["ticket"]: pos for pos in snapshot["positions"]}
+        added = [pos for ticket, pos in positions.items() if ticket not in self.positions]
+        closed = [ticket for ticket in self.positions if ticket not in positions]
+        changed = []
+        for ticket, pos in positions.items():
+            previous = self.positions.get(ticket)
+            if previous is not None and previous != pos:
+                fields = {key: value for key, value in pos.items() if previous.get(key) != value}
+                changed.append({"ticket": ticket, **fields})
+        self.positions = positions
+        if added or changed or closed:
+            message = {"topic": "positions", "added": added, "changed": changed, "closed": closed}
+            for subscriber in subscribers:
+                if "positions" in subscriber.topics:
+                    subscriber.push(("positions",), message, _merge_position_deltas)
+
+        account = snapshot["account"] or {}
+        account_changed = {key: value for key, value in account.items() if self.account.get(key) != value}
+        self.account = dict(account)
+        if account_changed:
+            message = {"topic": "account", "changed": account_changed}
+            for subscriber in subscribers:
+                if "account" in subscriber.topics:
+                    subscriber.push(("account",), message, _merge_account_deltas)
+
+stream_hub = StreamHub(STREAM_INTERVAL)
+
+# Request handlers: the terminal work above runs on the MT5 executor thread
+@app.post("/connect")
+async def connect_mt5(request: ConnectionRequest):
+    if request.account_id:
+        return await account_pool.connect(request.account_id, request)
+    
+    result = await mt5_executor.run(_connect, request)
+    if result["success"]:
+        session_supervisor.start(request)
+        snapshot_cache.invalidate()
+        snapshot_cache.start()
+        if RECORD_SYMBOLS:
+            market_data_recorder.start(RECORD_SYMBOLS)
+        if TICK_FEED_SYMBOLS:
+            tick_feed.start(TICK_FEED_SYMBOLS)
+        if supabase_sync.enabled:
+            supabase_sync.start(request.account_number, request.server, result["account_info"])
+    return result
+
+@app.post("/place_order")
+async def place_order(request: OrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "place_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    async def run():
+        result = await mt5_executor.run(_place_order, request)
+        snapshot_cache.invalidate()
+        return result
+    
+    return await _idempotent(request, run)
+
+@app.post("/close_order")
+async def close_order(request: CloseOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "close_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    async def run():
+        result = await mt5_executor.run(_close_order, request, lane="close")
+        snapshot_cache.invalidate()
+        return result
+    
+    return await _idempotent(request, run)
+
+@app.post("/place_orders")
+async def place_orders(request: PlaceOrdersRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "place_orders", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    result = await mt5_executor.run(_place_orders, request.orders)
+    snapshot_cache.invalidate()
+    return result
+
+@app.post("/close_orders")
+async def close_orders(request: CloseOrdersRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "close_orders", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    result = await mt5_executor.run(_close_positions, request.tickets, lane="close")
+    snapshot_cache.invalidate()
+    return result
+
+@app.post("/close_all")
+async def close_all(request: CloseAllRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "close_all", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    result = await mt5_executor.run(_close_positions, None, request.symbol, request.magic_number, lane="close")
+    snapshot_cache.invalidate()
+    return result
+
+@app.post("/place_pending_order")
+async def place_pending_order(request: PendingOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "place_pending_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    async def run():
+        return await mt5_executor.run(_place_pending_order, request)
+    
+    return await _idempotent(request, run)
+
+@app.post("/modify_position")
+async def modify_position(request: ModifyPositionRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "modify_position", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    result = await mt5_executor.run(_modify_position, request, lane="close")
+    snapshot_cache.invalidate()
+    return result
+
+@app.post("/modify_order")
+async def modify_order(request: ModifyOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "modify_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    return await mt5_executor.run(_modify_order, request)
+
+@app.post("/cancel_order")
+async def cancel_order(request: CancelOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "cancel_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    result = await mt5_executor.run(_cancel_orders, [request.ticket], lane="close")
+    return result["results"][0] if result.get("results") else result
+
+@app.post("/orders")
+async def get_orders(request: Optional[AccountRequest] = None):
+    if request is not None and request.account_id:
+        return await account_pool.run(request.account_id, "orders", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    return await mt5_executor.run(_pending_orders, lane="read", coalesce=True)
+
+@app.post("/account_info")
+async def get_account_info(request: Optional[AccountRequest] = None):
+    if request is not None and request.account_id:
+        return await account_pool.run(request.account_id, "account_info", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    try:
+        snapshot = await snapshot_cache.latest()
+        if snapshot["account"] is None:
+            return {"success": False, "error": snapshot["error"]}
+        
+        return {"success": True, "account_info": snapshot["account"], "snapshot": snapshot["snapshot"]}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/positions")
+async def get_positions(request: Optional[AccountRequest] = None, accept: Optional[str] = Header(None)):
+    if request is not None and request.account_id:
+        result = await account_pool.run(request.account_id, "positions", request)
+        return table_response(result, "positions", POSITION_FIELDS, accept)
+    result = await _positions(request)
+    return table_response(result, "positions", POSITION_FIELDS, accept,
+                          columns=lambda: snapshot_cache.position_columns(result))
+
+async def _positions(request: Optional[AccountRequest] = None):
+    # Rows only; get_positions encodes them in the format the client asked for
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    try:
+        snapshot = await snapshot_cache.latest()
+        return {"success": True, "positions": snapshot["positions"], "snapshot": snapshot["snapshot"]}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+HISTORY_FIELDS = ("id",) + JOURNAL_COLUMNS
+
+@app.post("/history")
+async def get_history(request: HistoryRequest, accept: Optional[str] = Header(None)):
+    if request.account_id:
+        result = await account_pool.run(request.account_id, "history", request)
+    else:
+        result = await _history(request)
+    return table_response(result, "entries", HISTORY_FIELDS, accept)
+
+async def _history(request: HistoryRequest):
+    # Rows only; get_history encodes them in the format the client asked for
+    try:
+        # Served from the local journal; the terminal is never asked for deal history
+        entries, next_cursor = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: trade_journal.query(
+                ticket=request.ticket, symbol=request.symbol, magic=request.magic_number, since=request.since,
+                until=request.until, cursor=request.cursor, limit=max(1, min(request.limit, 1000))))
+        return {"success": True, "entries": entries, "next_cursor": next_cursor}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/execution_stats")
+async def get_execution_stats(request: Optional[ExecutionStatsRequest] = None):
+    request = request or ExecutionStatsRequest()
+    if request.account_id:
+        return await account_pool.run(request.account_id, "execution_stats", request)
+    
+    try:
+        filters = {"symbol": request.symbol, "magic": request.magic_number, "since": request.since,
+                   "until": request.until}
+        if request.source == "journal":
+            records = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: trade_journal.executions(**filters))
+        elif request.source == "memory":
+            records = execution_stats.records(**filters)
+        else:
+            return {"success": False, "error": f"Unknown source {request.source}, expected memory or journal"}
+        return {"success": True, "source": request.source, **summarize_executions(records, request.group_by)}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+# Account workers
+#
+# The MetaTrader5 API holds one terminal session per process, so each extra
+# account gets its own worker process running this same module. Requests
+# that carry an account_id are sent to that account's worker over a pipe and
+# run there by the same handlers that serve the default, in-process session.
+# Each worker writes its own trade journal (account_journal_path), so
+# /history and /execution_stats for an account_id only see its orders.
+# A monitor pings every worker and restarts (and re-logs in) any that died
+# or stopped answering.
+
+ACCOUNT_WORKER_RESTARTS = metrics.counter("bridge_account_worker_restarts_total", "Account worker restarts",
+                                          ("account",))
+
+async def _worker_ping(request=None):
+    return {"success": True, "pid": os.getpid(), "mt5_connected": mt5_connected}
+
+# op: (handler, request model or None)
+ACCOUNT_OPS = {
+    "connect": (connect_mt5, ConnectionRequest),
+    "place_order": (place_order, OrderRequest),
+    "close_order": (close_order, CloseOrderRequest),
+    "place_orders": (place_orders, PlaceOrdersRequest),
+    "close_orders": (close_orders, CloseOrdersRequest),
+    "close_all": (close_all, CloseAllRequest),
+    "account_info": (get_account_info, AccountRequest),
+    "positions": (_positions, AccountRequest),
+    "place_pending_order": (place_pending_order, PendingOrderRequest),
+    "modify_position": (modify_position, ModifyPositionRequest),
+    "modify_order": (modify_order, ModifyOrderRequest),
+    "cancel_order": (cancel_order, CancelOrderRequest),
+    "orders": (get_orders, AccountRequest),
+    "history": (_history, HistoryRequest),
+    "execution_stats": (get_execution_stats, ExecutionStatsRequest),
+    "ping": (_worker_ping, None),
+}
+
+def _account_worker_main(conn, backend: str, account_id: str):
+    """Entry point of an account worker process"""
+    mt5.use(load_backend(backend))
+    # Each account keeps its own trade journal and sync outbox
+    trade_journal.path = account_journal_path(account_id)
+    supabase_sync.outbox_path = f"{os.path.splitext(trade_journal.path)[0]}-outbox.db"
+    loop = asyncio.new_event_loop()
+    send_lock = threading.Lock()
+
+    async def handle(request_id, op, payload):
+        try:
+            handler, model = ACCOUNT_OPS[op]
+            request = None
+            if model is not None:
+                request = model(**payload)
+                # Already routed: run against this process's own session
+                request.account_id = None
+            result = await handler(request)
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        with send_lock:
+            conn.send((request_id, result))
+
+    def read():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                loop.call_soon_threadsafe(loop.stop)
+                return
+            loop.call_soon_threadsafe(lambda m=message: loop.create_task(handle(*m)))
+
+    threading.Thread(target=read, name="account-worker-ipc", daemon=True).start()
+    loop.run_forever()
+    os._exit(0)
+
+class AccountWorker:
+    """Main-process handle on one account worker process"""
+
+    def __init__(self, account_id: str, backend: str, connect_payload: Dict[str, Any]):
+        self.account_id = account_id
+        self.backend = backend
+        self.connect_payload = connect_payload
+        self.restarts = 0
+        self.last_ping_ms = None
+        self.mt5_connected = False
+        self.process = None
+        self._conn = None
+        self._futures = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        parent, child = context.Pipe()
+        self.process = context.Process(target=_account_worker_main, args=(child, self.backend, self.account_id),
+                                       name=f"mt5-account-{self.account_id}", daemon=True)
+        self.process.start()
+        child.close()
+        self._conn = parent
+        # Each process gets its own table of outstanding calls, failed as a whole when it exits
+        self._futures = {}
+        threading.Thread(target=self._read, args=(parent, self._futures), name=f"account-{self.account_id}-ipc",
+                         daemon=True).start()
+
+    def _read(self, conn, futures: Dict[int, Future]):
+        while True:
+            try:
+                request_id, result = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = futures.pop(request_id, None)
+            if future is not None:
+                future.set_result(result)
+        # The process is gone: nothing in flight will ever be answered
+        with self._lock:
+            pending = list(futures.values())
+            futures.clear()
+        for future in pending:
+            future.set_result({"success": False, "error": f"Account worker {self.account_id} exited"})
+
+    def submit(self, op: str, payload: Optional[Dict[str, Any]] = None) -> Future:
+        future = Future()
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            futures = self._futures
+            futures[request_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send((request_id, op, payload or {}))
+        except (OSError, ValueError) as e:
+            with self._lock:
+                futures.pop(request_id, None)
+            future.set_result({"success": False, "error": f"Account worker {self.account_id} unavailable: {e}"})
+        return future
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def stop(self):
+        if self._conn is not None:
+            self._conn.close()
+        if self.process is not None:
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.kill()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive(),
+            "mt5_connected": self.mt5_connected,
+            "restarts": self.restarts,
+            "last_ping_ms": self.last_ping_ms,
+            "in_flight": len(self._futures)
+        }
+
+class AccountPool:
+    """One worker process per account, routed by account_id"""
+
+    def __init__(self, backend: str, health_interval: float, call_timeout: float):
+        self.backend = backend
+        self.health_interval = health_interval
+        self.call_timeout = call_timeout
+        self.workers = {}
+        self._lock = threading.Lock()
+        self._monitor = None
+
+    async def connect(self, account_id: str, request: ConnectionRequest) -> Dict[str, Any]:
+        payload = request.dict()
+        with self._lock:
+            worker = self.workers.get(account_id)
+            if worker is not None and worker.connect_payload.get("terminal_path") != payload.get("terminal_path"):
+                # A different terminal installation needs a fresh process
+                self.workers.pop(account_id).stop()
+                worker = None
+            if worker is None:
+                worker = self.workers[account_id] = AccountWorker(account_id, self.backend, payload)
+                worker.start()
+            worker.connect_payload = payload
+            if self._monitor is None:
+                self._monitor = threading.Thread(target=self._run_monitor, name="account-monitor", daemon=True)
+                self._monitor.start()
+        result = await self._await(worker, worker.submit("connect", payload))
+        worker.mt5_connected = bool(result.get("success"))
+        return result
+
+    async def run(self, account_id: str, op: str, request: Optional[BaseModel] = None) -> Dict[str, Any]:
+        worker = self.workers.get(account_id)
+        if worker is None:
+            return {"success": False, "error": f"Account {account_id} is not connected"}
+        return await self._await(worker, worker.submit(op, request.dict() if request is not None else None))
+
+    async def _await(self, worker: AccountWorker, future: Future) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.call_timeout)
+        except asyncio.TimeoutError:
+            return {"success": False, "error": f"Account worker {worker.account_id} timed out"}
+
+    def disconnect(self, account_id: str) -> bool:
+        with self._lock:
+            worker = self.workers.pop(account_id, None)
+        if worker is None:
+            return False
+        worker.stop()
+        return True
+
+    def _run_monitor(self):
+        while True:
+            time.sleep(self.health_interval)
+            for account_id, worker in list(self.workers.items()):
+                started = time.perf_counter()
+                healthy = worker.alive()
+                if healthy:
+                    try:
+                        reply = worker.submit("ping").result(timeout=self.health_interval * 2)
+                        healthy = reply.get("success", False)
+                        worker.mt5_connected = reply.get("mt5_connected", False)
+                        worker.last_ping_ms = round((time.perf_counter() - started) * 1000, 3)
+                    except FutureTimeout:
+                        healthy = False
+                if not healthy and self.workers.get(account_id) is worker:
+                    self._restart(worker)
+
+    def _restart(self, worker: AccountWorker):
+        logger.error(f"Account worker {worker.account_id} is unresponsive, restarting")
+        worker.stop()
+        worker.restarts += 1
+        worker.mt5_connected = False
+        ACCOUNT_WORKER_RESTARTS.inc((worker.account_id,))
+        worker.start()
+        try:
+            result = worker.submit("connect", worker.connect_payload).result(timeout=self.call_timeout)
+            worker.mt5_connected = bool(result.get("success"))
+        except FutureTimeout:
+            logger.error(f"Account worker {worker.account_id} did not reconnect in {self.call_timeout}s")
+
+    def status(self) -> Dict[str, Any]:
+        return {account_id: worker.status() for account_id, worker in list(self.workers.items())}
+
+account_pool = AccountPool(MT5_BACKEND, WORKER_HEALTH_INTERVAL, WORKER_CALL_TIMEOUT)
+
+@app.post("/disconnect")
+async def disconnect_account(request: AccountRequest):
+    if not request.account_id:
+        return {"success": False, "error": "account_id is required"}
+    if not account_pool.disconnect(request.account_id):
+        return {"success": False, "error": f"Account {request.account_id} is not connected"}
+    return {"success": True}
+
+@app.get("/accounts")
+async def get_accounts():
+    return {"success": True, "accounts": account_pool.status()}
+
+@app.websocket("/ws")
+async def stream(websocket: WebSocket):
+    """Push ticks, position and account deltas to the client.
+
+    Client messages:
+    {"action": "subscribe", "topics": ["ticks", "positions", "account"], "symbols": ["EURUSD"]}
+    {"action": "unsubscribe", "topics": ["ticks"], "symbols": ["EURUSD"]}
+    """
+    await websocket.accept()
+    subscriber = StreamSubscriber(websocket)
+    sender = asyncio.create_task(subscriber.send_loop())
+    
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            topics = message.get("topics", [])
+            symbols = message.get("symbols", [])
+            
+            unknown = [topic for topic in topics if topic not in STREAM_TOPICS]
+            if unknown:
+                subscriber.push(("error",), {"topic": "error", "error": f"Unknown topics: {unknown}"})
+            elif action == "subscribe":
+                stream_hub.subscribe(subscriber, topics, symbols)
+            elif action == "unsubscribe":
+                stream_hub.unsubscribe(subscriber, topics, symbols)
+            else:
+                subscriber.push(("error",), {"topic": "error", "error": f"Unknown action: {action}"})
+                
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_hub.remove(subscriber)
+        sender.cancel()
+
+# Market data recording
+#
+# Ticks and M1 bars are appended to fixed-width binary files, one directory
+# per symbol and one file per UTC day (plus a part number once a file reaches
+# MT5_BRIDGE_RECORD_MAX_MB):
+#
+#   {MT5_BRIDGE_DATA_DIR}/{symbol}/ticks-YYYYMMDD-N.bin   TICK_RECORD_DTYPE
+#   {MT5_BRIDGE_DATA_DIR}/{symbol}/bars-M1-YYYYMMDD-N.bin BAR_RECORD_DTYPE
+#
+# Records are little-endian, packed and in time order, so a file can be
+# memory-mapped as a NumPy array and sliced by time with searchsorted. The
+# store is in mt5_market_data.py; the recorder below feeds it.
+
+def _to_records(rows, dtype: np.dtype) -> np.ndarray:
+    records = np.zeros(len(rows), dtype=dtype)
+    for name in dtype.names:
+        if name == "volume" and "volume_real" in rows.dtype.names:
+            records[name] = rows["volume_real"]
+        elif name in rows.dtype.names:
+            records[name] = rows[name]
+    return records
+
+class MarketDataRecorder:
+    """Captures every tick and completed M1 bar for the recorded symbols.
+
+    Each cycle asks the terminal only for what arrived since the last
+    recorded tick/bar (copy_ticks_from / copy_rates_from_pos), so nothing
+    is missed between cycles and nothing is written twice.
+    """
+
+    def __init__(self, executor: MT5Executor, store: MarketDataStore, interval: float):
+        self.executor = executor
+        self.store = store
+        self.interval = interval
+        self.symbols = set()
+        self.ticks_written = 0
+        self.bars_written = 0
+        self.last_error = None
+        self._last_tick = {}
+        self._last_bar = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, symbols):
+        with self._lock:
+            for symbol in symbols:
+                self._last_tick.setdefault(symbol, self.store.last_time(symbol, "ticks"))
+                self._last_bar.setdefault(symbol, self.store.last_time(symbol, "bars"))
+            self.symbols |= set(symbols)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mt5-recorder", daemon=True)
+                self._thread.start()
+
+    def stop(self, symbols=None):
+        with self._lock:
+            self.symbols -= set(symbols) if symbols is not None else set(self.symbols)
+
+    def _run(self):
+        while True:
+            started = time.perf_counter()
+            with self._lock:
+                symbols = sorted(self.symbols)
+            if symbols and mt5_connected:
+                for symbol in symbols:
+                    try:
+                        self._capture(symbol)
+                    except Exception as e:
+                        self.last_error = f"{symbol}: {e}"
+                        logger.error(f"Recorder error for {symbol}: {e}")
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+
+    def _capture(self, symbol: str):
+        now = time.time()
+        since = self._last_tick.get(symbol) or int((now - self.interval) * 1000)
+        ticks = self.executor.call(mt5.copy_ticks_from, symbol, since // 1000, 100000, mt5.COPY_TICKS_ALL,
+                                   lane="market_data")
+        if ticks is not None and len(ticks):
+            ticks = ticks[ticks["time_msc"] > since]
+            if len(ticks):
+                self.store.append(symbol, "ticks", _to_records(ticks, TICK_RECORD_DTYPE))
+                self._last_tick[symbol] = int(ticks["time_msc"][-1])
+                self.ticks_written += len(ticks)
+
+        # Position 1 onwards: completed bars only
+        last_bar = self._last_bar.get(symbol)
+        count = 1440 if last_bar is None else max(1, min(1440, int((now - last_bar) // 60) + 1))
+        rates = self.executor.call(mt5.copy_rates_from_pos, symbol, mt5.TIMEFRAME_M1, 1, count, lane="market_data")
+        if rates is not None and len(rates):
+            if last_bar is not None:
+                rates = rates[rates["time"] > last_bar]
+            if len(rates):
+                self.store.append(symbol, "bars", _to_records(rates, BAR_RECORD_DTYPE))
+                self._last_bar[symbol] = int(rates["time"][-1])
+                self.bars_written += len(rates)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "symbols": sorted(self.symbols),
+            "ticks_written": self.ticks_written,
+            "bars_written": self.bars_written,
+            "last_error": self.last_error
+        }
+
+market_data_store = MarketDataStore(RECORD_DIR, RECORD_MAX_BYTES)
+market_data_recorder = MarketDataRecorder(mt5_executor, market_data_store, RECORD_INTERVAL)
+
+@app.post("/start_recording")
+async def start_recording(request: RecordingRequest):
+    error = await session_supervisor.check()
+    if error:
+        return error
     
-    logger.info("Auto trading bot stopped")
+    try:
+        market_data_recorder.start(request.symbols)
+        return {"success": True, "recorder": market_data_recorder.status()}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/stop_recording")
+async def stop_recording(request: Optional[RecordingRequest] = None):
+    market_data_recorder.stop(request.symbols if request and request.symbols else None)
+    return {"success": True, "recorder": market_data_recorder.status()}
+
+class LatencyStats:
+    """Rolling window of latency samples in milliseconds"""
+
+    def __init__(self, window: int = 1024):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, ms: float):
+        self.samples.append(ms)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+        pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+        return {"count": self.count, "p50": pick(0.50), "p99": pick(0.99), "max": round(ordered[-1], 3)}
+
+class MarketDataPoller:
+    """Shared tick source for the strategy engine.
+
+    One executor call per cycle reads every watched symbol, and listeners are
+    only called for symbols whose tick actually changed.
+    """
+
+    def __init__(self, executor: MT5Executor, interval: float):
+        self.executor = executor
+        self.interval = interval
+        self._listeners = {}
+        self._last = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, symbol: str, listener):
+        with self._lock:
+            self._listeners.setdefault(symbol, set()).add(listener)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mt5-market-data", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, symbol: str, listener):
+        with self._lock:
+            listeners = self._listeners.get(symbol)
+            if listeners:
+                listeners.discard(listener)
+                if not listeners:
+                    del self._listeners[symbol]
+                    self._last.pop(symbol, None)
+
+    def _run(self):
+        while True:
+            started = time.perf_counter()
+            with self._lock:
+                listeners = {symbol: list(callbacks) for symbol, callbacks in self._listeners.items()}
+            if listeners and mt5_connected:
+                try:
+                    ticks = self.executor.call(_read_ticks, sorted(listeners), lane="market_data")
+                    received = time.perf_counter()
+                    for symbol, tick in ticks.items():
+                        if tick is None:
+                            continue
+                        key = (tick.time_msc, tick.bid, tick.ask)
+                        if self._last.get(symbol) == key:
+                            continue
+                        self._last[symbol] = key
+                        for listener in listeners[symbol]:
+                            listener(tick, received)
+                except Exception as e:
+                    logger.error(f"Market data error: {e}")
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+
+class StrategyInstance:
+    """One symbol/strategy pair with its own state and worker thread.
+
+    The market data poller hands each changed tick to on_tick(); only the
+    newest unprocessed tick is kept, so a slow decision skips stale ticks
+    instead of queueing them.
+    """
+
+    def __init__(self, instance_id: str, settings: Dict[str, Any]):
+        if settings["trading_strategy"] not in STRATEGIES:
+            raise ValueError(f"Unknown trading strategy: {settings['trading_strategy']}")
+        self.instance_id = instance_id
+        self.settings = settings
+        self.symbol = settings["symbol"]
+        self.strategy = STRATEGIES[settings["trading_strategy"]](settings)
+        self.active = False
+        self.decision_latency = LatencyStats()
+        self.ticks_seen = 0
+        self.ticks_skipped = 0
+        self.trades = 0
+        self.last_error = None
+        self._tick = None
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self, poller: MarketDataPoller):
+        self.active = True
+        self._thread = threading.Thread(target=self._run, name=f"strategy-{self.instance_id}", daemon=True)
+        self._thread.start()
+        poller.watch(self.symbol, self.on_tick)
+        logger.info(f"Auto trading instance {self.instance_id} started: {self.symbol} - {self.settings['trading_strategy']}")
+
+    def stop(self, poller: MarketDataPoller):
+        poller.unwatch(self.symbol, self.on_tick)
+        with self._cond:
+            self.active = False
+            self._cond.notify()
+        logger.info(f"Auto trading instance {self.instance_id} stopped")
+
+    def on_tick(self, tick, received: float):
+        with self._cond:
+            if self._tick is not None:
+                self.ticks_skipped += 1
+            self._tick = (tick, received)
+            self._cond.notify()
+
+    def _warm_up(self):
+        warm_up_bars = getattr(self.strategy, "warm_up_bars", 0)
+        if not warm_up_bars:
+            return
+        try:
+            # Recorded bars are free to read; only ask the terminal if they are missing or stale
+            rates = market_data_store.tail(self.symbol, "bars", warm_up_bars)
+            if len(rates) < warm_up_bars or time.time() - rates["time"][-1] > 180:
+                rates = mt5_executor.call(mt5.copy_rates_from_pos, self.symbol, mt5.TIMEFRAME_M1, 1, warm_up_bars,
+                                          lane="market_data")
+            self.strategy.warm_up(rates)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Warm-up failed ({self.instance_id}): {e}")
+
+    def _run(self):
+        self._warm_up()
+        while True:
+            with self._cond:
+                while self._tick is None and self.active:
+                    self._cond.wait()
+                if not self.active:
+                    return
+                tick, received = self._tick
+                self._tick = None
+            self.ticks_seen += 1
+            try:
+                self._on_tick(tick, received)
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Auto trading error ({self.instance_id}): {e}")
+            STRATEGY_CYCLE.observe(time.perf_counter() - received, (self.instance_id,))
+
+    def _record_decision(self, received: float):
+        elapsed = time.perf_counter() - received
+        self.decision_latency.record(elapsed * 1000)
+        STRATEGY_DECISION.observe(elapsed, (self.instance_id,))
+
+    def _on_tick(self, tick, received: float):
+        settings = self.settings
+        magic = settings.get("magic_number", 99999)
+        
+        # Check if we can place more trades
+        if exposure_book.count(self.symbol, magic) >= settings.get("max_trades", 5):
+            self._record_decision(received)
+            return
+        
+        trade_type = self.strategy.on_tick(tick)
+        self._record_decision(received)
+        if trade_type is None:
+            return
+        
+        # Calculate SL and TP from the symbol's real pip size
+        spec = symbol_cache.require(self.symbol)
+        price = spec.round_price(tick.ask if trade_type == "BUY" else tick.bid)
+        pip_value = spec.pip
+        sl_pips = settings.get("stop_loss_pips", 50)
+        tp_pips = settings.get("take_profit_pips", 100)
+        
+        if trade_type == "BUY":
+            stop_loss = spec.round_price(price - (sl_pips * pip_value))
+            take_profit = spec.round_price(price + (tp_pips * pip_value))
+        else:
+            stop_loss = spec.round_price(price + (sl_pips * pip_value))
+            take_profit = spec.round_price(price - (tp_pips * pip_value))
+        spec.check_stops(trade_type == "BUY", price, stop_loss, take_profit)
+        volume = spec.normalize_volume(settings.get("lot_size", 0.01))
+        
+        order_request = {
+            "action": mt5.TRADE_ACTION_DEAL,
+            "symbol": self.symbol,
+            "volume": volume,
+            "type": mt5.ORDER_TYPE_BUY if trade_type == "BUY" else mt5.ORDER_TYPE_SELL,
+            "price": price,
+            "sl": stop_loss,
+            "tp": take_profit,
+            "deviation": ORDER_DEVIATION,
+            "magic": magic,
+            "comment": f"Auto Bot - {settings['trading_strategy']}",
+            "type_time": mt5.ORDER_TIME_GTC,
+        }
+        
+        # Same requote and filling-mode retries as /place_order, priced from the tick the decision was made on
+        error = mt5_executor.call(self._send, order_request, tick)
+        snapshot_cache.invalidate()
+        if error:
+            self.last_error = error
+            return
+        self.trades += 1
+        logger.info(f"Auto trade placed ({self.instance_id}): {trade_type} {order_request['volume']} {self.symbol} at {price}")
+
+    def _send(self, order_request: Dict[str, Any], quote) -> Optional[str]:
+        # Runs on the MT5 executor thread, so last_error still belongs to this order, and the limits
+        # are checked against a book no other order can change before this one is sent
+        rejection = risk_engine.check(self.symbol, order_request["type"] == mt5.ORDER_TYPE_BUY, order_request["volume"])
+        if rejection:
+            return f"Risk check failed: {rejection}"
+        result, attempts, stopped = _execute_market(order_request, "open", f"auto:{self.instance_id}", quote)
+        if result is None:
+            return f"Order failed: {mt5.last_error()}"
+        if result.retcode != mt5.TRADE_RETCODE_DONE:
+            return _execution_error("Order", result, attempts, stopped)
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "settings": self.settings,
+            "ticks_seen": self.ticks_seen,
+            "ticks_skipped": self.ticks_skipped,
+            "trades": self.trades,
+            "decision_latency_ms": self.decision_latency.summary(),
+            "last_error": self.last_error
+        }
+
+class StrategyEngine:
+    """Runs any number of strategy instances off one market data poller"""
+
+    def __init__(self, poller: MarketDataPoller):
+        self.poller = poller
+        self.instances = {}
+        self._lock = threading.Lock()
+
+    def start(self, instance_id: str, settings: Dict[str, Any]) -> StrategyInstance:
+        with self._lock:
+            if instance_id in self.instances:
+                raise ValueError(f"Auto trading already active for instance {instance_id}")
+            instance = StrategyInstance(instance_id, settings)
+            self.instances[instance_id] = instance
+        instance.start(self.poller)
+        return instance
+
+    def stop(self, instance_id: Optional[str] = None) -> list:
+        with self._lock:
+            if instance_id is None:
+                stopped = list(self.instances.values())
+                self.instances.clear()
+            elif instance_id in self.instances:
+                stopped = [self.instances.pop(instance_id)]
+            else:
+                raise ValueError(f"No auto trading instance {instance_id}")
+        for instance in stopped:
+            instance.stop(self.poller)
+        return [instance.instance_id for instance in stopped]
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            instances = list(self.instances.values())
+        return {instance.instance_id: instance.status() for instance in instances}
+
+market_data_poller = MarketDataPoller(mt5_executor, TICK_POLL_INTERVAL)
+strategy_engine = StrategyEngine(market_data_poller)
 
 @app.post("/start_auto_trading")
 async def start_auto_trading(request: AutoTradingRequest):
-    global auto_trading_active, auto_trading_settings, auto_trading_thread
+    error = await session_supervisor.check()
+    if error:
+        return error
     
-    if not mt5_connected:
-        return {"success": False, "error": "MT5 not connected"}
+    try:
+        settings = request.dict()
+        instance_id = settings.pop("instance_id") or "default"
+        strategy_engine.start(instance_id, settings)
+        
+        return {"success": True, "message": "Auto trading started", "instance_id": instance_id}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/stop_auto_trading")
+async def stop_auto_trading(request: Optional[StopAutoTradingRequest] = None):
+    try:
+        stopped = strategy_engine.stop(request.instance_id if request else None)
+        return {"success": True, "message": "Auto trading stopped", "stopped": stopped}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+# Trailing stops
+#
+# Trailed positions are kept per symbol in one TrailTable of parallel numpy
+# arrays. Each tick from the shared market data poller evaluates a symbol's
+# whole table in one vectorized pass. A stop is only modified once the new
+# level is at least the position's step past the current one, and one
+# executor job sends every modify of that tick, so terminal traffic follows
+# the number of steps rather than the number of ticks.
+
+TRAILING_MODIFIES = metrics.counter("bridge_trailing_modifies_total", "Trailing stop SL modifies by outcome",
+                                    ("outcome",))
+
+class TrailTable:
+    """Trailed positions of one symbol as parallel arrays"""
+
+    COLUMNS = (("ticket", np.int64), ("is_buy", np.bool_), ("price_open", np.float64), ("sl", np.float64),
+               ("tp", np.float64), ("distance", np.float64), ("step", np.float64), ("activation", np.float64))
+
+    def __init__(self, spec: SymbolSpec):
+        self.digits = spec.digits
+        self.point = spec.point
+        self.columns = {name: np.empty(0, dtype) for name, dtype in self.COLUMNS}
+        self.busy = False
+
+    def __len__(self) -> int:
+        return len(self.columns["ticket"])
+
+    def _index(self, ticket: int) -> Optional[int]:
+        found = np.flatnonzero(self.columns["ticket"] == ticket)
+        return int(found[0]) if len(found) else None
+
+    def upsert(self, row: Dict[str, Any]):
+        index = self._index(row["ticket"])
+        if index is None:
+            for name, dtype in self.COLUMNS:
+                self.columns[name] = np.append(self.columns[name], np.array([row[name]], dtype))
+        else:
+            for name, _ in self.COLUMNS:
+                self.columns[name][index] = row[name]
+
+    def update(self, ticket: int, **values):
+        index = self._index(ticket)
+        if index is not None:
+            for name, value in values.items():
+                self.columns[name][index] = value
+
+    def remove(self, tickets):
+        keep = ~np.isin(self.columns["ticket"], list(tickets))
+        for name in self.columns:
+            self.columns[name] = self.columns[name][keep]
+
+    def moves(self, bid: float, ask: float):
+        """Indices whose stop should move on this tick, and the new stop of every row"""
+        c = self.columns
+        direction = np.where(c["is_buy"], 1.0, -1.0)
+        price = np.where(c["is_buy"], bid, ask)
+        stops = np.round(price - direction * c["distance"], self.digits)
+        # activation 0 trails from the start, otherwise once the position is that far in profit
+        active = (c["activation"] <= 0) | ((price - c["price_open"]) * direction >= c["activation"] - self.point / 2)
+        # A position without a stop takes the first trailing level as soon as it is active
+        gain = np.where(c["sl"] > 0, (stops - c["sl"]) * direction, np.inf)
+        return np.flatnonzero(active & (gain >= c["step"] - self.point / 2)), stops
+
+    def rows(self) -> List[Dict[str, Any]]:
+        c = self.columns
+        return [{name: c[name][i].item() for name, _ in self.COLUMNS} for i in range(len(self))]
+
+class TrailingStopManager:
+    """Server-side trailing stops driven by the market data poller"""
+
+    def __init__(self, executor: MT5Executor, poller: MarketDataPoller):
+        self.executor = executor
+        self.poller = poller
+        self.tables = {}
+        self._symbols = {}
+        self._added = {}
+        self._listeners = {}
+        self._seen_version = 0
+        self._lock = threading.Lock()
+
+    def add(self, position, spec: SymbolSpec, distance: float, step: float, activation: float):
+        """Start (or retune) trailing a position; runs on the executor thread"""
+        row = {"ticket": position.ticket, "is_buy": position.type == mt5.ORDER_TYPE_BUY,
+               "price_open": position.price_open, "sl": position.sl, "tp": position.tp,
+               "distance": distance, "step": step, "activation": activation}
+        with self._lock:
+            table = self.tables.get(position.symbol)
+            if table is None:
+                table = self.tables[position.symbol] = TrailTable(spec)
+                listener = self._listeners[position.symbol] = (
+                    lambda tick, received, symbol=position.symbol: self._on_tick(symbol, tick))
+                self.poller.watch(position.symbol, listener)
+            table.upsert(row)
+            self._symbols[position.ticket] = position.symbol
+            self._added[position.ticket] = snapshot_cache.version
+        return row
+
+    def remove(self, ticket: int) -> bool:
+        with self._lock:
+            return self._remove([ticket]) > 0
+
+    def _remove(self, tickets) -> int:
+        # Caller holds the lock
+        by_symbol = {}
+        for ticket in tickets:
+            symbol = self._symbols.pop(ticket, None)
+            self._added.pop(ticket, None)
+            if symbol is not None:
+                by_symbol.setdefault(symbol, []).append(ticket)
+        for symbol, removed in by_symbol.items():
+            table = self.tables[symbol]
+            table.remove(removed)
+            if not len(table):
+                del self.tables[symbol]
+                self.poller.unwatch(symbol, self._listeners.pop(symbol))
+        return sum(len(removed) for removed in by_symbol.values())
+
+    def on_modified(self, ticket: int, sl: float, tp: float):
+        """Keep the table in line with a manual /modify_position"""
+        with self._lock:
+            symbol = self._symbols.get(ticket)
+            if symbol is not None:
+                self.tables[symbol].update(ticket, sl=sl, tp=tp)
+
+    def _sync(self):
+        # Caller holds the lock. Positions that closed (SL, TP or elsewhere) drop
+        # out, and take-profit changes made outside the bridge are picked up
+        view = snapshot_cache.peek()
+        version = view["snapshot"]["version"]
+        if version == self._seen_version:
+            return
+        self._seen_version = version
+        open_positions = {position["ticket"]: position for position in view["positions"]}
+        # Only snapshots read after a position was added can tell that it closed
+        self._remove([ticket for ticket in self._symbols
+                      if ticket not in open_positions and self._added[ticket] < version])
+        for symbol, table in self.tables.items():
+            if table.busy:
+                continue
+            for ticket in table.columns["ticket"].tolist():
+                position = open_positions.get(ticket)
+                if position is not None:
+                    table.update(ticket, tp=position["tp"])
+
+    def _on_tick(self, symbol: str, tick):
+        # Runs on the market data poller thread
+        with self._lock:
+            self._sync()
+            table = self.tables.get(symbol)
+            if table is None or table.busy:
+                return
+            indices, stops = table.moves(tick.bid, tick.ask)
+            if not len(indices):
+                return
+            tickets, tps = table.columns["ticket"], table.columns["tp"]
+            moves = [(int(tickets[i]), float(stops[i]), float(tps[i])) for i in indices]
+            table.busy = True
+        future = self.executor.submit(_apply_trailing_stops, symbol, moves, lane="close")
+        future.add_done_callback(lambda f: self._applied(symbol, f))
+
+    def _applied(self, symbol: str, future: Future):
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"Trailing stop error on {symbol}: {e}")
+            results = []
+        with self._lock:
+            table = self.tables.get(symbol)
+            if table is not None:
+                table.busy = False
+            closed = []
+            for ticket, sl, retcode in results:
+                if retcode == mt5.TRADE_RETCODE_DONE:
+                    TRAILING_MODIFIES.inc(("moved",))
+                    if table is not None:
+                        table.update(ticket, sl=sl)
+                elif retcode == mt5.TRADE_RETCODE_POSITION_CLOSED:
+                    TRAILING_MODIFIES.inc(("closed",))
+                    closed.append(ticket)
+                else:
+                    TRAILING_MODIFIES.inc(("failed",))
+            self._remove(closed)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {symbol: table.rows() for symbol, table in self.tables.items()}
+
+    def count(self) -> int:
+        return len(self._symbols)
+
+def _apply_trailing_stops(symbol: str, moves):
+    # Runs on the MT5 executor thread: every stop that moved on one tick, back to back
+    results = []
+    for ticket, sl, tp in moves:
+        try:
+            result = _send_order({"action": mt5.TRADE_ACTION_SLTP, "symbol": symbol, "position": ticket,
+                                  "sl": sl, "tp": tp}, "modify", "trailing")
+            retcode = result.retcode if result is not None else None
+        except Exception as e:
+            logger.error(f"Trailing stop modify failed for {ticket}: {e}")
+            retcode = None
+        results.append((ticket, sl, retcode))
+    return results
+
+def _set_trailing_stop(request: TrailingStopRequest):
+    try:
+        positions = mt5.positions_get(ticket=request.ticket)
+        if not positions:
+            return {"success": False, "error": "Position not found"}
+        position = positions[0]
+        
+        spec = symbol_cache.require(position.symbol)
+        distance = request.distance_pips * spec.pip
+        if distance < max(spec.stops_level, 1) * spec.point:
+            return {"success": False, "error": f"Trailing distance must be at least {spec.stops_level} points"}
+        step = max(request.step_pips * spec.pip, spec.point)
+        row = trailing_stops.add(position, spec, distance, step, max(request.activation_pips, 0.0) * spec.pip)
+        return {"success": True, "trailing_stop": {"symbol": position.symbol, **row}}
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+trailing_stops = TrailingStopManager(mt5_executor, market_data_poller)
+
+@app.post("/trailing_stop")
+async def set_trailing_stop(request: TrailingStopRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "trailing_stop", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
     
-    if auto_trading_active:
-        return {"success": False, "error": "Auto trading already active"}
+    return await mt5_executor.run(_set_trailing_stop, request, lane="close")
+
+@app.post("/cancel_trailing_stop")
+async def cancel_trailing_stop(request: CancelTrailingStopRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "cancel_trailing_stop", request)
+    if not trailing_stops.remove(request.ticket):
+        return {"success": False, "error": f"No trailing stop on {request.ticket}"}
+    return {"success": True, "ticket": request.ticket}
+
+@app.post("/trailing_stops")
+async def get_trailing_stops(request: Optional[AccountRequest] = None):
+    if request is not None and request.account_id:
+        return await account_pool.run(request.account_id, "trailing_stops", request)
+    return {"success": True, "trailing_stops": trailing_stops.status()}
+
+ACCOUNT_OPS.update({
+    "trailing_stop": (set_trailing_stop, TrailingStopRequest),
+    "cancel_trailing_stop": (cancel_trailing_stop, CancelTrailingStopRequest),
+    "trailing_stops": (get_trailing_stops, AccountRequest),
+})
+
+# Shared-memory tick feed
+#
+# Ticks of the fed symbols are copied from the shared market data poller into
+# a multiprocessing.shared_memory ring per symbol (layout and reader in
+# mt5_ticks.py). Strategy processes on the same machine attach to the segment
+# and read NumPy arrays straight out of it, so adding a consumer adds neither
+# an HTTP request per tick nor a terminal call.
+
+TICK_FEED_PUBLISHED = metrics.counter("bridge_tick_feed_published_total", "Ticks written to the shared-memory feed",
+                                      ("symbol",))
+
+class TickFeed:
+    """Publishes the poller's ticks to the shared-memory ring of mt5_ticks.py"""
+
+    def __init__(self, poller: MarketDataPoller, name: str, slots: int, max_symbols: int):
+        self.poller = poller
+        self.name = name
+        self.slots = slots
+        self.max_symbols = max_symbols
+        self.last_error = None
+        self._writer = None
+        self._listeners = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, symbols):
+        with self._lock:
+            if self._writer is None:
+                # Imported here so the bridge still runs from a lone mt5_bridge.py when the feed is unused
+                from mt5_ticks import TickRingWriter
+                self._writer = TickRingWriter(self.name, self.max_symbols, self.slots)
+                self._thread = threading.Thread(target=self._heartbeat, name="mt5-tick-feed", daemon=True)
+                self._thread.start()
+            for symbol in symbols:
+                if symbol in self._listeners:
+                    continue
+                # Rows are never reused, so a symbol keeps its ring across stop/start
+                self._writer.add_symbol(symbol)
+                listener = self._listeners[symbol] = (
+                    lambda tick, received, symbol=symbol: self._publish(symbol, tick))
+                self.poller.watch(symbol, listener)
+
+    def stop(self, symbols=None):
+        with self._lock:
+            for symbol in list(self._listeners) if symbols is None else symbols:
+                listener = self._listeners.pop(symbol, None)
+                if listener is not None:
+                    self.poller.unwatch(symbol, listener)
+
+    def _publish(self, symbol: str, tick):
+        # Runs on the poller thread, the feed's only writer
+        try:
+            self._writer.publish(symbol, tick.time_msc, tick.bid, tick.ask, tick.last,
+                                 getattr(tick, "volume_real", tick.volume), tick.flags)
+            TICK_FEED_PUBLISHED.inc((symbol,))
+        except Exception as e:
+            self.last_error = f"{symbol}: {e}"
+            logger.error(f"Tick feed error for {symbol}: {e}")
+
+    def _heartbeat(self):
+        # Lets readers tell a quiet market from a bridge that has gone away
+        while True:
+            writer = self._writer
+            if writer is None:
+                return
+            writer.heartbeat()
+            time.sleep(1.0)
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+    def status(self) -> Dict[str, Any]:
+        writer = self._writer
+        return {
+            "name": self.name if writer is not None else None,
+            "symbols": sorted(self._listeners),
+            "slots": self.slots,
+            "published": writer.published if writer is not None else 0,
+            "last_error": self.last_error
+        }
+
+tick_feed = TickFeed(market_data_poller, TICK_FEED_NAME, TICK_FEED_SLOTS, TICK_FEED_MAX_SYMBOLS)
+
+@app.on_event("shutdown")
+def close_tick_feed():
+    # Unlinks the segment; readers that still map it keep their pages but see no new ticks
+    tick_feed.close()
+
+@app.post("/start_tick_feed")
+async def start_tick_feed(request: TickFeedRequest):
+    error = await session_supervisor.check()
+    if error:
+        return error
     
     try:
-        auto_trading_settings = request.dict()
-        auto_trading_active = True
+        tick_feed.start(request.symbols)
+        return {"success": True, "tick_feed": tick_feed.status()}
         
-        # Start trading thread
-        auto_trading_thread = threading.Thread(target=auto_trading_bot)
-        auto_trading_thread.daemon = True
-        auto_trading_thread.start()
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/stop_tick_feed")
+async def stop_tick_feed(request: Optional[TickFeedRequest] = None):
+    tick_feed.stop(request.symbols if request and request.symbols else None)
+    return {"success": True, "tick_feed": tick_feed.status()}
+
+# Sliced execution
+#
+# A large parent order is worked as a series of child market orders: TWAP
+# spreads its volume evenly over duration_seconds, iceberg sends
+# visible_volume at a time and the next clip interval_seconds after the last
+# one filled; max_slice_volume caps either. A TWAP ends with its window: once
+# duration_seconds have passed, whatever is left unfilled is given up as
+# "expired" rather than sent in one clip. Every working parent waits on
+# one TimerWheel driven by a single asyncio task, so many parents cost list
+# entries rather than threads or sleeping tasks. Children go through
+# _place_order (risk checks, requote retries, journal, execution stats).
+
+SLICED_ALGOS = ("twap", "iceberg")
+
+SLICED_CHILDREN = metrics.counter("bridge_sliced_children_total", "Child orders of sliced parent orders by outcome",
+                                  ("algo", "outcome"))
+
+class TimerWheel:
+    """Hashed timer wheel on the event loop.
+
+    A timer lands in slot (due tick % size), so scheduling and cancelling
+    are O(1) however many are pending, and each tick only looks at one
+    slot. Ticks are counted from a fixed origin on the loop clock, so a
+    timer fires at the first tick at or after its due time. The driving
+    task runs only while timers are pending.
+    """
+
+    def __init__(self, tick: float, size: int = 1024):
+        self.tick = tick
+        self.lateness = LatencyStats()
+        self._slots = [[] for _ in range(size)]
+        self._cursor = 0
+        self._origin = 0.0
+        self._pending = 0
+        self._task = None
+
+    def schedule(self, delay: float, callback) -> list:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done():
+            # Idle until now: carry on counting ticks from the present
+            self._origin = loop.time() - self._cursor * self.tick
+            self._task = loop.create_task(self._run())
+        wanted = loop.time() + delay
+        due = max(self._cursor + 1, math.ceil((wanted - self._origin) / self.tick - 1e-9))
+        # [due tick, callback or None once fired/cancelled, wanted loop time]
+        timer = [due, callback, wanted]
+        self._slots[due % len(self._slots)].append(timer)
+        self._pending += 1
+        return timer
+
+    def cancel(self, timer: Optional[list]):
+        if timer is not None and timer[1] is not None:
+            timer[1] = None
+            self._pending -= 1
+
+    def __len__(self) -> int:
+        return self._pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            await asyncio.sleep(max(0.0, self._origin + (self._cursor + 1) * self.tick - loop.time()))
+            self._cursor += 1
+            slot = self._slots[self._cursor % len(self._slots)]
+            if not slot:
+                continue
+            # Later rounds of the wheel share the slot and stay for their turn
+            due = [timer for timer in slot if timer[0] <= self._cursor]
+            if not due:
+                continue
+            slot[:] = [timer for timer in slot if timer[0] > self._cursor]
+            now = loop.time()
+            for timer in due:
+                callback = timer[1]
+                if callback is None:
+                    continue
+                timer[1] = None
+                self._pending -= 1
+                self.lateness.record((now - timer[2]) * 1000)
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Timer callback failed: {e}")
+
+class SlicedOrder:
+    """One parent order and the progress of its children"""
+
+    def __init__(self, parent_id: str, request: SlicedOrderRequest, spec: SymbolSpec, arrival_price: float):
+        self.parent_id = parent_id
+        self.request = request
+        self.spec = spec
+        self.is_buy = request.trade_type == "BUY"
+        self.volume = spec.normalize_volume(request.volume)
+        self.arrival_price = arrival_price
+        self.started_at = time.time()
+        self.finished_at = None
+        self.next_at = None
+        self.status = "working"
+        self.filled = 0.0
+        self.notional = 0.0
+        self.children = []
+        self.sent = self.failed = self.skipped = self.attempts = 0
+        self.failures_in_row = 0
+        self.last_error = None
+        self.timer = None
+        self.task = None
+
+    @property
+    def remaining(self) -> float:
+        return round(self.volume - self.filled, 8)
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """When a TWAP's window closes; icebergs work until filled"""
+        if self.request.algo != "twap":
+            return None
+        return self.started_at + self.request.duration_seconds
+
+    @property
+    def interval(self) -> float:
+        request = self.request
+        if request.algo == "twap" and request.slices:
+            return request.duration_seconds / request.slices
+        return request.interval_seconds
+
+    def next_delay(self) -> float:
+        """Seconds until the next child: the next TWAP slot, or one interval after an iceberg clip"""
+        if self.request.algo != "twap":
+            return self.interval
+        elapsed = time.time() - self.started_at
+        return self.started_at + (math.floor(elapsed / self.interval) + 1) * self.interval - time.time()
+
+    def next_volume(self) -> float:
+        request, spec, remaining = self.request, self.spec, self.remaining
+        if request.algo == "twap":
+            # Even split over the slots left, so a skipped or failed slice is caught up by the rest
+            slots_left = max(1, math.ceil((self.started_at + request.duration_seconds - time.time()) / self.interval - 1e-9))
+            target = remaining / slots_left
+        else:
+            target = request.visible_volume
+        target = min(target, request.max_slice_volume or target, spec.volume_max)
+        step = spec.volume_step or 0.01
+        volume = max(spec.volume_min, math.floor(target / step + 1e-9) * step)
+        # Never leave a tail smaller than the symbol's minimum volume
+        if remaining - volume < spec.volume_min - 1e-9:
+            volume = remaining
+        return round(min(volume, remaining), 8)
+
+    def record(self, volume: float, result: Dict[str, Any]):
+        if result.get("success"):
+            info = result["trade_info"]
+            self.filled = round(self.filled + volume, 8)
+            self.notional += volume * info["open_price"]
+            self.attempts += info.get("attempts", 1)
+            self.failures_in_row = 0
+            self.children.append({"ticket": info["ticket"], "volume": volume, "price": info["open_price"],
+                                  "time": time.time(), "attempts": info.get("attempts", 1)})
+            SLICED_CHILDREN.inc((self.request.algo, "filled"))
+        elif result.get("skipped"):
+            self.skipped += 1
+            SLICED_CHILDREN.inc((self.request.algo, "skipped"))
+        else:
+            self.failed += 1
+            self.failures_in_row += 1
+            self.last_error = result.get("error")
+            SLICED_CHILDREN.inc((self.request.algo, "failed"))
+
+    def finish(self, status: str):
+        self.status = status
+        self.finished_at = time.time()
+        self.next_at = None
+
+    def status_dict(self, children: bool = False) -> Dict[str, Any]:
+        request = self.request
+        avg_price = self.notional / self.filled if self.filled else None
+        slippage = None
+        if avg_price is not None:
+            moved = avg_price - self.arrival_price if self.is_buy else self.arrival_price - avg_price
+            slippage = round(moved / self.spec.point, 1)
+        status = {
+            "parent_id": self.parent_id,
+            "symbol": request.symbol,
+            "side": request.trade_type,
+            "algo": request.algo,
+            "status": self.status,
+            "volume": self.volume,
+            "filled_volume": self.filled,
+            "remaining_volume": self.remaining,
+            "progress": round(self.filled / self.volume, 4),
+            "avg_price": round(avg_price, self.spec.digits + 2) if avg_price is not None else None,
+            "arrival_price": self.arrival_price,
+            "slippage_points": slippage,
+            "slices": {"sent": self.sent, "filled": len(self.children), "failed": self.failed, "skipped": self.skipped},
+            "attempts": self.attempts,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 3),
+            "next_slice_at": self.next_at,
+            "last_error": self.last_error,
+            "settings": {"duration_seconds": request.duration_seconds, "interval_seconds": self.interval,
+                         "visible_volume": request.visible_volume, "max_slice_volume": request.max_slice_volume,
+                         "limit_price": request.limit_price},
+        }
+        if children:
+            status["children"] = list(self.children)
+        return status
+
+def _slice_start(symbol: str):
+    spec = symbol_cache.require(symbol)
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        raise ValueError(f"Failed to get price for {symbol}")
+    return spec, tick
+
+def _place_slice(request: OrderRequest, limit_price: Optional[float]):
+    """One child order; skipped while the price is worse than the parent's limit"""
+    tick = mt5.symbol_info_tick(request.symbol)
+    if tick is None:
+        return {"success": False, "error": f"Failed to get price for {request.symbol}"}
+    is_buy = request.trade_type == "BUY"
+    price = tick.ask if is_buy else tick.bid
+    if limit_price and (price > limit_price if is_buy else price < limit_price):
+        return {"success": False, "skipped": True, "error": f"Price {price} is beyond the limit {limit_price}"}
+    return _place_order(request, {request.symbol: tick}, "sliced")
+
+class SliceScheduler:
+    """Works every sliced parent order off one timer wheel"""
+
+    def __init__(self, executor: MT5Executor, wheel: TimerWheel, keep_finished: int = 1000):
+        self.executor = executor
+        self.wheel = wheel
+        self.keep_finished = keep_finished
+        self.orders = OrderedDict()
+
+    async def start(self, request: SlicedOrderRequest) -> Dict[str, Any]:
+        if request.algo not in SLICED_ALGOS:
+            return {"success": False, "error": f"Unknown algo {request.algo}, expected one of {', '.join(SLICED_ALGOS)}"}
+        if request.trade_type not in ("BUY", "SELL"):
+            return {"success": False, "error": f"Unknown trade type {request.trade_type}, expected BUY or SELL"}
+        if request.algo == "iceberg" and not request.visible_volume:
+            return {"success": False, "error": "Iceberg orders need a visible_volume"}
+        if request.duration_seconds <= 0 or request.interval_seconds <= 0 or (request.slices is not None and request.slices < 1):
+            return {"success": False, "error": "duration_seconds, interval_seconds and slices must be positive"}
         
-        return {"success": True, "message": "Auto trading started"}
+        spec, tick = await self.executor.run(_slice_start, request.symbol)
+        parent = SlicedOrder(uuid.uuid4().hex[:12], request, spec, tick.ask if request.trade_type == "BUY" else tick.bid)
+        self.orders[parent.parent_id] = parent
+        self._schedule(parent, 0.0)
+        logger.info(f"Sliced {request.algo} order {parent.parent_id}: {request.trade_type} {parent.volume} {request.symbol}")
+        return {"success": True, "sliced_order": parent.status_dict()}
+
+    def _schedule(self, parent: SlicedOrder, delay: float):
+        parent.next_at = time.time() + delay
+        parent.timer = self.wheel.schedule(delay, lambda: self._due(parent))
+
+    def _due(self, parent: SlicedOrder):
+        parent.timer = None
+        if parent.status == "working":
+            parent.task = asyncio.get_running_loop().create_task(self._slice(parent))
+
+    async def _slice(self, parent: SlicedOrder):
+        request = parent.request
+        if parent.deadline is not None and time.time() >= parent.deadline:
+            # Amended to a shorter window while this slot was waiting
+            self._expire(parent)
+            return
+        volume = parent.next_volume()
+        child = OrderRequest(symbol=request.symbol, trade_type=request.trade_type, volume=volume,
+                             stop_loss=request.stop_loss, take_profit=request.take_profit,
+                             comment=request.comment or f"slice {parent.parent_id}", magic_number=request.magic_number,
+                             deviation=request.deviation, max_slippage_points=request.max_slippage_points)
+        parent.sent += 1
+        parent.next_at = None
+        try:
+            result = await self.executor.run(_place_slice, child, request.limit_price)
+        except ExecutorOverloaded as e:
+            # Backpressure rather than a failure: the volume rolls into the next slices
+            result = {"success": False, "skipped": True, "error": str(e)}
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        parent.record(volume, result)
+        if result.get("success"):
+            snapshot_cache.invalidate()
+        
+        # Cancelled or amended to done while the child was in flight
+        if parent.status != "working":
+            return
+        delay = parent.next_delay()
+        if parent.remaining <= 0:
+            parent.finish("completed")
+        elif parent.failures_in_row >= SLICE_MAX_FAILURES:
+            parent.finish("failed")
+            logger.error(f"Sliced order {parent.parent_id} stopped after {parent.failures_in_row} failed slices: "
+                         f"{parent.last_error}")
+        elif parent.deadline is not None and time.time() + delay >= parent.deadline - 1e-6:
+            # That was the last slot of the window
+            self._expire(parent)
+            return
+        else:
+            self._schedule(parent, delay)
+            return
+        logger.info(f"Sliced order {parent.parent_id} {parent.status}: {parent.filled}/{parent.volume} filled")
+        self._trim()
+
+    def _expire(self, parent: SlicedOrder):
+        parent.finish("expired")
+        logger.info(f"Sliced order {parent.parent_id} expired after {parent.request.duration_seconds}s: "
+                    f"{parent.filled}/{parent.volume} filled")
+        self._trim()
+
+    def amend(self, request: AmendSlicedOrderRequest) -> Dict[str, Any]:
+        parent = self.orders.get(request.parent_id)
+        if parent is None:
+            return {"success": False, "error": f"No sliced order {request.parent_id}"}
+        if parent.status != "working":
+            return {"success": False, "error": f"Sliced order {request.parent_id} is {parent.status}"}
+        
+        changes = request.dict(exclude={"parent_id", "account_id", "volume"}, exclude_none=True)
+        if any(changes.get(name, 1) <= 0 for name in ("duration_seconds", "interval_seconds", "slices")):
+            return {"success": False, "error": "duration_seconds, interval_seconds and slices must be positive"}
+        if parent.request.algo == "iceberg" and changes.get("visible_volume") == 0:
+            return {"success": False, "error": "Iceberg orders need a visible_volume"}
+        if request.volume is not None:
+            volume = parent.spec.normalize_volume(request.volume)
+            if volume < parent.filled:
+                return {"success": False, "error": f"Volume {volume} is below the {parent.filled} already filled"}
+            parent.volume = volume
+        for name, value in changes.items():
+            setattr(parent.request, name, None if name == "limit_price" and not value else value)
+        
+        if parent.remaining <= 0:
+            self.wheel.cancel(parent.timer)
+            parent.finish("completed")
+        elif parent.timer is not None and ({"duration_seconds", "slices", "interval_seconds"} & set(changes)):
+            # New spacing: the waiting slice moves onto the new schedule
+            self.wheel.cancel(parent.timer)
+            self._schedule(parent, parent.next_delay())
+        return {"success": True, "sliced_order": parent.status_dict()}
+
+    def cancel(self, parent_id: str, reason: str = "api") -> Dict[str, Any]:
+        parent = self.orders.get(parent_id)
+        if parent is None:
+            return {"success": False, "error": f"No sliced order {parent_id}"}
+        if parent.status == "working":
+            # A child already at the terminal still completes and is counted
+            self.wheel.cancel(parent.timer)
+            parent.finish("cancelled")
+            logger.info(f"Sliced order {parent_id} cancelled ({reason}): {parent.filled}/{parent.volume} filled")
+        return {"success": True, "sliced_order": parent.status_dict()}
+
+    def cancel_all(self, reason: str) -> int:
+        working = [parent_id for parent_id, parent in self.orders.items() if parent.status == "working"]
+        for parent_id in working:
+            self.cancel(parent_id, reason)
+        return len(working)
+
+    def _trim(self):
+        finished = [parent_id for parent_id, parent in self.orders.items() if parent.status != "working"]
+        for parent_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.orders[parent_id]
+
+    def working(self) -> int:
+        return sum(1 for parent in self.orders.values() if parent.status == "working")
+
+    def status(self, parent_id: Optional[str] = None) -> Dict[str, Any]:
+        if parent_id is not None:
+            parent = self.orders.get(parent_id)
+            if parent is None:
+                return {"success": False, "error": f"No sliced order {parent_id}"}
+            return {"success": True, "sliced_order": parent.status_dict(children=True)}
+        return {"success": True, "sliced_orders": [parent.status_dict() for parent in self.orders.values()],
+                "timer_lateness_ms": self.wheel.lateness.summary()}
+
+slice_scheduler = SliceScheduler(mt5_executor, TimerWheel(SLICE_TIMER_TICK))
+
+@app.post("/place_sliced_order")
+async def place_sliced_order(request: SlicedOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "place_sliced_order", request)
+    error = await session_supervisor.check()
+    if error:
+        return error
+    
+    async def run():
+        try:
+            return await slice_scheduler.start(request)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    return await _idempotent(request, run)
+
+@app.post("/amend_sliced_order")
+async def amend_sliced_order(request: AmendSlicedOrderRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "amend_sliced_order", request)
+    try:
+        return slice_scheduler.amend(request)
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/stop_auto_trading")
-async def stop_auto_trading():
-    global auto_trading_active
+@app.post("/cancel_sliced_order")
+async def cancel_sliced_order(request: SlicedOrderIdRequest):
+    if request.account_id:
+        return await account_pool.run(request.account_id, "cancel_sliced_order", request)
+    if not request.parent_id:
+        return {"success": False, "error": "parent_id is required"}
+    return slice_scheduler.cancel(request.parent_id)
+
+@app.post("/sliced_orders")
+async def get_sliced_orders(request: Optional[SlicedOrderIdRequest] = None):
+    if request is not None and request.account_id:
+        return await account_pool.run(request.account_id, "sliced_orders", request)
+    return slice_scheduler.status(request.parent_id if request is not None else None)
+
+ACCOUNT_OPS.update({
+    "place_sliced_order": (place_sliced_order, SlicedOrderRequest),
+    "amend_sliced_order": (amend_sliced_order, AmendSlicedOrderRequest),
+    "cancel_sliced_order": (cancel_sliced_order, SlicedOrderIdRequest),
+    "sliced_orders": (get_sliced_orders, SlicedOrderIdRequest),
+})
+
+metrics.gauge("bridge_mt5_queue_depth", "Jobs waiting for the MT5 executor thread", mt5_executor.queue_depth)
+metrics.gauge("bridge_mt5_lane_depth", "Jobs waiting for the MT5 executor thread per lane",
+              lambda: {(lane,): depth for lane, depth in mt5_executor.lane_depths().items()}, ("lane",))
+metrics.gauge("bridge_stream_subscribers", "Connected /ws clients", lambda: len(stream_hub.subscribers))
+metrics.gauge("bridge_stream_pending_messages", "Messages waiting in /ws subscriber slots",
+              lambda: sum(len(s.pending) for s in list(stream_hub.subscribers)))
+metrics.gauge("bridge_stream_dropped_messages", "Messages merged into a newer one for slow /ws clients",
+              lambda: sum(s.dropped for s in list(stream_hub.subscribers)))
+metrics.gauge("bridge_strategy_ticks_skipped", "Ticks skipped by busy strategy instances",
+              lambda: {(i.instance_id,): i.ticks_skipped for i in list(strategy_engine.instances.values())}, ("instance",))
+metrics.gauge("bridge_snapshot_age_seconds", "Age of the account/position snapshot",
+              lambda: time.time() - snapshot_cache.updated_at if snapshot_cache.version else 0)
+metrics.gauge("bridge_journal_pending_rows", "Trade journal rows waiting for the writer", trade_journal.pending)
+metrics.gauge("bridge_account_workers", "Running account worker processes",
+              lambda: sum(1 for worker in list(account_pool.workers.values()) if worker.alive()))
+metrics.gauge("bridge_mt5_connected", "1 while the terminal session is up", lambda: int(mt5_connected))
+metrics.gauge("bridge_trailing_stops", "Positions with a server-side trailing stop", trailing_stops.count)
+metrics.gauge("bridge_sliced_orders_working", "Sliced parent orders still working", slice_scheduler.working)
+
+@app.get("/risk")
+async def get_risk():
+    return {"success": True, **risk_engine.status()}
+
+@app.post("/risk_limits")
+async def set_risk_limits(request: RiskLimitsRequest):
+    risk_engine.limits.update({name: value for name, value in request.dict().items() if value is not None})
+    return {"success": True, "limits": risk_engine.limits}
+
+@app.post("/kill_switch")
+async def kill_switch(request: Optional[KillSwitchRequest] = None):
+    # Halt first so nothing new opens while positions are being closed
+    risk_engine.halted = True
+    stopped = strategy_engine.stop()
+    sliced = slice_scheduler.cancel_all("kill switch")
+    logger.error("Kill switch engaged")
+    if request is not None and not request.flatten:
+        return {"success": True, "halted": True, "stopped": stopped, "cancelled_sliced_orders": sliced}
     
-    auto_trading_active = False
-    return {"success": True, "message": "Auto trading stopped"}
+    error = await session_supervisor.check()
+    if error:
+        return {**error, "halted": True, "stopped": stopped, "cancelled_sliced_orders": sliced}
+    # Pending orders go first so none of them fills while the book is being flattened
+    cancelled = await mt5_executor.run(_cancel_orders, None, "kill_switch", lane="close")
+    result = await mt5_executor.run(_close_positions, lane="close")
+    snapshot_cache.invalidate()
+    return {**result, "cancelled_orders": cancelled.get("succeeded", 0), "halted": True, "stopped": stopped,
+            "cancelled_sliced_orders": sliced}
+
+@app.post("/resume_trading")
+async def resume_trading():
+    risk_engine.halted = False
+    logger.info("Kill switch released")
+    return {"success": True, "halted": False}
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/status")
 async def get_status():
+    instances = strategy_engine.status()
     return {
         "mt5_connected": mt5_connected,
-        "auto_trading_active": auto_trading_active,
-        "auto_trading_settings": auto_trading_settings
+        "auto_trading_active": bool(instances),
+        "auto_trading_settings": next(iter(instances.values()))["settings"] if instances else {},
+        "auto_trading_instances": instances,
+        "mt5_queue_depth": mt5_executor.queue_depth(),
+        "mt5_lane_depths": mt5_executor.lane_depths(),
+        "stream_subscribers": len(stream_hub.subscribers),
+        "recorder": market_data_recorder.status(),
+        "tick_feed": tick_feed.status(),
+        "sync": supabase_sync.status(),
+        "accounts": account_pool.status(),
+        "session": session_supervisor.status(),
+        "trading_halted": risk_engine.halted,
+        "trailing_stops": trailing_stops.count(),
+        "filling_modes": filling_modes.status(),
+        "sliced_orders": slice_scheduler.working()
     }
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MT5 Trading Bridge")
+    parser.add_argument("--backend", choices=("mt5", "sim"), default=MT5_BACKEND,
+                        help="terminal backend: a real MetaTrader5 terminal or the built-in simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    
+    if args.backend != MT5_BACKEND:
+        mt5.use(load_backend(args.backend))
+        account_pool.backend = args.backend
+    
     print("Starting MT5 Trading Bridge...")
-    print("Server will run on http://localhost:8000")
-    print("Make sure MT5 terminal is running and 'Allow automated trading' is enabled")
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    print(f"Server will run on http://localhost:{args.port}")
+    if args.backend == "sim":
+        print("Using the built-in simulated terminal")
+    else:
+        print("Make sure MT5 terminal is running and 'Allow automated trading' is enabled")
+    uvicorn.run(app, host=args.host, port=args.port)
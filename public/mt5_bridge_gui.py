@@ -21,13 +21,20 @@ import uvicorn
 import threading
 import time
 import random
-from typing import Optional, Dict, Any
+import os
+import json
+from collections import deque
+from itertools import islice
+from typing import Optional, Dict, Any, List
 import logging
+import logging.handlers
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from datetime import datetime
 import queue
 
+from mt5_paths import BRIDGE_HOME
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -50,7 +57,218 @@ auto_trading_settings = {}
 auto_trading_thread = None
 server_thread = None
 server_running = False
-log_queue = queue.Queue()
+
+# Log entries kept in memory for the GUI and /logs
+LOG_BUFFER_SIZE = int(os.environ.get("MT5_BRIDGE_LOG_BUFFER", "5000"))
+# Lines kept in the log widget, and milliseconds between widget updates
+LOG_DISPLAY_LINES = int(os.environ.get("MT5_BRIDGE_LOG_LINES", "1000"))
+LOG_FLUSH_MS = int(os.environ.get("MT5_BRIDGE_LOG_FLUSH_MS", "250"))
+# Rotating JSONL log file ("" disables it), in the data directory the bridge shares (see mt5_paths.py);
+# size per file and rotated files kept
+LOG_FILE = os.environ.get("MT5_BRIDGE_LOG_FILE", os.path.join(BRIDGE_HOME, "mt5_bridge_log.jsonl"))
+LOG_FILE_MAX_BYTES = int(float(os.environ.get("MT5_BRIDGE_LOG_FILE_MB", "10")) * 1024 * 1024)
+LOG_FILE_BACKUPS = int(os.environ.get("MT5_BRIDGE_LOG_FILE_BACKUPS", "5"))
+# Records waiting for the file writer before new ones are dropped
+LOG_FILE_QUEUE = int(os.environ.get("MT5_BRIDGE_LOG_FILE_QUEUE", "10000"))
+
+# Log pipeline
+#
+# log_to_gui() emits a structured record (level, message, ticket, ...) on the
+# bridge logger. A LogBuffer handler keeps the newest LOG_BUFFER_SIZE entries
+# in a ring that the GUI drains in batches and /logs queries. A bounded queue
+# hands records to a background thread that writes rotating JSONL. Nothing on
+# the request path waits for the widget or the disk; when a consumer falls
+# behind, entries are dropped and counted instead.
+
+class LogBuffer(logging.Handler):
+    """Bounded ring of structured log entries, numbered so readers can resume"""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.entries = deque(maxlen=capacity)
+        self.seq = 0
+        self.overwritten = 0
+        self._ring_lock = threading.Lock()
+
+    def emit(self, record):
+        entry = {"seq": 0, "time": record.created, "level": record.levelname, "message": record.getMessage(),
+                 **getattr(record, "fields", {})}
+        with self._ring_lock:
+            self.seq += 1
+            entry["seq"] = self.seq
+            if len(self.entries) == self.entries.maxlen:
+                self.overwritten += 1
+            self.entries.append(entry)
+
+    def since(self, seq: int):
+        """Entries after `seq` and how many of them were already overwritten"""
+        with self._ring_lock:
+            available = min(self.seq - seq, len(self.entries))
+            entries = list(islice(reversed(self.entries), available))
+            return entries[::-1], self.seq - seq - available
+
+    def query(self, level: Optional[str] = None, ticket: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest first, at or above `level` and/or about one ticket"""
+        threshold = logging.getLevelName(level.upper()) if level else 0
+        if not isinstance(threshold, int):
+            raise ValueError(f"Unknown log level {level}")
+        with self._ring_lock:
+            entries = list(self.entries)
+        matches = []
+        for entry in reversed(entries):
+            if logging.getLevelName(entry["level"]) >= threshold and (ticket is None or entry.get("ticket") == ticket):
+                matches.append(entry)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler on a bounded queue that counts, rather than blocks on, overflow"""
+
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({"time": record.created, "level": record.levelname, "message": record.getMessage(),
+                           **getattr(record, "fields", {})}, default=str)
+
+class LogFileWriter:
+    """Background thread appending queued records to a size-rotated JSONL file.
+
+    Records are taken off the queue in batches and written with one write and
+    one flush per batch, so the writer keeps up with bursts. A batch that
+    cannot be written (disk full, file locked by a viewer) is counted in
+    `failed` and the file is reopened for the next one, so the queue keeps
+    draining.
+    """
+
+    def __init__(self, records: queue.Queue, path: str, max_bytes: int, backups: int, batch: int = 1000):
+        self.records = records
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch = batch
+        self.formatter = JsonLineFormatter()
+        self.failed = 0
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-file-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Write everything queued so far, then end the thread, waiting at most about `timeout` seconds"""
+        if self._thread is not None:
+            try:
+                self.records.put(None, timeout=timeout)
+            except queue.Full:
+                logger.error("Log file writer is not keeping up, closing without flushing it")
+            else:
+                self._thread.join(timeout)
+            self._thread = None
+
+    def _rotate(self, f):
+        f.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        return open(self.path, "w", encoding="utf-8")
+
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _run(self):
+        f = None
+        failing = False
+        stopping = False
+        while not stopping:
+            batch = [self.records.get()]
+            while len(batch) < self.batch:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+            records = [record for record in batch if record is not None]
+            try:
+                text = "".join(self.formatter.format(record) + "\n" for record in records)
+                if f is None:
+                    f = self._open()
+                if self.max_bytes and f.tell() and f.tell() + len(text) > self.max_bytes:
+                    f = self._rotate(f)
+                f.write(text)
+                f.flush()
+                if failing:
+                    failing = False
+                    logger.info("Log file writer recovered")
+            except Exception as e:
+                self.failed += len(records)
+                if not failing:
+                    failing = True
+                    logger.error(f"Log file write failed, retrying with the next batch: {e}")
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+                    f = None
+        if f is not None:
+            f.close()
+
+bridge_log = logging.getLogger("mt5_bridge_gui.events")
+# Console output would put terminal I/O back on the request path
+bridge_log.propagate = False
+log_buffer = LogBuffer(LOG_BUFFER_SIZE)
+bridge_log.addHandler(log_buffer)
+log_file_handler = None
+log_file_listener = None
+if LOG_FILE:
+    log_file_handler = DroppingQueueHandler(LOG_FILE_QUEUE)
+    log_file_listener = LogFileWriter(log_file_handler.queue, LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS)
+    log_file_listener.start()
+    bridge_log.addHandler(log_file_handler)
+
+def log_file_dropped() -> int:
+    """Entries that never reached the JSONL file: queue overflow plus failed writes"""
+    if log_file_handler is None:
+        return 0
+    return log_file_handler.dropped + log_file_listener.failed
+
+def search_log_files(level: Optional[str] = None, ticket: Optional[int] = None, limit: int = 100):
+    """Like LogBuffer.query but over the JSONL file and its rotations, newest first"""
+    threshold = logging.getLevelName(level.upper()) if level else 0
+    if not isinstance(threshold, int):
+        raise ValueError(f"Unknown log level {level}")
+    matches = []
+    paths = [LOG_FILE] + [f"{LOG_FILE}.{i}" for i in range(1, LOG_FILE_BACKUPS + 1)]
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        for line in reversed(lines):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if logging.getLevelName(entry.get("level", "INFO")) >= threshold and \
+                    (ticket is None or entry.get("ticket") == ticket):
+                matches.append(entry)
+                if len(matches) >= limit:
+                    return matches
+    return matches
 
 # Pydantic models
 class ConnectionRequest(BaseModel):
@@ -79,10 +297,9 @@ class AutoTradingRequest(BaseModel):
     max_trades: int
     trading_strategy: str
 
-def log_to_gui(message):
-    """Add log message to GUI queue"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    log_queue.put(f"[{timestamp}] {message}")
+def log_to_gui(message, level=logging.INFO, **fields):
+    """Log a structured entry for the GUI, /logs and the JSONL file; fields such as ticket=... are queryable"""
+    bridge_log.log(level, message, extra={"fields": fields})
 
 @app.post("/connect")
 async def connect_mt5(request: ConnectionRequest):
@@ -91,7 +308,7 @@ async def connect_mt5(request: ConnectionRequest):
     try:
         # Initialize MT5
         if not mt5.initialize():
-            log_to_gui("Failed to initialize MT5")
+            log_to_gui("Failed to initialize MT5", logging.ERROR)
             return {"success": False, "error": "Failed to initialize MT5"}
         
         # Login to account
@@ -103,17 +320,17 @@ async def connect_mt5(request: ConnectionRequest):
         
         if not login_result:
             error_code = mt5.last_error()
-            log_to_gui(f"Login failed: {error_code}")
+            log_to_gui(f"Login failed: {error_code}", logging.ERROR, account=request.account_number)
             return {"success": False, "error": f"Login failed: {error_code}"}
         
         # Get account info
         account_info = mt5.account_info()
         if account_info is None:
-            log_to_gui("Failed to get account info")
+            log_to_gui("Failed to get account info", logging.ERROR)
             return {"success": False, "error": "Failed to get account info"}
         
         mt5_connected = True
-        log_to_gui(f"Connected to MT5 account {request.account_number}")
+        log_to_gui(f"Connected to MT5 account {request.account_number}", account=request.account_number)
         
         return {
             "success": True,
@@ -131,7 +348,7 @@ async def connect_mt5(request: ConnectionRequest):
         }
         
     except Exception as e:
-        log_to_gui(f"Connection error: {str(e)}")
+        log_to_gui(f"Connection error: {str(e)}", logging.ERROR)
         return {"success": False, "error": str(e)}
 
 @app.post("/place_order")
@@ -172,10 +389,12 @@ async def place_order(request: OrderRequest):
         result = mt5.order_send(order_request)
         
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            log_to_gui(f"Order failed: {result.comment}")
+            log_to_gui(f"Order failed: {result.comment}", logging.WARNING, symbol=request.symbol,
+                       retcode=result.retcode)
             return {"success": False, "error": f"Order failed: {result.comment}"}
         
-        log_to_gui(f"Order placed: {request.trade_type} {request.volume} {request.symbol}")
+        log_to_gui(f"Order placed: {request.trade_type} {request.volume} {request.symbol}", ticket=result.order,
+                   symbol=request.symbol)
         return {
             "success": True,
             "trade_info": {
@@ -185,7 +404,7 @@ async def place_order(request: OrderRequest):
         }
         
     except Exception as e:
-        log_to_gui(f"Place order error: {str(e)}")
+        log_to_gui(f"Place order error: {str(e)}", logging.ERROR, symbol=request.symbol)
         return {"success": False, "error": str(e)}
 
 @app.post("/close_order")
@@ -226,10 +445,11 @@ async def close_order(request: CloseOrderRequest):
         result = mt5.order_send(close_request)
         
         if result.retcode != mt5.TRADE_RETCODE_DONE:
-            log_to_gui(f"Close failed: {result.comment}")
+            log_to_gui(f"Close failed: {result.comment}", logging.WARNING, ticket=request.ticket,
+                       retcode=result.retcode)
             return {"success": False, "error": f"Close failed: {result.comment}"}
         
-        log_to_gui(f"Position #{request.ticket} closed")
+        log_to_gui(f"Position #{request.ticket} closed", ticket=request.ticket, symbol=position.symbol)
         return {
             "success": True,
             "close_price": result.price,
@@ -237,7 +457,7 @@ async def close_order(request: CloseOrderRequest):
         }
         
     except Exception as e:
-        log_to_gui(f"Close order error: {str(e)}")
+        log_to_gui(f"Close order error: {str(e)}", logging.ERROR, ticket=request.ticket)
         return {"success": False, "error": str(e)}
 
 @app.post("/account_info")
@@ -362,13 +582,14 @@ def auto_trading_bot():
                     
                     result = mt5.order_send(order_request)
                     if result.retcode == mt5.TRADE_RETCODE_DONE:
-                        log_to_gui(f"Auto trade placed: {trade_type} {lot_size} {symbol} at {price}")
+                        log_to_gui(f"Auto trade placed: {trade_type} {lot_size} {symbol} at {price}",
+                                   ticket=result.order, symbol=symbol)
             
             # Sleep before next cycle
             time.sleep(5)
             
         except Exception as e:
-            log_to_gui(f"Auto trading error: {e}")
+            log_to_gui(f"Auto trading error: {e}", logging.ERROR)
             time.sleep(10)
     
     log_to_gui("Auto trading bot stopped")
@@ -396,7 +617,7 @@ async def start_auto_trading(request: AutoTradingRequest):
         return {"success": True, "message": "Auto trading started"}
         
     except Exception as e:
-        log_to_gui(f"Start auto trading error: {str(e)}")
+        log_to_gui(f"Start auto trading error: {str(e)}", logging.ERROR)
         return {"success": False, "error": str(e)}
 
 @app.post("/stop_auto_trading")
@@ -415,6 +636,27 @@ async def get_status():
         "auto_trading_settings": auto_trading_settings
     }
 
+@app.get("/logs")
+def get_logs(level: Optional[str] = None, ticket: Optional[int] = None, limit: int = 100, source: str = "memory"):
+    # Plain def: FastAPI runs it in its threadpool, so reading log files never blocks the event loop
+    try:
+        limit = max(1, min(limit, 5000))
+        if source == "file":
+            entries = search_log_files(level, ticket, limit) if LOG_FILE else []
+        else:
+            entries = log_buffer.query(level, ticket, limit)
+        return {
+            "success": True,
+            "entries": entries,
+            "dropped": {
+                "overwritten": log_buffer.overwritten,
+                "file": log_file_dropped()
+            }
+        }
+        
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
 class MT5BridgeGUI:
     def __init__(self):
         self.root = tk.Tk()
@@ -425,8 +667,11 @@ class MT5BridgeGUI:
         style = ttk.Style()
         style.theme_use('clam')
         
+        self.log_seq = 0
+        self.log_skipped = 0
         self.setup_ui()
         self.update_status_loop()
+        self.flush_logs_loop()
         
     def setup_ui(self):
         # Main frame
@@ -469,6 +714,12 @@ class MT5BridgeGUI:
         # Logs text area
         self.logs_text = scrolledtext.ScrolledText(logs_frame, wrap=tk.WORD, height=20)
         self.logs_text.pack(fill=tk.BOTH, expand=True)
+        self.logs_text.tag_configure("WARNING", foreground="#b26a00")
+        self.logs_text.tag_configure("ERROR", foreground="red")
+        
+        # Drop counters
+        self.log_stats_label = ttk.Label(logs_frame, text="")
+        self.log_stats_label.pack(anchor=tk.W)
         
         # Initial log message
         self.add_log("MT5 Trading Bridge GUI initialized")
@@ -502,6 +753,9 @@ class MT5BridgeGUI:
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.add_log("Server stopped")
+        if log_file_listener is not None:
+            # Flush queued records to the JSONL file
+            log_file_listener.stop()
         
         # Force close the application
         self.root.after(1000, self.root.quit)
@@ -509,10 +763,44 @@ class MT5BridgeGUI:
     def clear_logs(self):
         self.logs_text.delete(1.0, tk.END)
         
-    def add_log(self, message):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.logs_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.logs_text.see(tk.END)
+    def add_log(self, message, level=logging.INFO):
+        # Through the pipeline like every other entry; safe from any thread
+        log_to_gui(message, level)
+        
+    def flush_logs_loop(self):
+        # One insert per batch, trimmed to LOG_DISPLAY_LINES, instead of one insert per message
+        entries, missed = log_buffer.since(self.log_seq)
+        if entries:
+            self.log_seq = entries[-1]["seq"]
+            if len(entries) > LOG_DISPLAY_LINES:
+                missed += len(entries) - LOG_DISPLAY_LINES
+                entries = entries[-LOG_DISPLAY_LINES:]
+            at_bottom = self.logs_text.yview()[1] >= 0.999
+            if missed:
+                self.log_skipped += missed
+                self.logs_text.insert(tk.END, f"... {missed} log lines skipped\n", "WARNING")
+            chunks = []
+            for entry in entries:
+                timestamp = datetime.fromtimestamp(entry["time"]).strftime("%H:%M:%S")
+                line = f"[{timestamp}] {entry['message']}\n"
+                if chunks and chunks[-1][1] == entry["level"]:
+                    chunks[-1][0].append(line)
+                else:
+                    chunks.append(([line], entry["level"]))
+            # Tk's insert takes text/tags pairs, so a batch is a single call
+            args = []
+            for lines, level in chunks:
+                args.extend(("".join(lines), level))
+            self.logs_text.insert(tk.END, *args)
+            excess = int(self.logs_text.index("end-1c").split(".")[0]) - 1 - LOG_DISPLAY_LINES
+            if excess > 0:
+                self.logs_text.delete("1.0", f"{excess + 1}.0")
+            if at_bottom:
+                self.logs_text.see(tk.END)
+            self.log_stats_label.config(
+                text=f"Skipped in view: {self.log_skipped}   "
+                     f"Dropped from log file: {log_file_dropped()}")
+        self.root.after(LOG_FLUSH_MS, self.flush_logs_loop)
         
     def update_status_loop(self):
         # Update server status
@@ -535,14 +823,6 @@ class MT5BridgeGUI:
         else:
             self.auto_trading_status_label.config(text="Auto Trading: Inactive", foreground="red")
             
-        # Process log queue
-        try:
-            while True:
-                log_message = log_queue.get_nowait()
-                self.add_log(log_message)
-        except queue.Empty:
-            pass
-            
         # Schedule next update
         self.root.after(1000, self.update_status_loop)
         
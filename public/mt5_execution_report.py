@@ -0,0 +1,107 @@
+"""
+MT5 Trading Bridge - Execution Quality Report
+Summarizes the market opens and closes in the bridge's trade journal: fill and
+requote rates, retcodes, order_send round trips and slippage against the
+requested price, overall and grouped by symbol, UTC hour, magic number,
+filling mode, side or kind. It is the offline counterpart of /execution_stats
+and uses the same summary, so the numbers match.
+
+Requirements:
+pip install numpy
+mt5_journal.py and mt5_paths.py must sit next to this script; the bridge itself is
+not imported, so a report never starts a terminal session.
+
+Usage:
+python mt5_execution_report.py
+python mt5_execution_report.py --by hour --symbol EURUSD --start 2024-01-01 --end 2024-02-01
+python mt5_execution_report.py --by filling --json > execution.json
+python mt5_execution_report.py --account live2    # an account served by a worker process
+
+Slippage is in points and positive when the fill was worse than the price
+the order was sent at. Requotes only count prices that moved past the
+order's deviation, so a high requote rate with low fill slippage suggests a
+wider deviation; fills that rarely use the deviation suggest a tighter one.
+"""
+
+import argparse
+import json
+from datetime import datetime, timezone
+
+from mt5_journal import DONE_RETCODE, EXECUTION_GROUPS, JournalReader, summarize_executions
+from mt5_paths import account_journal_path
+
+FILLING_NAMES = {0: "FOK", 1: "IOC", 2: "RETURN", -1: "?"}
+
+def _epoch(text):
+    if text is None:
+        return None
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+def _label(group_by: str, key: str) -> str:
+    if group_by == "hour":
+        return f"{int(key):02d}:00 UTC"
+    if group_by == "filling":
+        return FILLING_NAMES.get(int(key), key)
+    if group_by == "side":
+        return "BUY" if int(key) > 0 else "SELL"
+    return key
+
+def _row(label: str, group: dict) -> str:
+    slippage, latency = group["slippage_points"], group["fill_latency_ms"]
+    return (f"{label:<14} {group['count']:>7} {group['fill_rate']:>6.1%} {group['requote_rate']:>8.1%} "
+            f"{slippage.get('mean', 0):>6.1f} {slippage.get('p50', 0):>6.1f} {slippage.get('p90', 0):>6.1f} "
+            f"{slippage.get('p99', 0):>6.1f} {slippage.get('adverse_rate', 0):>8.1%} "
+            f"{latency.get('p50', 0):>8.1f} {latency.get('p99', 0):>8.1f} "
+            f"{','.join(str(d) for d in group['deviation']) or '-':>6}")
+
+def print_report(summary: dict, group_by: str):
+    if not summary["executions"]:
+        print("No market executions in the journal for this selection")
+        return
+    since = datetime.fromtimestamp(summary["since"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+    until = datetime.fromtimestamp(summary["until"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+    print(f"{summary['executions']} market executions, {since} to {until} UTC")
+    print(f"{'':<14} {'':>7} {'':>6} {'':>8} {'slippage (points)':^27} {'':>8} {'fill ms':^17}")
+    print(f"{group_by or 'all':<14} {'orders':>7} {'fill':>6} {'requote':>8} {'mean':>6} {'p50':>6} {'p90':>6} "
+          f"{'p99':>6} {'adverse':>8} {'p50':>8} {'p99':>8} {'dev':>6}")
+    for key, group in summary.get("groups", {}).items():
+        print(_row(_label(group_by, key), group))
+    print(_row("overall", summary["overall"]))
+
+    overall = summary["overall"]
+    histogram = overall["slippage_points"].get("histogram")
+    if histogram:
+        print("\nSlippage distribution (points, overall)")
+        peak = max(histogram["counts"]) or 1
+        lower = "-Inf"
+        for bound, count in zip(histogram["le"], histogram["counts"]):
+            print(f"  ({lower:>4}, {bound:>4}] {count:>7} {'#' * round(40 * count / peak)}")
+            lower = bound
+    others = {code: n for code, n in overall["retcodes"].items() if code != DONE_RETCODE}
+    if others:
+        print("\nNot filled: " + ", ".join(f"retcode {code} x{n}" for code, n in sorted(others.items())))
+
+def main():
+    parser = argparse.ArgumentParser(description="Execution quality report from the MT5 Trading Bridge journal")
+    parser.add_argument("--journal", help="trade journal database (default: the --account's journal)")
+    parser.add_argument("--account", help="account_id of a worker account; the default session when omitted")
+    parser.add_argument("--by", default="symbol", choices=EXECUTION_GROUPS + ("none",))
+    parser.add_argument("--symbol")
+    parser.add_argument("--magic", type=int)
+    parser.add_argument("--start", help="UTC date YYYY-MM-DD, inclusive")
+    parser.add_argument("--end", help="UTC date YYYY-MM-DD, exclusive")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON instead of tables")
+    args = parser.parse_args()
+
+    group_by = None if args.by == "none" else args.by
+    journal = args.journal or account_journal_path(args.account)
+    records = JournalReader(journal).executions(symbol=args.symbol, magic=args.magic,
+                                                since=_epoch(args.start), until=_epoch(args.end))
+    summary = summarize_executions(records, group_by)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary, group_by)
+
+if __name__ == "__main__":
+    main()
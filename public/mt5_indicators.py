@@ -0,0 +1,306 @@
+"""
+MT5 Trading Bridge - Indicators
+EMA, RSI, MACD, ATR and Bollinger Bands for the strategy engine and the
+backtester.
+
+Every indicator updates in O(1) per new value from a small fixed state, and
+has a vectorized *_batch counterpart over a whole history array. warm_up()
+runs the batch path and leaves the incremental state exactly where feeding
+the same values through update() one by one would have left it.
+
+Requirements:
+pip install numpy
+
+Usage:
+    from mt5_indicators import RSI, rsi_batch
+    rsi = RSI(14)
+    rsi.warm_up(closes)     # same state as rsi.update() over closes
+    value = rsi.update(price)
+    history = rsi_batch(closes, 14)
+"""
+
+from typing import Optional
+
+import numpy as np
+
+def _smooth_batch(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """y[i] = (1 - alpha) * y[i - 1] + alpha * values[i] with y[-1] = initial.
+
+    Solved in closed form per block as decay^(k+1) * (initial + alpha * cumsum(x / decay^(k+1))),
+    with blocks short enough that decay^-k stays below 1e6.
+    """
+    decay = 1.0 - alpha
+    out = np.empty(len(values))
+    if len(values) == 0:
+        return out
+    if decay <= 0.0:
+        out[:] = values
+        return out
+    block = max(1, int(np.log(1e6) / -np.log(decay)))
+    powers = decay ** np.arange(1, block + 1)
+    previous = initial
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        scale = powers[:len(chunk)]
+        out[start:start + len(chunk)] = scale * (previous + alpha * np.cumsum(chunk / scale))
+        previous = out[start + len(chunk) - 1]
+    return out
+
+def ema_batch(values, period: int) -> np.ndarray:
+    """EMA seeded with the SMA of the first `period` values; NaN before that"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        seed = values[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _smooth_batch(values[period:], 2.0 / (period + 1), seed)
+    return out
+
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+def _wilder_averages(values: np.ndarray, period: int):
+    changes = np.diff(values)
+    gains = np.maximum(changes, 0.0)
+    losses = np.maximum(-changes, 0.0)
+    alpha = 1.0 / period
+    avg_gain = np.concatenate(([gains[:period].mean()], _smooth_batch(gains[period:], alpha, gains[:period].mean())))
+    avg_loss = np.concatenate(([losses[:period].mean()], _smooth_batch(losses[period:], alpha, losses[:period].mean())))
+    return avg_gain, avg_loss
+
+def rsi_batch(values, period: int = 14) -> np.ndarray:
+    """Wilder RSI; the first value is at index `period`"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) > period:
+        avg_gain, avg_loss = _wilder_averages(values, period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        rsi[avg_loss == 0] = np.where(avg_gain[avg_loss == 0] > 0, 100.0, 50.0)
+        out[period:] = rsi
+    return out
+
+def macd_batch(values, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Returns (macd, signal, histogram) arrays"""
+    values = np.asarray(values, dtype=np.float64)
+    macd = ema_batch(values, fast) - ema_batch(values, slow)
+    signal_line = np.full(len(values), np.nan)
+    if len(values) >= slow:
+        signal_line[slow - 1:] = ema_batch(macd[slow - 1:], signal)
+    return macd, signal_line, macd - signal_line
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+    tr[0] = high[0] - low[0]
+    return tr
+
+def atr_batch(high, low, close, period: int = 14) -> np.ndarray:
+    """Wilder ATR seeded with the mean of the first `period` true ranges"""
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        tr = _true_range(high, low, close)
+        seed = tr[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _smooth_batch(tr[period:], 1.0 / period, seed)
+    return out
+
+def bollinger_batch(values, period: int = 20, width: float = 2.0):
+    """Returns (middle, upper, lower) arrays using the population standard deviation"""
+    values = np.asarray(values, dtype=np.float64)
+    middle = np.full(len(values), np.nan)
+    deviation = np.full(len(values), np.nan)
+    if len(values) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        middle[period - 1:] = windows.mean(axis=1)
+        deviation[period - 1:] = windows.std(axis=1)
+    return middle, middle + width * deviation, middle - width * deviation
+
+class EMA:
+    def __init__(self, period: int):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.value = None
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, price: float) -> Optional[float]:
+        if self.value is not None:
+            self.value += self.alpha * (price - self.value)
+        else:
+            self._count += 1
+            self._sum += price
+            if self._count == self.period:
+                self.value = self._sum / self.period
+        return self.value
+
+    def warm_up(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if self._count or len(values) < self.period:
+            # Already (partly) seeded: the batch path would restart the seed from values alone
+            return np.array([np.nan if v is None else v for v in map(self.update, values)])
+        series = ema_batch(values, self.period)
+        self.value = float(series[-1])
+        return series
+
+class RSI:
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = None
+        self._previous = None
+        self._count = 0
+        self._gain = 0.0
+        self._loss = 0.0
+
+    def update(self, price: float) -> Optional[float]:
+        if self._previous is None:
+            self._previous = price
+            return None
+        change = price - self._previous
+        self._previous = price
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if self._count < self.period:
+            self._count += 1
+            self._gain += gain
+            self._loss += loss
+            if self._count < self.period:
+                return None
+            self._gain /= self.period
+            self._loss /= self.period
+        else:
+            self._gain += (gain - self._gain) / self.period
+            self._loss += (loss - self._loss) / self.period
+        self.value = _rsi_value(self._gain, self._loss)
+        return self.value
+
+    def warm_up(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if self._previous is not None or len(values) <= self.period:
+            return np.array([np.nan if v is None else v for v in map(self.update, values)])
+        avg_gain, avg_loss = _wilder_averages(values, self.period)
+        self._count = self.period
+        self._gain, self._loss = float(avg_gain[-1]), float(avg_loss[-1])
+        self._previous = float(values[-1])
+        self.value = _rsi_value(self._gain, self._loss)
+        return rsi_batch(values, self.period)
+
+class MACD:
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = None
+
+    def update(self, price: float) -> Optional[tuple]:
+        fast = self.fast.update(price)
+        slow = self.slow.update(price)
+        if slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        self.value = (macd, signal, None if signal is None else macd - signal)
+        return self.value
+
+    def warm_up(self, values) -> tuple:
+        values = np.asarray(values, dtype=np.float64)
+        if self.slow._count or len(values) < self.slow.period:
+            for price in values:
+                self.update(price)
+            return macd_batch(values, self.fast.period, self.slow.period, self.signal.period)
+        fast = self.fast.warm_up(values)
+        slow = self.slow.warm_up(values)
+        self.signal.warm_up((fast - slow)[self.slow.period - 1:])
+        macd = self.fast.value - self.slow.value
+        signal = self.signal.value
+        self.value = (macd, signal, None if signal is None else macd - signal)
+        return macd_batch(values, self.fast.period, self.slow.period, self.signal.period)
+
+class ATR:
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.value = None
+        self._previous_close = None
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        if self._previous_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+        if self.value is not None:
+            self.value += (tr - self.value) / self.period
+        else:
+            self._count += 1
+            self._sum += tr
+            if self._count == self.period:
+                self.value = self._sum / self.period
+        return self.value
+
+    def warm_up(self, high, low, close) -> np.ndarray:
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        if self._previous_close is not None or len(close) < self.period:
+            return np.array([np.nan if v is None else v for v in map(self.update, high, low, close)])
+        series = atr_batch(high, low, close, self.period)
+        self.value = float(series[-1])
+        self._previous_close = float(close[-1])
+        return series
+
+class Bollinger:
+    """Bollinger bands over a ring buffer with a sliding mean/variance update.
+
+    The running sums are rebuilt from the ring every `period` updates so
+    floating point drift cannot accumulate.
+    """
+
+    def __init__(self, period: int = 20, width: float = 2.0):
+        self.period = period
+        self.width = width
+        self.value = None
+        self._ring = np.zeros(period)
+        self._index = 0
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, price: float) -> Optional[tuple]:
+        if self._count < self.period:
+            self._count += 1
+            delta = price - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (price - self._mean)
+        else:
+            old = float(self._ring[self._index])
+            mean = self._mean + (price - old) / self.period
+            self._m2 += (price - old) * (price - mean + old - self._mean)
+            self._mean = mean
+        self._ring[self._index] = price
+        self._index = (self._index + 1) % self.period
+        if self._count < self.period:
+            return None
+        if self._index == 0:
+            self._mean = float(self._ring.mean())
+            self._m2 = float(((self._ring - self._mean) ** 2).sum())
+        deviation = max(self._m2, 0.0) / self.period
+        deviation = deviation ** 0.5
+        self.value = (self._mean, self._mean + self.width * deviation, self._mean - self.width * deviation)
+        return self.value
+
+    def warm_up(self, values) -> tuple:
+        values = np.asarray(values, dtype=np.float64)
+        if self._count or len(values) < self.period:
+            for price in values:
+                self.update(price)
+            return bollinger_batch(values, self.period, self.width)
+        bands = bollinger_batch(values, self.period, self.width)
+        self._ring[:] = values[-self.period:]
+        self._index = 0
+        self._count = self.period
+        self._mean = float(self._ring.mean())
+        self._m2 = float(((self._ring - self._mean) ** 2).sum())
+        self.value = tuple(float(band[-1]) for band in bands)
+        return bands
@@ -0,0 +1,195 @@
+"""
+MT5 Trading Bridge - Trade Journal Schema and Reader
+The SQLite journal the bridge appends every order_send to, and everything
+needed to read and summarize it. The bridge's TradeJournal adds the
+write-behind writer; mt5_execution_report.py reads the same database
+offline without importing the bridge.
+
+Requirements:
+pip install numpy
+
+Usage:
+    from mt5_journal import JournalReader, summarize_executions
+    from mt5_paths import JOURNAL_PATH
+    journal = JournalReader(JOURNAL_PATH)
+    entries, next_cursor = journal.query(symbol="EURUSD", limit=50)
+    summary = summarize_executions(journal.executions(), "hour")
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+JOURNAL_COLUMNS = ("time", "kind", "source", "ticket", "deal", "symbol", "magic", "side", "volume", "price",
+                   "fill_price", "sl", "tp", "retcode", "comment", "error", "latency_ms", "request", "deviation",
+                   "filling", "quote_bid", "quote_ask", "quote_time_msc", "slippage_points")
+
+# Columns added after the first release, appended to older databases on start: name: SQL type
+JOURNAL_ADDED_COLUMNS = {
+    "deviation": "INTEGER",
+    "filling": "INTEGER",
+    "quote_bid": "REAL",
+    "quote_ask": "REAL",
+    "quote_time_msc": "INTEGER",
+    "slippage_points": "REAL",
+}
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time REAL NOT NULL,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    ticket INTEGER,
+    deal INTEGER,
+    symbol TEXT,
+    magic INTEGER,
+    side TEXT,
+    volume REAL,
+    price REAL,
+    fill_price REAL,
+    sl REAL,
+    tp REAL,
+    retcode INTEGER,
+    comment TEXT,
+    error TEXT,
+    latency_ms REAL,
+    request TEXT,
+    deviation INTEGER,
+    filling INTEGER,
+    quote_bid REAL,
+    quote_ask REAL,
+    quote_time_msc INTEGER,
+    slippage_points REAL
+);
+CREATE INDEX IF NOT EXISTS journal_ticket ON journal (ticket);
+CREATE INDEX IF NOT EXISTS journal_symbol_time ON journal (symbol, time);
+CREATE INDEX IF NOT EXISTS journal_magic_time ON journal (magic, time);
+CREATE INDEX IF NOT EXISTS journal_time ON journal (time);
+"""
+
+EXECUTION_DTYPE = np.dtype([("time", "<f8"), ("symbol", "U32"), ("magic", "<i8"), ("kind", "U8"), ("side", "i1"),
+                            ("filling", "i1"), ("retcode", "<i4"), ("deviation", "<i4"), ("slippage", "<f8"),
+                            ("latency_ms", "<f8")])
+# Positive slippage is paid by us, negative is price improvement
+SLIPPAGE_BUCKETS = (-20, -10, -5, -2, -1, 0, 1, 2, 5, 10, 20, 50)
+# Retcodes are spelled out so summaries also work offline, without a terminal module:
+# DONE, and REQUOTE, PRICE_CHANGED, PRICE_OFF (the price moved past deviation before the fill)
+DONE_RETCODE = 10009
+REQUOTE_RETCODES = (10004, 10020, 10021)
+EXECUTION_GROUPS = ("symbol", "hour", "magic", "filling", "side", "kind")
+
+class JournalReader:
+    """Read-only queries over a journal database; a missing file or table reads as empty"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def query(self, ticket: Optional[int] = None, symbol: Optional[str] = None, magic: Optional[int] = None,
+              since: Optional[float] = None, until: Optional[float] = None, cursor: Optional[int] = None,
+              limit: int = 100):
+        """Newest first; pass the returned next_cursor to get the following page"""
+        if not os.path.exists(self.path):
+            return [], None
+        clauses, params = [], []
+        for clause, value in (("ticket = ?", ticket), ("symbol = ?", symbol), ("magic = ?", magic),
+                              ("time >= ?", since), ("time < ?", until), ("id < ?", cursor)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(f"SELECT * FROM journal {where} ORDER BY id DESC LIMIT ?",
+                                      params + [limit + 1]).fetchall()
+        except sqlite3.OperationalError:
+            # No table yet: nothing has been journaled
+            return [], None
+        finally:
+            connection.close()
+        entries = [dict(row) for row in rows[:limit]]
+        for entry in entries:
+            entry["request"] = json.loads(entry["request"]) if entry["request"] else None
+        return entries, (entries[-1]["id"] if len(rows) > limit else None)
+
+    def executions(self, symbol: Optional[str] = None, magic: Optional[int] = None, since: Optional[float] = None,
+                   until: Optional[float] = None) -> np.ndarray:
+        """Journaled market opens and closes as EXECUTION_DTYPE records, oldest first"""
+        if not os.path.exists(self.path):
+            return np.zeros(0, EXECUTION_DTYPE)
+        clauses, params = ["kind IN ('open', 'close')", "retcode IS NOT NULL"], []
+        for clause, value in (("symbol = ?", symbol), ("magic = ?", magic), ("time >= ?", since), ("time < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            rows = connection.execute(
+                f"SELECT time, symbol, magic, kind, side, filling, retcode, deviation, slippage_points, latency_ms "
+                f"FROM journal WHERE {' AND '.join(clauses)} ORDER BY id", params).fetchall()
+        except sqlite3.OperationalError:
+            return np.zeros(0, EXECUTION_DTYPE)
+        finally:
+            connection.close()
+        records = np.zeros(len(rows), EXECUTION_DTYPE)
+        for i, (at, symbol, magic, kind, side, filling, retcode, deviation, slippage, latency) in enumerate(rows):
+            records[i] = (at, symbol or "", magic or 0, kind, 1 if side == "BUY" else -1,
+                          -1 if filling is None else filling, retcode, -1 if deviation is None else deviation,
+                          np.nan if slippage is None else slippage, latency or 0.0)
+        return records
+
+def _percentiles(values: np.ndarray, digits: int = 2) -> Dict[str, Any]:
+    if not len(values):
+        return {}
+    p50, p90, p99 = np.percentile(values, (50, 90, 99))
+    return {"mean": round(float(values.mean()), digits), "p50": round(float(p50), digits),
+            "p90": round(float(p90), digits), "p99": round(float(p99), digits),
+            "max": round(float(values.max()), digits)}
+
+def _execution_group(records: np.ndarray) -> Dict[str, Any]:
+    filled = records["retcode"] == DONE_RETCODE
+    requoted = np.isin(records["retcode"], REQUOTE_RETCODES)
+    slippage = records["slippage"][filled]
+    slippage = slippage[~np.isnan(slippage)]
+    codes, counts = np.unique(records["retcode"], return_counts=True)
+    summary = {
+        "count": int(len(records)),
+        "filled": int(filled.sum()),
+        "fill_rate": round(float(filled.mean()), 4),
+        "requotes": int(requoted.sum()),
+        "requote_rate": round(float(requoted.mean()), 4),
+        "retcodes": {int(code): int(n) for code, n in zip(codes, counts)},
+        "deviation": sorted({int(d) for d in np.unique(records["deviation"]) if d >= 0}),
+        "latency_ms": _percentiles(records["latency_ms"]),
+        "fill_latency_ms": _percentiles(records["latency_ms"][filled]),
+        "slippage_points": _percentiles(slippage, 1),
+    }
+    if len(slippage):
+        buckets = np.bincount(np.searchsorted(SLIPPAGE_BUCKETS, slippage, side="left"),
+                              minlength=len(SLIPPAGE_BUCKETS) + 1)
+        summary["slippage_points"].update({
+            "adverse_rate": round(float((slippage > 0).mean()), 4),
+            "improved_rate": round(float((slippage < 0).mean()), 4),
+            "histogram": {"le": list(SLIPPAGE_BUCKETS) + ["+Inf"], "counts": buckets.tolist()},
+        })
+    return summary
+
+def summarize_executions(records: np.ndarray, group_by: Optional[str] = None) -> Dict[str, Any]:
+    """Fill rate, requotes, retcodes, latency and slippage percentiles, overall and per group"""
+    if group_by is not None and group_by not in EXECUTION_GROUPS:
+        raise ValueError(f"Unknown group_by {group_by}, expected one of {', '.join(EXECUTION_GROUPS)}")
+    summary = {"executions": int(len(records))}
+    if not len(records):
+        return summary
+    summary["since"] = float(records["time"].min())
+    summary["until"] = float(records["time"].max())
+    summary["overall"] = _execution_group(records)
+    if group_by is not None:
+        keys = (records["time"] // 3600 % 24).astype(int) if group_by == "hour" else records[group_by]
+        summary["by"] = group_by
+        summary["groups"] = {str(key): _execution_group(records[keys == key]) for key in np.unique(keys)}
+    return summary
@@ -0,0 +1,195 @@
+"""
+MT5 Trading Bridge - Load Test
+Drives /place_order, /close_order and /positions on a running bridge at a
+target request rate and reports throughput and latency percentiles.
+
+Requirements:
+Python 3.8+ (standard library only)
+
+Usage:
+python mt5_loadtest.py --start-sim --rps 50 --duration 30
+python mt5_loadtest.py --url http://127.0.0.1:8000 --rps 20 --mix place=1,close=1,positions=4
+
+--start-sim launches `mt5_bridge.py --backend sim` on a free port first, so the
+test runs on Linux CI boxes without an MT5 terminal. Requests are sent
+open-loop: the schedule does not slow down when the bridge does, and the time
+a request waited for a free worker is reported as scheduling lag.
+"""
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+ENDPOINTS = ("place", "close", "positions")
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {name: [] for name in ENDPOINTS}
+        self.errors = {name: 0 for name in ENDPOINTS}
+        self.lag = []
+
+    def record(self, name: str, latency_ms: float, ok: bool, lag_ms: float):
+        with self.lock:
+            self.latency[name].append(latency_ms)
+            self.lag.append(lag_ms)
+            if not ok:
+                self.errors[name] += 1
+
+def post(url: str, path: str, body: dict = None, timeout: float = 30.0) -> dict:
+    data = json.dumps(body if body is not None else {}).encode()
+    request = urllib.request.Request(f"{url}{path}", data=data, method="POST",
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_sim_bridge(order_latency: float):
+    port = free_port()
+    # All load comes from one address, so the per-client read limit is switched off
+    env = dict(os.environ, MT5_SIM_ORDER_LATENCY=str(order_latency), MT5_BRIDGE_CLIENT_RATE_READ="0")
+    bridge = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mt5_bridge.py")
+    process = subprocess.Popen([sys.executable, bridge, "--backend", "sim", "--port", str(port)], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/status", timeout=1):
+                return process, url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Simulated bridge did not start within 30 seconds")
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}, expected one of {ENDPOINTS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def run(args, url: str) -> Results:
+    connect = post(url, "/connect", {"server": args.server, "account_number": args.account, "password": args.password})
+    if not connect.get("success"):
+        raise RuntimeError(f"Connect failed: {connect.get('error')}")
+
+    results = Results()
+    tickets = deque()
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    rng = random.Random(args.seed)
+
+    def send(name: str, scheduled: float):
+        lag_ms = (time.perf_counter() - scheduled) * 1000
+        if name == "close" and not tickets:
+            name = "place"
+        start = time.perf_counter()
+        try:
+            if name == "place":
+                symbol = rng.choice(args.symbols)
+                result = post(url, "/place_order", {"symbol": symbol, "trade_type": rng.choice(("BUY", "SELL")),
+                                                    "volume": args.volume, "comment": "loadtest"})
+                if result.get("success"):
+                    tickets.append(result["trade_info"]["ticket"])
+            elif name == "close":
+                try:
+                    ticket = tickets.popleft()
+                except IndexError:
+                    ticket = 0
+                result = post(url, "/close_order", {"ticket": ticket})
+            else:
+                result = post(url, "/positions")
+            ok = bool(result.get("success"))
+        except Exception:
+            ok = False
+        results.record(name, (time.perf_counter() - start) * 1000, ok, lag_ms)
+
+    interval = 1.0 / args.rps
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        started = time.perf_counter()
+        n = 0
+        while True:
+            scheduled = started + n * interval
+            if scheduled - started >= args.duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, rng.choices(names, weights)[0], scheduled)
+            n += 1
+    results.elapsed = time.perf_counter() - started
+
+    if args.cleanup:
+        post(url, "/close_all", {})
+    return results
+
+def report(results: Results, args):
+    print(f"Target {args.rps:.1f} req/s for {args.duration:.0f}s with {args.workers} workers")
+    print(f"{'endpoint':<10} {'sent':>7} {'errors':>7} {'req/s':>8} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    total = 0
+    for name in ENDPOINTS:
+        ordered = sorted(results.latency[name])
+        if not ordered:
+            continue
+        total += len(ordered)
+        print(f"{name:<10} {len(ordered):>7} {results.errors[name]:>7} {len(ordered) / results.elapsed:>8.1f} "
+              f"{percentile(ordered, 0.50):>7.1f}ms {percentile(ordered, 0.90):>7.1f}ms "
+              f"{percentile(ordered, 0.99):>7.1f}ms {ordered[-1]:>7.1f}ms")
+    lag = sorted(results.lag)
+    print(f"{'total':<10} {total:>7} {sum(results.errors.values()):>7} {total / results.elapsed:>8.1f}")
+    print(f"scheduling lag p50={percentile(lag, 0.50):.1f}ms p99={percentile(lag, 0.99):.1f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the MT5 Trading Bridge")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--start-sim", action="store_true", help="start a bridge on the simulated terminal")
+    parser.add_argument("--sim-order-latency", type=float, default=0.05, help="simulated order_send seconds")
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--workers", type=int, default=32, help="concurrent HTTP clients")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("place=1,close=1,positions=2"),
+                        help="endpoint weights, e.g. place=1,close=1,positions=2")
+    parser.add_argument("--symbols", nargs="+", default=["EURUSD", "GBPUSD", "USDJPY"])
+    parser.add_argument("--volume", type=float, default=0.01)
+    parser.add_argument("--server", default="Simulator")
+    parser.add_argument("--account", type=int, default=1)
+    parser.add_argument("--password", default="")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-cleanup", dest="cleanup", action="store_false",
+                        help="leave positions opened by the test open")
+    args = parser.parse_args()
+
+    process = None
+    url = args.url
+    if args.start_sim:
+        process, url = start_sim_bridge(args.sim_order_latency)
+        print(f"Started simulated bridge on {url}")
+    try:
+        report(run(args, url), args)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+if __name__ == "__main__":
+    main()
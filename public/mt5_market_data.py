@@ -0,0 +1,134 @@
+"""
+MT5 Trading Bridge - Recorded Market Data
+Fixed-width binary files the bridge's market data recorder appends ticks and
+M1 bars to, one directory per symbol and one file per UTC day (plus a part
+number once a file reaches MT5_BRIDGE_RECORD_MAX_MB):
+
+    {MT5_BRIDGE_DATA_DIR}/{symbol}/ticks-YYYYMMDD-N.bin   TICK_RECORD_DTYPE
+    {MT5_BRIDGE_DATA_DIR}/{symbol}/bars-M1-YYYYMMDD-N.bin BAR_RECORD_DTYPE
+
+Records are little-endian, packed and in time order, so a file can be
+memory-mapped as a NumPy array and sliced by time with searchsorted.
+
+Requirements:
+pip install numpy
+
+Usage:
+    from mt5_market_data import MarketDataStore
+    from mt5_paths import RECORD_DIR
+    bars = MarketDataStore(RECORD_DIR).read("EURUSD", "bars", start, end)
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+TICK_RECORD_DTYPE = np.dtype([("time_msc", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+                              ("volume", "<f8"), ("flags", "<u4")])
+BAR_RECORD_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+                             ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8")])
+
+# kind: (file prefix, dtype, time field, time units per second)
+RECORD_KINDS = {
+    "ticks": ("ticks", TICK_RECORD_DTYPE, "time_msc", 1000),
+    "bars": ("bars-M1", BAR_RECORD_DTYPE, "time", 1),
+}
+
+class MarketDataStore:
+    """Append-only columnar-record files with memory-mapped, zero-copy reads"""
+
+    def __init__(self, root: str, max_file_bytes: int = 256 * 1024 * 1024):
+        self.root = root
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+
+    def _files(self, symbol: str, kind: str) -> list:
+        prefix = RECORD_KINDS[kind][0]
+        directory = os.path.join(self.root, symbol)
+        if not os.path.isdir(directory):
+            return []
+        files = []
+        for name in os.listdir(directory):
+            if not name.startswith(prefix + "-") or not name.endswith(".bin"):
+                continue
+            day, _, part = name[len(prefix) + 1:-4].partition("-")
+            if day.isdigit() and part.isdigit():
+                files.append((day, int(part), os.path.join(directory, name)))
+        return sorted(files)
+
+    def append(self, symbol: str, kind: str, records: np.ndarray):
+        prefix, dtype, field, per_second = RECORD_KINDS[kind]
+        if len(records) == 0:
+            return
+        records = np.ascontiguousarray(records, dtype=dtype)
+        days = records[field] // (86400 * per_second)
+        boundaries = np.flatnonzero(np.diff(days)) + 1
+        with self._lock:
+            os.makedirs(os.path.join(self.root, symbol), exist_ok=True)
+            for chunk in np.split(records, boundaries):
+                day = time.strftime("%Y%m%d", time.gmtime(int(chunk[field][0]) // per_second))
+                existing = [f for f in self._files(symbol, kind) if f[0] == day]
+                part = existing[-1][1] if existing else 0
+                path = os.path.join(self.root, symbol, f"{prefix}-{day}-{part}.bin")
+                if os.path.exists(path) and os.path.getsize(path) + chunk.nbytes > self.max_file_bytes:
+                    path = os.path.join(self.root, symbol, f"{prefix}-{day}-{part + 1}.bin")
+                with open(path, "ab") as f:
+                    chunk.tofile(f)
+
+    def _map(self, path: str, dtype: np.dtype) -> Optional[np.ndarray]:
+        # A crash mid-write can leave a partial record at the end; ignore it
+        count = os.path.getsize(path) // dtype.itemsize
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def read(self, symbol: str, kind: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """Records with start <= time < end (epoch seconds).
+
+        A range inside one file is returned as a read-only view of the mapped
+        file; ranges spanning files are concatenated into a new array.
+        """
+        _, dtype, field, per_second = RECORD_KINDS[kind]
+        low = None if start is None else int(start * per_second)
+        high = None if end is None else int(end * per_second)
+        first_day = None if start is None else time.strftime("%Y%m%d", time.gmtime(start))
+        last_day = None if end is None else time.strftime("%Y%m%d", time.gmtime(end))
+        pieces = []
+        for day, _, path in self._files(symbol, kind):
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            mapped = self._map(path, dtype)
+            if mapped is None:
+                continue
+            times = mapped[field]
+            lo = 0 if low is None else int(np.searchsorted(times, low, "left"))
+            hi = len(mapped) if high is None else int(np.searchsorted(times, high, "left"))
+            if hi > lo:
+                pieces.append(mapped[lo:hi])
+        if not pieces:
+            return np.empty(0, dtype=dtype)
+        return pieces[0] if len(pieces) == 1 else np.concatenate(pieces)
+
+    def tail(self, symbol: str, kind: str, count: int) -> np.ndarray:
+        """The last `count` records, newest last"""
+        _, dtype, _, _ = RECORD_KINDS[kind]
+        pieces = []
+        remaining = count
+        for _, _, path in reversed(self._files(symbol, kind)):
+            mapped = self._map(path, dtype)
+            if mapped is None:
+                continue
+            pieces.append(mapped[-remaining:])
+            remaining -= len(pieces[-1])
+            if remaining <= 0:
+                break
+        if not pieces:
+            return np.empty(0, dtype=dtype)
+        return pieces[0] if len(pieces) == 1 else np.concatenate(pieces[::-1])
+
+    def last_time(self, symbol: str, kind: str) -> Optional[int]:
+        last = self.tail(symbol, kind, 1)
+        return int(last[RECORD_KINDS[kind][2]][0]) if len(last) else None
@@ -0,0 +1,39 @@
+"""
+MT5 Trading Bridge - Data Paths
+Where the bridge keeps the files it writes, so the offline tools
+(mt5_execution_report.py, mt5_backtest.py) can find the trade journal and
+recorded market data without importing the bridge.
+
+Everything goes to a per-user data directory (%LOCALAPPDATA%\\MT5Bridge on
+Windows, $XDG_DATA_HOME/mt5bridge or ~/.local/share/mt5bridge elsewhere),
+never the working directory, which may be a served web root.
+
+Usage:
+    from mt5_paths import JOURNAL_PATH, account_journal_path
+    journal = account_journal_path("live2")
+"""
+
+import os
+from typing import Optional
+
+def user_data_dir(app: str = "MT5Bridge") -> str:
+    """Per-user directory for app's data files"""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+        return os.path.join(base, app)
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, app.lower())
+
+# Directory for files the bridge writes: journal, sync outboxes, recorded market data
+BRIDGE_HOME = os.environ.get("MT5_BRIDGE_HOME") or user_data_dir()
+# Market data recorder output directory
+RECORD_DIR = os.environ.get("MT5_BRIDGE_DATA_DIR", os.path.join(BRIDGE_HOME, "market_data"))
+# SQLite trade journal of every order_send
+JOURNAL_PATH = os.environ.get("MT5_BRIDGE_JOURNAL", os.path.join(BRIDGE_HOME, "bridge_journal.db"))
+
+def account_journal_path(account_id: Optional[str] = None) -> str:
+    """Journal file of an account: JOURNAL_PATH for the default session, a sibling file per account worker"""
+    if not account_id:
+        return JOURNAL_PATH
+    safe_id = "".join(c if c.isalnum() else "_" for c in account_id)
+    return f"{os.path.splitext(JOURNAL_PATH)[0]}-{safe_id}.db"
@@ -0,0 +1,569 @@
+"""
+MT5 Trading Bridge - Simulated Terminal
+A stand-in for the MetaTrader5 module so the bridge can run, be benchmarked
+and be load-tested without a Windows MT5 terminal: random-walk or replayed
+ticks, positions, pending orders and fills with configurable latency,
+slippage, rejects and requotes.
+
+Requirements:
+pip install numpy
+
+Usage:
+MT5_BRIDGE_BACKEND=sim python mt5_bridge.py
+python mt5_bridge.py --backend sim
+
+    from mt5_sim import SimulatedTerminal
+    mt5 = SimulatedTerminal(order_latency=0.0, seed=1)
+    mt5.initialize()
+    mt5.symbol_info_tick("EURUSD")
+
+SimulatedTerminal.from_env() reads its settings from MT5_SIM_* variables
+(MT5_SIM_ORDER_LATENCY, MT5_SIM_REQUOTE_RATE, MT5_SIM_TICK_FILE, ...).
+"""
+
+import bisect
+import os
+import random
+import threading
+import time
+import zlib
+from collections import deque, namedtuple
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+SimTick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SimSymbolInfo = namedtuple("SymbolInfo", "name point digits spread volume_min volume_max volume_step trade_stops_level "
+                                         "filling_mode trade_contract_size currency_base currency_profit currency_margin")
+SimAccountInfo = namedtuple("AccountInfo", "login name server company currency balance equity profit margin "
+                                           "margin_free margin_level leverage")
+SimTerminalInfo = namedtuple("TerminalInfo", "connected trade_allowed ping_last build name company")
+SimPosition = namedtuple("TradePosition", "ticket time time_msc type magic identifier volume price_open sl tp "
+                                          "price_current swap profit symbol comment")
+SimOrder = namedtuple("TradeOrder", "ticket time_setup time_setup_msc time_expiration type type_time magic "
+                                     "volume_initial volume_current price_open sl tp price_current symbol comment")
+SimOrderSendResult = namedtuple("OrderSendResult", "retcode deal order volume price bid ask comment request_id request")
+
+SIM_TICK_DTYPE = np.dtype([("time", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"), ("volume", "<u8"),
+                           ("time_msc", "<i8"), ("flags", "<u4"), ("volume_real", "<f8")])
+SIM_RATE_DTYPE = np.dtype([("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+                           ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8")])
+
+# symbol: (start price, digits, spread in points, allowed filling modes as SYMBOL_FILLING_* bits)
+SIM_SYMBOLS = {
+    "EURUSD": (1.0850, 5, 12, 3),
+    "GBPUSD": (1.2650, 5, 15, 3),
+    "USDJPY": (151.20, 3, 14, 3),
+    "AUDUSD": (0.6550, 5, 14, 3),
+    "USDCHF": (0.9050, 5, 16, 3),
+    "XAUUSD": (2350.00, 2, 25, 1),
+}
+
+class SimulatedTerminal:
+    """In-memory MT5 terminal: random-walk or replayed ticks, positions, pending orders, fills.
+
+    Fills take `order_latency` seconds, slip by up to `slippage_points`
+    against the trader, and are rejected or requoted at the configured
+    rates. Every other call takes `call_latency` seconds. Calls are counted
+    per function in `calls`.
+    """
+
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_TYPE_BUY_LIMIT = 2
+    ORDER_TYPE_SELL_LIMIT = 3
+    ORDER_TYPE_BUY_STOP = 4
+    ORDER_TYPE_SELL_STOP = 5
+    TRADE_ACTION_DEAL = 1
+    TRADE_ACTION_PENDING = 5
+    TRADE_ACTION_SLTP = 6
+    TRADE_ACTION_MODIFY = 7
+    TRADE_ACTION_REMOVE = 8
+    ORDER_TIME_GTC = 0
+    ORDER_TIME_SPECIFIED = 2
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    ORDER_FILLING_RETURN = 2
+    SYMBOL_FILLING_FOK = 1
+    SYMBOL_FILLING_IOC = 2
+    TIMEFRAME_M1 = 1
+    COPY_TICKS_ALL = -1
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_REJECT = 10006
+    TRADE_RETCODE_PLACED = 10008
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_INVALID_STOPS = 10016
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_PRICE_CHANGED = 10020
+    TRADE_RETCODE_NO_CHANGES = 10025
+    TRADE_RETCODE_INVALID_FILL = 10030
+    TRADE_RETCODE_CONNECTION = 10031
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+
+    def __init__(self, order_latency: float = 0.05, call_latency: float = 0.0, slippage_points: int = 3,
+                 reject_rate: float = 0.0, requote_rate: float = 0.0, volatility: float = 0.0002,
+                 balance: float = 10000.0, leverage: int = 100, replay_file: Optional[str] = None,
+                 replay_speed: float = 1.0, seed: Optional[int] = None):
+        self.order_latency = order_latency
+        self.call_latency = call_latency
+        self.slippage_points = slippage_points
+        self.reject_rate = reject_rate
+        self.requote_rate = requote_rate
+        self.volatility = volatility
+        self.leverage = leverage
+        self.replay_speed = replay_speed
+        self.calls = {}
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._last_error = (1, "Success")
+        self._login = 0
+        self._server = ""
+        self._balance = balance
+        self._positions = {}
+        self._orders = {}
+        self._next_ticket = 100000
+        self._quotes = {}
+        self._last_quotes = {}
+        self._history = {}
+        self._replay = {}
+        self._started = time.time()
+        self._offline_until = 0.0
+        if replay_file:
+            self._load_replay(replay_file)
+
+    @classmethod
+    def from_env(cls):
+        env = os.environ.get
+        return cls(
+            order_latency=float(env("MT5_SIM_ORDER_LATENCY", "0.05")),
+            call_latency=float(env("MT5_SIM_CALL_LATENCY", "0")),
+            slippage_points=int(env("MT5_SIM_SLIPPAGE", "3")),
+            reject_rate=float(env("MT5_SIM_REJECT_RATE", "0")),
+            requote_rate=float(env("MT5_SIM_REQUOTE_RATE", "0")),
+            volatility=float(env("MT5_SIM_VOLATILITY", "0.0002")),
+            balance=float(env("MT5_SIM_BALANCE", "10000")),
+            replay_file=env("MT5_SIM_TICK_FILE") or None,
+            replay_speed=float(env("MT5_SIM_REPLAY_SPEED", "1")),
+            seed=int(env("MT5_SIM_SEED")) if env("MT5_SIM_SEED") else None,
+        )
+
+    def _count(self, name: str, delay: float):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if delay:
+            time.sleep(delay)
+
+    # Market data
+
+    def _load_replay(self, path: str):
+        """CSV lines of time_msc,symbol,bid,ask replayed relative to startup"""
+        rows = {}
+        with open(path) as f:
+            for line in f:
+                parts = line.strip().split(",")
+                if len(parts) != 4 or not parts[0].isdigit():
+                    continue
+                rows.setdefault(parts[1], []).append((int(parts[0]), float(parts[2]), float(parts[3])))
+        for symbol, ticks in rows.items():
+            ticks.sort()
+            first = ticks[0][0]
+            self._replay[symbol] = ([t - first for t, _, _ in ticks], ticks)
+            if symbol not in SIM_SYMBOLS:
+                digits = max(len(f"{ticks[0][1]}".split(".")[-1]), 2)
+                SIM_SYMBOLS[symbol] = (ticks[0][1], digits, 10, 3)
+
+    def _quote(self, symbol: str):
+        """Advance the symbol's price to now and return (bid, ask, time_msc)"""
+        now = time.time()
+        spec = SIM_SYMBOLS.get(symbol)
+        if spec is None:
+            return None
+        point = 10 ** -spec[1]
+        if symbol in self._replay:
+            offsets, ticks = self._replay[symbol]
+            elapsed_ms = (now - self._started) * 1000 * self.replay_speed
+            _, bid, ask = ticks[max(0, bisect.bisect_right(offsets, elapsed_ms) - 1)]
+        else:
+            mid, updated = self._quotes.get(symbol, (spec[0], now))
+            elapsed = max(now - updated, 0.0)
+            if elapsed:
+                mid *= float(np.exp(self._random.gauss(0.0, self.volatility * elapsed ** 0.5)))
+            self._quotes[symbol] = (mid, now)
+            bid = round(mid - spec[2] * point / 2, spec[1])
+            ask = round(bid + spec[2] * point, spec[1])
+        quote = (bid, ask, int(now * 1000))
+        previous = self._last_quotes.get(symbol)
+        if previous is None or previous[:2] != quote[:2]:
+            self._history.setdefault(symbol, deque(maxlen=100000)).append(quote)
+        self._last_quotes[symbol] = quote
+        self._check_orders(symbol, bid, ask)
+        self._check_stops(symbol, bid, ask)
+        return self._last_quotes[symbol]
+
+    def _advance_open_symbols(self):
+        # Move prices (and trigger pending orders and SL/TP) before reading
+        # positions or orders, so the reads below see a consistent book
+        symbols = {p["symbol"] for p in self._positions.values()} | {o["symbol"] for o in self._orders.values()}
+        for symbol in symbols:
+            self._quote(symbol)
+
+    def _check_orders(self, symbol: str, bid: float, ask: float):
+        now = time.time()
+        for order in list(self._orders.values()):
+            if order["symbol"] != symbol:
+                continue
+            if order["expiration"] and now >= order["expiration"]:
+                del self._orders[order["ticket"]]
+                continue
+            kind, price = order["type"], order["price_open"]
+            if kind == self.ORDER_TYPE_BUY_LIMIT and ask <= price or kind == self.ORDER_TYPE_SELL_LIMIT and bid >= price:
+                fill = price
+            elif kind == self.ORDER_TYPE_BUY_STOP and ask >= price:
+                fill = ask
+            elif kind == self.ORDER_TYPE_SELL_STOP and bid <= price:
+                fill = bid
+            else:
+                continue
+            del self._orders[order["ticket"]]
+            is_buy = kind in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_BUY_STOP)
+            self._positions[order["ticket"]] = {
+                "ticket": order["ticket"], "symbol": symbol, "volume": order["volume"], "price_open": fill,
+                "type": self.ORDER_TYPE_BUY if is_buy else self.ORDER_TYPE_SELL, "sl": order["sl"],
+                "tp": order["tp"], "magic": order["magic"], "comment": order["comment"], "time": int(now),
+            }
+
+    def _check_stops(self, symbol: str, bid: float, ask: float):
+        for position in list(self._positions.values()):
+            if position["symbol"] != symbol:
+                continue
+            is_buy = position["type"] == self.ORDER_TYPE_BUY
+            price = bid if is_buy else ask
+            sl, tp = position["sl"], position["tp"]
+            if sl and (price <= sl if is_buy else price >= sl):
+                self._close(position, position["volume"], sl)
+            elif tp and (price >= tp if is_buy else price <= tp):
+                self._close(position, position["volume"], tp)
+
+    # Terminal and account
+
+    def initialize(self, *args, **kwargs):
+        self._count("initialize", self.call_latency)
+        if time.time() < self._offline_until:
+            self._last_error = (-10003, "IPC initialize failed")
+            return False
+        self._initialized = True
+        self._last_error = (1, "Success")
+        return True
+
+    def drop_connection(self, seconds: float):
+        """Simulate the terminal going away: calls fail and initialize() is refused for `seconds`"""
+        self._offline_until = time.time() + seconds
+        self._initialized = False
+        self._last_error = (-10004, "No IPC connection")
+
+    def login(self, login=0, password="", server="", **kwargs):
+        self._count("login", self.call_latency)
+        self._login, self._server = login, server
+        return self._initialized
+
+    def shutdown(self):
+        self._count("shutdown", 0)
+        self._initialized = False
+        return True
+
+    def last_error(self):
+        self._count("last_error", 0)
+        return self._last_error
+
+    def terminal_info(self):
+        self._count("terminal_info", self.call_latency)
+        return SimTerminalInfo(self._initialized, True, 1000, 4000, "Simulated Terminal", "OMNIA Simulator")
+
+    def _profit(self, position, bid: float, ask: float) -> float:
+        is_buy = position["type"] == self.ORDER_TYPE_BUY
+        move = (bid - position["price_open"]) if is_buy else (position["price_open"] - ask)
+        profit = move * position["volume"] * self._contract_size(position["symbol"])
+        # Convert quote-currency profit into the USD account currency
+        if position["symbol"].startswith("USD"):
+            profit /= bid
+        return round(profit, 2)
+
+    def _contract_size(self, symbol: str) -> float:
+        return 100.0 if symbol.startswith("XAU") else 100000.0
+
+    def account_info(self):
+        self._count("account_info", self.call_latency)
+        if not self._initialized:
+            return None
+        with self._lock:
+            self._advance_open_symbols()
+            profit = 0.0
+            margin = 0.0
+            for position in self._positions.values():
+                bid, ask, _ = self._last_quotes[position["symbol"]]
+                profit += self._profit(position, bid, ask)
+                notional = position["volume"] * self._contract_size(position["symbol"])
+                margin += notional / self.leverage * (1.0 if position["symbol"].startswith("USD") else position["price_open"])
+            equity = self._balance + profit
+            return SimAccountInfo(self._login, "Simulated Account", self._server, "OMNIA Simulator", "USD",
+                                  round(self._balance, 2), round(equity, 2), round(profit, 2), round(margin, 2),
+                                  round(equity - margin, 2), round(equity / margin * 100, 2) if margin else 0.0,
+                                  self.leverage)
+
+    # Symbols
+
+    def symbol_info(self, symbol: str):
+        self._count("symbol_info", self.call_latency)
+        spec = SIM_SYMBOLS.get(symbol)
+        if spec is None:
+            return None
+        start, digits, spread, filling = spec
+        return SimSymbolInfo(symbol, 10 ** -digits, digits, spread, 0.01, 100.0, 0.01, 10, filling,
+                             self._contract_size(symbol), symbol[:3], symbol[3:], symbol[:3])
+
+    def symbol_select(self, symbol: str, enable: bool = True):
+        self._count("symbol_select", 0)
+        return symbol in SIM_SYMBOLS
+
+    def symbol_info_tick(self, symbol: str):
+        self._count("symbol_info_tick", self.call_latency)
+        with self._lock:
+            quote = self._quote(symbol)
+        if quote is None:
+            return None
+        bid, ask, time_msc = quote
+        return SimTick(time_msc // 1000, bid, ask, bid, 1, time_msc, 6, 1.0)
+
+    def copy_ticks_from(self, symbol: str, date_from, count: int, flags: int):
+        self._count("copy_ticks_from", self.call_latency)
+        with self._lock:
+            if self._quote(symbol) is None:
+                return None
+            since = int(date_from.timestamp() if hasattr(date_from, "timestamp") else date_from) * 1000
+            rows = [q for q in self._history.get(symbol, ()) if q[2] >= since][:count]
+        ticks = np.zeros(len(rows), dtype=SIM_TICK_DTYPE)
+        if rows:
+            bid, ask, time_msc = (np.array(column) for column in zip(*rows))
+            ticks["time"] = time_msc // 1000
+            ticks["bid"], ticks["ask"], ticks["last"] = bid, ask, bid
+            ticks["volume"], ticks["volume_real"] = 1, 1.0
+            ticks["time_msc"], ticks["flags"] = time_msc, 6
+        return ticks
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int):
+        self._count("copy_rates_from_pos", self.call_latency)
+        with self._lock:
+            quote = self._quote(symbol)
+        if quote is None:
+            return None
+        rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+        step = 60 * max(timeframe, 1)
+        walk = np.cumsum(rng.normal(0.0, self.volatility * np.sqrt(step), count))
+        close = quote[0] * np.exp(walk - walk[-1])
+        rates = np.zeros(count, dtype=SIM_RATE_DTYPE)
+        rates["time"] = (quote[2] // 1000 // step - start_pos - count + 1 + np.arange(count)) * step
+        rates["open"] = np.concatenate(([close[0]], close[:-1]))
+        rates["high"] = np.maximum(rates["open"], close) * (1 + self.volatility)
+        rates["low"] = np.minimum(rates["open"], close) * (1 - self.volatility)
+        rates["close"] = close
+        rates["tick_volume"] = rng.integers(10, 200, count)
+        rates["spread"] = SIM_SYMBOLS[symbol][2]
+        return rates
+
+    # Positions and orders
+
+    def _position_tuple(self, position):
+        bid, ask, _ = self._last_quotes[position["symbol"]]
+        is_buy = position["type"] == self.ORDER_TYPE_BUY
+        return SimPosition(position["ticket"], position["time"], position["time"] * 1000, position["type"],
+                           position["magic"], position["ticket"], position["volume"], position["price_open"],
+                           position["sl"], position["tp"], bid if is_buy else ask, 0.0,
+                           self._profit(position, bid, ask), position["symbol"], position["comment"])
+
+    def positions_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None, group: Optional[str] = None):
+        self._count("positions_get", self.call_latency)
+        with self._lock:
+            self._advance_open_symbols()
+            positions = [p for p in self._positions.values()
+                         if (symbol is None or p["symbol"] == symbol) and (ticket is None or p["ticket"] == ticket)]
+            return tuple(self._position_tuple(p) for p in positions)
+
+    def positions_total(self):
+        self._count("positions_total", 0)
+        return len(self._positions)
+
+    def _order_tuple(self, order):
+        bid, ask, _ = self._last_quotes[order["symbol"]]
+        is_buy = order["type"] in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_BUY_STOP)
+        return SimOrder(order["ticket"], order["time"], order["time"] * 1000, int(order["expiration"]), order["type"],
+                        self.ORDER_TIME_SPECIFIED if order["expiration"] else self.ORDER_TIME_GTC, order["magic"],
+                        order["volume"], order["volume"], order["price_open"], order["sl"], order["tp"],
+                        ask if is_buy else bid, order["symbol"], order["comment"])
+
+    def orders_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None, group: Optional[str] = None):
+        self._count("orders_get", self.call_latency)
+        with self._lock:
+            self._advance_open_symbols()
+            orders = [o for o in self._orders.values()
+                      if (symbol is None or o["symbol"] == symbol) and (ticket is None or o["ticket"] == ticket)]
+            return tuple(self._order_tuple(o) for o in orders)
+
+    def orders_total(self):
+        self._count("orders_total", 0)
+        return len(self._orders)
+
+    def _result(self, retcode: int, request: Dict[str, Any], comment: str, deal: int = 0, order: int = 0,
+                price: float = 0.0, bid: float = 0.0, ask: float = 0.0):
+        return SimOrderSendResult(retcode, deal, order, request.get("volume", 0.0), price, bid, ask, comment, 0, request)
+
+    def _close(self, position, volume: float, price: float):
+        closing = dict(position, volume=volume)
+        profit = self._profit(closing, price, price)
+        self._balance += profit
+        remaining = round(position["volume"] - volume, 2)
+        if remaining <= 0:
+            del self._positions[position["ticket"]]
+        else:
+            position["volume"] = remaining
+        return profit
+
+    def order_send(self, request: Dict[str, Any]):
+        self._count("order_send", 0)
+        if self.order_latency:
+            time.sleep(self.order_latency * self._random.uniform(0.5, 1.5))
+        with self._lock:
+            if not self._initialized:
+                return self._result(self.TRADE_RETCODE_CONNECTION, request, "No connection")
+            handler = {
+                self.TRADE_ACTION_DEAL: self._deal,
+                self.TRADE_ACTION_PENDING: self._pending,
+                self.TRADE_ACTION_SLTP: self._sltp,
+                self.TRADE_ACTION_MODIFY: self._modify,
+                self.TRADE_ACTION_REMOVE: self._remove,
+            }.get(request.get("action"))
+            if handler is None:
+                return self._result(self.TRADE_RETCODE_INVALID, request, "Unsupported action")
+            return handler(request)
+
+    def _stops_invalid(self, is_buy: bool, price: float, sl: float, tp: float) -> bool:
+        return bool((sl and (sl >= price if is_buy else sl <= price)) or (tp and (tp <= price if is_buy else tp >= price)))
+
+    def _pending(self, request: Dict[str, Any]):
+        symbol = request.get("symbol", "")
+        spec = SIM_SYMBOLS.get(symbol)
+        if spec is None:
+            return self._result(self.TRADE_RETCODE_INVALID, request, "Unknown symbol")
+        bid, ask, _ = self._quote(symbol)
+        volume = request.get("volume", 0.0)
+        if volume < 0.01 or volume > 100.0 or abs(round(volume / 0.01) * 0.01 - volume) > 1e-9:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume", bid=bid, ask=ask)
+        kind, price = request.get("type"), request.get("price", 0.0)
+        valid = {
+            self.ORDER_TYPE_BUY_LIMIT: price < ask,
+            self.ORDER_TYPE_SELL_LIMIT: price > bid,
+            self.ORDER_TYPE_BUY_STOP: price > ask,
+            self.ORDER_TYPE_SELL_STOP: price < bid,
+        }.get(kind)
+        if not valid:
+            return self._result(self.TRADE_RETCODE_INVALID_PRICE, request, "Invalid price", bid=bid, ask=ask)
+        sl, tp = request.get("sl", 0.0) or 0.0, request.get("tp", 0.0) or 0.0
+        if self._stops_invalid(kind in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_BUY_STOP), price, sl, tp):
+            return self._result(self.TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", bid=bid, ask=ask)
+        self._next_ticket += 1
+        ticket = self._next_ticket
+        self._orders[ticket] = {
+            "ticket": ticket, "symbol": symbol, "type": kind, "volume": volume, "price_open": round(price, spec[1]),
+            "sl": sl, "tp": tp, "magic": request.get("magic", 0), "comment": request.get("comment", ""),
+            "time": int(time.time()),
+            "expiration": request.get("expiration", 0) if request.get("type_time") == self.ORDER_TIME_SPECIFIED else 0,
+        }
+        return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", 0, ticket, price, bid, ask)
+
+    def _sltp(self, request: Dict[str, Any]):
+        position = self._positions.get(request.get("position"))
+        if position is None:
+            return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request, "Position closed")
+        bid, ask, _ = self._quote(position["symbol"])
+        is_buy = position["type"] == self.ORDER_TYPE_BUY
+        sl, tp = request.get("sl", 0.0) or 0.0, request.get("tp", 0.0) or 0.0
+        if (sl, tp) == (position["sl"], position["tp"]):
+            return self._result(self.TRADE_RETCODE_NO_CHANGES, request, "No changes", bid=bid, ask=ask)
+        if self._stops_invalid(is_buy, bid if is_buy else ask, sl, tp):
+            return self._result(self.TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", bid=bid, ask=ask)
+        position["sl"], position["tp"] = sl, tp
+        return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", 0, position["ticket"], 0.0, bid, ask)
+
+    def _modify(self, request: Dict[str, Any]):
+        order = self._orders.get(request.get("order"))
+        if order is None:
+            return self._result(self.TRADE_RETCODE_INVALID, request, "Order not found")
+        changes = {"price_open": request.get("price") or order["price_open"],
+                   "sl": request.get("sl", 0.0) or 0.0, "tp": request.get("tp", 0.0) or 0.0,
+                   "expiration": request.get("expiration", 0) if request.get("type_time") == self.ORDER_TIME_SPECIFIED else 0}
+        if all(order[key] == value for key, value in changes.items()):
+            return self._result(self.TRADE_RETCODE_NO_CHANGES, request, "No changes")
+        del self._orders[order["ticket"]]
+        placed = self._pending(dict(request, symbol=order["symbol"], type=order["type"], volume=order["volume"],
+                                    price=changes["price_open"], magic=order["magic"], comment=order["comment"]))
+        if placed.retcode != self.TRADE_RETCODE_DONE:
+            self._orders[order["ticket"]] = order
+            return placed
+        # Keep the original ticket
+        self._orders[order["ticket"]] = dict(self._orders.pop(placed.order), ticket=order["ticket"], time=order["time"])
+        return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", 0, order["ticket"],
+                            changes["price_open"], placed.bid, placed.ask)
+
+    def _remove(self, request: Dict[str, Any]):
+        order = self._orders.pop(request.get("order"), None)
+        if order is None:
+            return self._result(self.TRADE_RETCODE_INVALID, request, "Order not found")
+        return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", 0, order["ticket"])
+
+    def _deal(self, request: Dict[str, Any]):
+        symbol = request.get("symbol", "")
+        spec = SIM_SYMBOLS.get(symbol)
+        if spec is None:
+            return self._result(self.TRADE_RETCODE_INVALID, request, "Unknown symbol")
+        bid, ask, _ = self._quote(symbol)
+        point = 10 ** -spec[1]
+        filling_bit = {self.ORDER_FILLING_FOK: self.SYMBOL_FILLING_FOK, self.ORDER_FILLING_IOC: self.SYMBOL_FILLING_IOC}
+        filling = request.get("type_filling", self.ORDER_FILLING_FOK)
+        if filling in filling_bit and not spec[3] & filling_bit[filling]:
+            return self._result(self.TRADE_RETCODE_INVALID_FILL, request, "Unsupported filling mode", bid=bid, ask=ask)
+        volume = request.get("volume", 0.0)
+        if volume < 0.01 or volume > 100.0 or abs(round(volume / 0.01) * 0.01 - volume) > 1e-9:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume", bid=bid, ask=ask)
+        if self._random.random() < self.reject_rate:
+            return self._result(self.TRADE_RETCODE_REJECT, request, "Request rejected", bid=bid, ask=ask)
+        if self._random.random() < self.requote_rate:
+            return self._result(self.TRADE_RETCODE_REQUOTE, request, "Requote", bid=bid, ask=ask)
+
+        is_buy = request.get("type") == self.ORDER_TYPE_BUY
+        market = ask if is_buy else bid
+        requested = request.get("price") or market
+        if abs(requested - market) > request.get("deviation", 0) * point:
+            return self._result(self.TRADE_RETCODE_REQUOTE, request, "Requote", bid=bid, ask=ask)
+        slip = self._random.randint(0, self.slippage_points) * point
+        price = round(market + slip if is_buy else market - slip, spec[1])
+
+        self._next_ticket += 1
+        ticket = self._next_ticket
+        if "position" in request:
+            position = self._positions.get(request["position"])
+            if position is None:
+                return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request, "Position closed", bid=bid, ask=ask)
+            self._close(position, min(volume, position["volume"]), price)
+            return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", ticket, ticket, price, bid, ask)
+
+        sl, tp = request.get("sl", 0.0) or 0.0, request.get("tp", 0.0) or 0.0
+        if self._stops_invalid(is_buy, bid if is_buy else ask, sl, tp):
+            return self._result(self.TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", bid=bid, ask=ask)
+        self._positions[ticket] = {
+            "ticket": ticket, "symbol": symbol, "type": request.get("type"), "volume": volume,
+            "price_open": price, "sl": sl, "tp": tp, "magic": request.get("magic", 0),
+            "comment": request.get("comment", ""), "time": int(time.time()),
+        }
+        return self._result(self.TRADE_RETCODE_DONE, request, "Request executed", ticket, ticket, price, bid, ask)
@@ -0,0 +1,141 @@
+"""
+MT5 Trading Bridge - Strategies
+The auto trading strategies, by the name /start_auto_trading takes. Each
+decides on live ticks through on_tick() and has a signals() method over a
+whole history array, which mt5_backtest.py runs without the bridge.
+
+Requirements:
+pip install numpy
+
+Usage:
+    from mt5_strategies import STRATEGIES
+    strategy = STRATEGIES["ema_crossover"]({"fast_period": 9, "slow_period": 21})
+    signals = strategy.signals(rates)     # +1 BUY, -1 SELL, 0 per bar
+"""
+
+import abc
+import random
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from mt5_indicators import EMA, RSI, ema_batch, rsi_batch
+
+class ScalpingStrategy:
+    """Random scalping strategy (for demo purposes)"""
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.settings = settings
+
+    def on_tick(self, tick) -> Optional[str]:
+        if random.random() > 0.95:  # 5% chance to trade each tick
+            return "BUY" if random.random() > 0.5 else "SELL"
+        return None
+
+    def signals(self, rates) -> np.ndarray:
+        """+1 (BUY), -1 (SELL) or 0 per bar, treating each bar as one tick"""
+        rng = np.random.default_rng(self.settings.get("seed"))
+        trade = rng.random(len(rates)) > 0.95
+        side = np.where(rng.random(len(rates)) > 0.5, 1, -1)
+        return np.where(trade, side, 0).astype(np.int8)
+
+class BarStrategy(abc.ABC):
+    """Base for strategies that decide on completed bars.
+
+    Ticks are folded into bars of `timeframe_seconds`; on_bar(), which every
+    subclass implements, runs once per completed bar. warm_up() takes the structured array returned by
+    copy_rates_* so indicators are primed before the first live bar.
+    """
+
+    timeframe_seconds = 60
+    warm_up_bars = 200
+
+    def __init__(self, settings: Dict[str, Any]):
+        self.settings = settings
+        self._bar = None
+
+    def on_tick(self, tick) -> Optional[str]:
+        price = (tick.bid + tick.ask) / 2
+        start = tick.time - tick.time % self.timeframe_seconds
+        signal = None
+        if self._bar is not None and start != self._bar[0]:
+            signal = self.on_bar(*self._bar)
+            self._bar = None
+        if self._bar is None:
+            self._bar = [start, price, price, price, price]
+        else:
+            self._bar[2] = max(self._bar[2], price)
+            self._bar[3] = min(self._bar[3], price)
+            self._bar[4] = price
+        return signal
+
+    def warm_up(self, rates):
+        pass
+
+    @abc.abstractmethod
+    def on_bar(self, time_: int, open_: float, high: float, low: float, close: float) -> Optional[str]:
+        """"BUY", "SELL" or None for the bar that just completed"""
+
+    def signals(self, rates) -> np.ndarray:
+        """+1 (BUY), -1 (SELL) or 0 for each completed bar in `rates`.
+
+        This replays on_bar() bar by bar; strategies override it with a
+        vectorized version that must return the same signals.
+        """
+        codes = {"BUY": 1, "SELL": -1, None: 0}
+        columns = [rates[name].tolist() for name in ("time", "open", "high", "low", "close")]
+        return np.array([codes[self.on_bar(*bar)] for bar in zip(*columns)], dtype=np.int8)
+
+class EmaCrossoverStrategy(BarStrategy):
+    """Fast/slow EMA crossover on bar closes, filtered by RSI"""
+
+    def __init__(self, settings: Dict[str, Any]):
+        super().__init__(settings)
+        self.fast = EMA(settings.get("fast_period", 9))
+        self.slow = EMA(settings.get("slow_period", 21))
+        self.rsi = RSI(settings.get("rsi_period", 14))
+        self._spread = None
+
+    def warm_up(self, rates):
+        if rates is None or len(rates) == 0:
+            return
+        closes = rates["close"]
+        fast = self.fast.warm_up(closes)
+        slow = self.slow.warm_up(closes)
+        self.rsi.warm_up(closes)
+        spread = fast[-1] - slow[-1]
+        self._spread = None if np.isnan(spread) else float(spread)
+
+    def on_bar(self, time_, open_, high, low, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        rsi = self.rsi.update(close)
+        if slow is None or rsi is None:
+            return None
+        previous, self._spread = self._spread, fast - slow
+        if previous is None:
+            return None
+        if previous <= 0 < self._spread and rsi < 70:
+            return "BUY"
+        if previous >= 0 > self._spread and rsi > 30:
+            return "SELL"
+        return None
+
+    def signals(self, rates) -> np.ndarray:
+        closes = np.asarray(rates["close"], dtype=np.float64)
+        spread = ema_batch(closes, self.fast.period) - ema_batch(closes, self.slow.period)
+        rsi = rsi_batch(closes, self.rsi.period)
+        valid = ~np.isnan(spread) & ~np.isnan(rsi)
+        # on_bar only compares against the previous bar that produced a value
+        previous = np.concatenate(([np.nan], spread[:-1]))
+        previous_valid = np.concatenate(([False], valid[:-1]))
+        crossed = valid & previous_valid
+        out = np.zeros(len(closes), dtype=np.int8)
+        out[crossed & (previous <= 0) & (spread > 0) & (rsi < 70)] = 1
+        out[crossed & (previous >= 0) & (spread < 0) & (rsi > 30)] = -1
+        return out
+
+STRATEGIES = {
+    "scalping": ScalpingStrategy,
+    "ema_crossover": EmaCrossoverStrategy,
+}
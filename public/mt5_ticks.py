@@ -0,0 +1,336 @@
+"""
+MT5 Trading Bridge - Shared-Memory Tick Feed
+Layout, writer and reader of the tick ring buffer the bridge publishes to
+(/start_tick_feed, MT5_BRIDGE_TICK_FEED_SYMBOLS). Any number of local Python
+processes can attach to it and read ticks as NumPy arrays without an HTTP
+request, a socket read or a terminal call per tick.
+
+Requirements:
+pip install numpy
+
+Usage:
+python mt5_ticks.py EURUSD GBPUSD            # print ticks as they arrive
+python mt5_ticks.py --name mt5_bridge_ticks  # every published symbol
+
+    from mt5_ticks import TickRingReader
+    feed = TickRingReader()
+    cursor = feed.head("EURUSD")
+    while True:
+        ticks, cursor, lost = feed.read("EURUSD", cursor)
+        ...
+
+Segment layout (little-endian, every record 64 bytes):
+
+    header    HEADER_DTYPE
+    symbols   SYMBOL_DTYPE x max_symbols   name and ticks published so far
+    rings     TICK_DTYPE x slots, one ring per symbol row
+
+Tick n of a symbol (counting from 0) lives in slot n % slots and carries
+seq = n + 1. The writer zeroes seq, writes the fields, stores seq and only
+then advances the symbol's head, so a copied record is consistent when its
+seq matches the expected value both in the copy and in the ring after the
+copy. Records overwritten while they were being read fail that check and
+are reported as lost instead of being returned torn.
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+DEFAULT_NAME = "mt5_bridge_ticks"
+MAGIC = b"MT5TICK1"
+VERSION = 1
+# A writer whose heartbeat is older than this many milliseconds is reported as stopped
+STALE_MS = 5000
+
+HEADER_DTYPE = np.dtype([("magic", "S8"), ("version", "<u4"), ("max_symbols", "<u4"), ("slots", "<u4"),
+                         ("symbol_count", "<u4"), ("writer_pid", "<u4"), ("_pad0", "<u4"),
+                         ("heartbeat_ms", "<i8"), ("_pad1", "V24")])
+SYMBOL_DTYPE = np.dtype([("name", "S24"), ("head", "<u8")])
+TICK_DTYPE = np.dtype([("seq", "<u8"), ("time_msc", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("last", "<f8"),
+                       ("volume", "<f8"), ("flags", "<u4"), ("_pad", "<u4"), ("published_ns", "<i8")])
+
+def _layout(max_symbols: int, slots: int):
+    """Byte offsets of the symbol table and the rings, and the segment size"""
+    symbols_offset = HEADER_DTYPE.itemsize
+    rings_offset = symbols_offset + max_symbols * SYMBOL_DTYPE.itemsize
+    rings_offset += -rings_offset % 64
+    return symbols_offset, rings_offset, rings_offset + max_symbols * slots * TICK_DTYPE.itemsize
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Opens an existing segment without handing it to this process's resource tracker.
+
+    Before Python 3.13 every attach registers the segment, and the tracker
+    unlinks it when the attaching process exits, taking the feed away from
+    everyone else.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Unregistering after the fact is no good either: a reader spawned by
+        # the writer shares its tracker and would drop the writer's entry
+        from multiprocessing import resource_tracker
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: rtype == "shared_memory" or register(name, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+class _Segment:
+    def __init__(self, shm: shared_memory.SharedMemory, max_symbols: int, slots: int):
+        symbols_offset, rings_offset, _ = _layout(max_symbols, slots)
+        self.shm = shm
+        self.slots = slots
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf, offset=0)
+        self.symbols = np.ndarray((max_symbols,), SYMBOL_DTYPE, buffer=shm.buf, offset=symbols_offset)
+        self.rings = np.ndarray((max_symbols, slots), TICK_DTYPE, buffer=shm.buf, offset=rings_offset)
+        self.heads = self.symbols["head"]
+        self.seqs = self.rings["seq"]
+
+    def release(self):
+        # Views must go before the buffer can be closed
+        self.header = self.symbols = self.rings = self.heads = self.seqs = None
+        self.shm.close()
+
+class TickRingWriter:
+    """Single writer of the tick feed; owned by the bridge process"""
+
+    def __init__(self, name: str = DEFAULT_NAME, max_symbols: int = 64, slots: int = 4096):
+        size = _layout(max_symbols, slots)[2]
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a bridge that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        self.max_symbols = max_symbols
+        self.published = 0
+        self._segment = _Segment(shm, max_symbols, slots)
+        self._index = {}
+        self._fields = {field: self._segment.rings[field]
+                        for field in ("time_msc", "bid", "ask", "last", "volume", "flags", "published_ns")}
+        header = self._segment.header
+        header["version"] = VERSION
+        header["max_symbols"] = max_symbols
+        header["slots"] = slots
+        header["symbol_count"] = 0
+        header["writer_pid"] = os.getpid()
+        header["heartbeat_ms"] = int(time.time() * 1000)
+        # Readers check the magic last
+        header["magic"] = MAGIC
+
+    def add_symbol(self, symbol: str) -> int:
+        row = self._index.get(symbol)
+        if row is not None:
+            return row
+        row = len(self._index)
+        if row >= self.max_symbols:
+            raise ValueError(f"Tick feed is full ({self.max_symbols} symbols)")
+        self._segment.symbols[row] = (symbol.encode(), 0)
+        self._segment.header["symbol_count"] = row + 1
+        self._index[symbol] = row
+        return row
+
+    def publish(self, symbol: str, time_msc: int, bid: float, ask: float, last: float = 0.0,
+                volume: float = 0.0, flags: int = 0):
+        segment = self._segment
+        row = self._index.get(symbol)
+        if row is None:
+            row = self.add_symbol(symbol)
+        head = int(segment.heads[row])
+        slot = head % segment.slots
+        fields = self._fields
+        segment.seqs[row, slot] = 0
+        fields["time_msc"][row, slot] = time_msc
+        fields["bid"][row, slot] = bid
+        fields["ask"][row, slot] = ask
+        fields["last"][row, slot] = last
+        fields["volume"][row, slot] = volume
+        fields["flags"][row, slot] = flags
+        fields["published_ns"][row, slot] = time.time_ns()
+        segment.seqs[row, slot] = head + 1
+        segment.heads[row] = head + 1
+        self.published += 1
+
+    def heartbeat(self):
+        self._segment.header["heartbeat_ms"] = int(time.time() * 1000)
+
+    def symbols(self) -> list:
+        return list(self._index)
+
+    def close(self):
+        if self._segment is None:
+            return
+        shm = self._segment.shm
+        self._fields = None
+        self._segment.release()
+        self._segment = None
+        shm.unlink()
+
+class TickRingReader:
+    """Maps the bridge's tick feed read-only.
+
+    read() copies only the records that are new since the caller's cursor
+    (one memcpy-sized NumPy copy, no syscall); ring() hands out a
+    zero-copy view for callers that check seq themselves.
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME, timeout: float = 0.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                shm = _attach(name)
+                header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf, offset=0)
+                if header["magic"] == MAGIC:
+                    break
+                del header
+                shm.close()
+            except FileNotFoundError:
+                pass
+            if time.monotonic() >= deadline:
+                raise FileNotFoundError(f"No tick feed named {name!r}; start it with /start_tick_feed")
+            time.sleep(0.05)
+        version, max_symbols, slots = int(header["version"]), int(header["max_symbols"]), int(header["slots"])
+        del header
+        if version != VERSION:
+            shm.close()
+            raise ValueError(f"Tick feed {name!r} has layout version {version}, expected {VERSION}")
+        self.name = name
+        self.slots = slots
+        self._segment = _Segment(shm, max_symbols, slots)
+        for array in (self._segment.header, self._segment.symbols, self._segment.rings):
+            array.flags.writeable = False
+        self._index = {}
+
+    def symbols(self) -> list:
+        count = int(self._segment.header["symbol_count"])
+        return [name.decode() for name in self._segment.symbols["name"][:count]]
+
+    def _row(self, symbol: str) -> int:
+        row = self._index.get(symbol)
+        if row is None:
+            names = self.symbols()
+            if symbol not in names:
+                raise KeyError(f"{symbol} is not published on tick feed {self.name!r}")
+            row = self._index[symbol] = names.index(symbol)
+        return row
+
+    def head(self, symbol: str) -> int:
+        """Ticks published for symbol so far; the cursor that skips history"""
+        return int(self._segment.heads[self._row(symbol)])
+
+    def read(self, symbol: str, cursor: int = 0):
+        """Ticks published after cursor, oldest first.
+
+        Returns (ticks, next_cursor, lost): lost counts ticks the ring had
+        already overwritten before they could be read.
+        """
+        segment = self._segment
+        row = self._row(symbol)
+        head = int(segment.heads[row])
+        start = max(cursor, head - self.slots)
+        if start >= head:
+            return np.empty(0, TICK_DTYPE), head, 0
+        first, last = start % self.slots, (head - 1) % self.slots
+        if first <= last:
+            ticks = segment.rings[row, first:last + 1].copy()
+            seqs = segment.seqs[row, first:last + 1]
+        else:
+            ticks = np.concatenate((segment.rings[row, first:], segment.rings[row, :last + 1]))
+            seqs = np.concatenate((segment.seqs[row, first:], segment.seqs[row, :last + 1]))
+        expected = np.arange(start + 1, head + 1, dtype=np.uint64)
+        valid = (ticks["seq"] == expected) & (seqs == expected)
+        lost = start - cursor
+        if not valid.all():
+            lost += int(len(valid) - valid.sum())
+            ticks = ticks[valid]
+        return ticks, head, lost
+
+    def latest(self, symbol: str):
+        """The newest tick as a one-record copy, or None before the first tick"""
+        segment = self._segment
+        row = self._row(symbol)
+        while True:
+            head = int(segment.heads[row])
+            if head == 0:
+                return None
+            tick = segment.rings[row, (head - 1) % self.slots].copy()
+            if tick["seq"] == head and segment.seqs[row, (head - 1) % self.slots] == head:
+                return tick
+
+    def ring(self, symbol: str) -> np.ndarray:
+        """Zero-copy read-only view of symbol's whole ring; slot order, check seq before trusting a record"""
+        return self._segment.rings[self._row(symbol)]
+
+    def follow(self, symbol: str, cursor: int = None, interval: float = 0.001):
+        """Yields (ticks, lost) batches forever, polling the head every interval seconds"""
+        cursor = self.head(symbol) if cursor is None else cursor
+        while True:
+            ticks, cursor, lost = self.read(symbol, cursor)
+            if len(ticks) or lost:
+                yield ticks, lost
+            else:
+                time.sleep(interval)
+
+    def writer_alive(self) -> bool:
+        return int(time.time() * 1000) - int(self._segment.header["heartbeat_ms"]) < STALE_MS
+
+    def status(self):
+        header = self._segment.header
+        return {
+            "name": self.name,
+            "writer_pid": int(header["writer_pid"]),
+            "writer_alive": self.writer_alive(),
+            "slots": self.slots,
+            "symbols": {symbol: self.head(symbol) for symbol in self.symbols()}
+        }
+
+    def close(self):
+        if self._segment is not None:
+            self._segment.release()
+            self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Print ticks from the MT5 Trading Bridge tick feed")
+    parser.add_argument("symbols", nargs="*", help="symbols to follow (default: every published symbol)")
+    parser.add_argument("--name", default=os.environ.get("MT5_BRIDGE_TICK_FEED", DEFAULT_NAME))
+    parser.add_argument("--interval", type=float, default=0.001, help="seconds between polls of the ring heads")
+    args = parser.parse_args()
+
+    with TickRingReader(args.name, timeout=10) as feed:
+        symbols = args.symbols or feed.symbols()
+        cursors = {symbol: feed.head(symbol) for symbol in symbols}
+        print(f"Following {', '.join(symbols)} on {args.name} (writer pid {feed.status()['writer_pid']})")
+        try:
+            while True:
+                idle = True
+                for symbol in symbols:
+                    ticks, cursors[symbol], lost = feed.read(symbol, cursors[symbol])
+                    if lost:
+                        print(f"{symbol}: {lost} ticks overwritten before they were read", file=sys.stderr)
+                    now = time.time_ns()
+                    for tick in ticks:
+                        idle = False
+                        print(f"{symbol} {tick['time_msc']} bid={tick['bid']} ask={tick['ask']} "
+                              f"age={(now - tick['published_ns']) / 1e3:.0f}us")
+                if idle:
+                    time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
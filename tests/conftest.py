@@ -0,0 +1,38 @@
+"""Shared setup: the bridge modules live next to the web assets in public/.
+
+The bridge reads its configuration from the environment at import time, so
+the simulator backend and a throwaway data directory are set here, before
+any test module imports it.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public"))
+
+_home = tempfile.mkdtemp(prefix="mt5bridge-tests-")
+os.environ["MT5_BRIDGE_BACKEND"] = "sim"
+os.environ["MT5_BRIDGE_HOME"] = _home
+os.environ["MT5_BRIDGE_JOURNAL"] = os.path.join(_home, "bridge_journal.db")
+os.environ.setdefault("MT5_SIM_REJECT_RATE", "0")
+os.environ.setdefault("MT5_SIM_REQUOTE_RATE", "0")
+os.environ.setdefault("MT5_SIM_ORDER_LATENCY", "0")
+
+@pytest.fixture
+def bridge():
+    """The bridge module, on a fresh simulated terminal"""
+    import mt5_bridge
+    mt5_bridge.mt5.use(mt5_bridge.load_backend("sim"))
+    return mt5_bridge
+
+@pytest.fixture
+def client(bridge):
+    """A TestClient connected to the simulator"""
+    from fastapi.testclient import TestClient
+    with TestClient(bridge.app) as client:
+        connected = client.post("/connect", json={"server": "Simulator", "account_number": 1, "password": ""}).json()
+        assert connected["success"], connected
+        yield client
@@ -0,0 +1,58 @@
+"""Account workers: one process per account, routed by account_id"""
+
+import time
+
+import pytest
+
+@pytest.fixture
+def account(bridge, client):
+    connected = client.post("/connect", json={"server": "Simulator", "account_number": 2, "password": "",
+                                              "account_id": "second"}).json()
+    assert connected["success"], connected
+    yield "second"
+    bridge.account_pool.disconnect("second")
+
+def _positions(client, account_id=None):
+    return client.post("/positions", json={"account_id": account_id}).json()["positions"]
+
+def test_orders_stay_on_their_account(bridge, client, account):
+    default_before = len(_positions(client))
+    placed = client.post("/place_order", json={"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.4,
+                                               "account_id": account}).json()
+    assert placed["success"], placed
+    assert [pos["volume"] for pos in _positions(client, account)] == [0.4]
+    assert len(_positions(client)) == default_before
+    status = client.get("/accounts").json()["accounts"][account]
+    assert status["alive"] and status["mt5_connected"] and status["pid"] != bridge.os.getpid()
+
+def test_each_account_keeps_its_own_journal(bridge, client, account):
+    since = time.time()
+    placed = client.post("/place_order", json={"symbol": "GBPUSD", "trade_type": "SELL", "volume": 0.1,
+                                               "account_id": account}).json()
+    assert placed["success"], placed
+    deadline = time.monotonic() + 5
+    entries = []
+    while not entries and time.monotonic() < deadline:
+        entries = client.post("/history", json={"account_id": account, "since": since}).json()["entries"]
+        time.sleep(0.05)
+    assert [(entry["symbol"], entry["side"]) for entry in entries] == [("GBPUSD", "SELL")]
+    default = client.post("/history", json={"symbol": "GBPUSD", "since": since}).json()["entries"]
+    assert default == []
+    assert bridge.account_journal_path(account) != bridge.account_journal_path()
+
+def test_dead_worker_fails_fast_and_is_restarted(bridge, client, account):
+    worker = bridge.account_pool.workers[account]
+    worker.process.kill()
+    worker.process.join(5)
+    failed = client.post("/positions", json={"account_id": account}).json()
+    assert not failed["success"] and account in failed["error"]
+    # The monitor notices within a couple of health intervals and logs the new process in again
+    deadline = time.monotonic() + 4 * bridge.account_pool.health_interval + 10
+    while not (worker.restarts and worker.mt5_connected) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert worker.restarts >= 1 and worker.alive()
+    assert client.post("/positions", json={"account_id": account}).json()["success"]
+
+def test_unknown_account_is_refused(client):
+    result = client.post("/positions", json={"account_id": "nobody"}).json()
+    assert result == {"success": False, "error": "Account nobody is not connected"}
@@ -0,0 +1,40 @@
+"""Per-client rate limits in front of the terminal-bound routes"""
+
+import pytest
+
+ORIGIN = {"Origin": "http://localhost:8080"}
+
+@pytest.fixture
+def limited(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge.client_rate_limiter, "limits", {"read": (1.0, 2.0)})
+    bridge.client_rate_limiter._buckets.clear()
+    return client
+
+def test_burst_then_429_with_retry_after(limited):
+    statuses = [limited.post("/orders", headers=ORIGIN).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+def test_429_carries_cors_headers(limited):
+    for _ in range(2):
+        limited.post("/orders", headers=ORIGIN)
+    response = limited.post("/orders", headers=ORIGIN)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert response.headers["Access-Control-Allow-Origin"]
+
+def test_preflight_spends_no_token(limited):
+    preflight = dict(ORIGIN, **{"Access-Control-Request-Method": "POST"})
+    for _ in range(5):
+        assert limited.options("/orders", headers=preflight).status_code == 200
+    assert [limited.post("/orders").status_code for _ in range(2)] == [200, 200]
+
+def test_history_is_not_throttled(limited):
+    assert all(limited.post("/history", json={}).status_code == 200 for _ in range(5))
+
+def test_overloaded_orders_lane_is_a_503(bridge, client, monkeypatch):
+    async def overloaded(*args, **kwargs):
+        raise bridge.ExecutorOverloaded("read lane is full")
+    monkeypatch.setattr(bridge.mt5_executor, "run", overloaded)
+    response = client.post("/orders")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,40 @@
+"""Batch placement and closing: one executor job, results per order"""
+
+def _symbols(client):
+    return {position["ticket"]: position["symbol"] for position in client.post("/positions").json()["positions"]}
+
+def test_basket_reads_one_tick_per_symbol(bridge, client):
+    orders = [{"symbol": symbol, "trade_type": "BUY", "volume": 0.1} for symbol in ("EURUSD", "GBPUSD", "EURUSD")]
+    ticks = bridge.mt5.backend.calls.get("symbol_info_tick", 0)
+    placed = client.post("/place_orders", json={"orders": orders}).json()
+    assert (placed["success"], placed["succeeded"], placed["failed"]) == (True, 3, 0)
+    assert bridge.mt5.backend.calls["symbol_info_tick"] - ticks == 2
+    assert all(result["latency_ms"] >= 0 for result in placed["results"])
+    symbols = _symbols(client)
+    assert [symbols[result["trade_info"]["ticket"]] for result in placed["results"]] == ["EURUSD", "GBPUSD", "EURUSD"]
+
+def test_one_bad_order_does_not_stop_the_basket(client):
+    orders = [{"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1},
+              {"symbol": "NOSUCH", "trade_type": "BUY", "volume": 0.1},
+              {"symbol": "GBPUSD", "trade_type": "SELL", "volume": 0.1}]
+    placed = client.post("/place_orders", json={"orders": orders}).json()
+    assert (placed["success"], placed["succeeded"], placed["failed"]) == (False, 2, 1)
+    assert [result["success"] for result in placed["results"]] == [True, False, True]
+
+def test_close_orders_reports_each_ticket(client):
+    orders = [{"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1}] * 2
+    placed = client.post("/place_orders", json={"orders": orders}).json()
+    tickets = [result["trade_info"]["ticket"] for result in placed["results"]]
+    closed = client.post("/close_orders", json={"tickets": tickets + [999999]}).json()
+    assert (closed["succeeded"], closed["failed"]) == (2, 1)
+    assert [result["ticket"] for result in closed["results"]] == tickets + [999999]
+    assert closed["results"][2]["error"] == "Position not found"
+    assert not set(tickets) & set(_symbols(client))
+
+def test_close_all_filters_by_symbol(client):
+    orders = [{"symbol": symbol, "trade_type": "SELL", "volume": 0.1} for symbol in ("EURUSD", "GBPUSD")]
+    client.post("/place_orders", json={"orders": orders})
+    closed = client.post("/close_all", json={"symbol": "GBPUSD"}).json()
+    assert closed["succeeded"] == 1
+    remaining = client.post("/positions").json()["positions"]
+    assert {position["symbol"] for position in remaining} == {"EURUSD"}
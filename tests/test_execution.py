@@ -0,0 +1,42 @@
+"""Market orders retry requotes and refused filling modes inside the bridge"""
+
+import pytest
+
+import mt5_sim
+
+ORDER = {"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1}
+
+@pytest.fixture
+def terminal(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge, "filling_modes", bridge.FillingModes())
+    return bridge.mt5.backend
+
+def test_requotes_are_repriced_and_resent(bridge, client, terminal, monkeypatch):
+    send = terminal.order_send
+    sent = []
+    def order_send(request):
+        sent.append(dict(request))
+        terminal.requote_rate = 1.0 if len(sent) <= 2 else 0.0
+        return send(request)
+    monkeypatch.setattr(terminal, "order_send", order_send)
+    placed = client.post("/place_order", json=ORDER).json()
+    assert placed["success"], placed
+    assert placed["trade_info"]["attempts"] == 3
+    assert len(sent) == 3
+
+def test_requotes_stop_at_the_retry_limit(bridge, client, terminal, monkeypatch):
+    monkeypatch.setattr(terminal, "requote_rate", 1.0)
+    monkeypatch.setattr(bridge, "ORDER_RETRY_BUDGET", 10.0)
+    placed = client.post("/place_order", json=ORDER).json()
+    assert not placed["success"]
+    assert placed["error"] == (f"Order failed: Requote after {bridge.ORDER_RETRY_ATTEMPTS} attempts "
+                               f"(retry limit of {bridge.ORDER_RETRY_ATTEMPTS} attempts reached)")
+
+def test_refused_filling_mode_falls_through_and_is_remembered(client, terminal, monkeypatch):
+    # Only RETURN is accepted, whatever symbol_info says
+    monkeypatch.setitem(mt5_sim.SIM_SYMBOLS, "EURUSD", mt5_sim.SIM_SYMBOLS["EURUSD"][:3] + (0,))
+    first = client.post("/place_order", json=ORDER).json()
+    assert first["success"], first
+    assert first["trade_info"]["attempts"] == 3
+    second = client.post("/place_order", json=ORDER).json()
+    assert second["trade_info"]["attempts"] == 1
@@ -0,0 +1,33 @@
+"""The offline execution report reads the journal without the bridge"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+PUBLIC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "public")
+
+def _run(*args):
+    return subprocess.run([sys.executable, *args], cwd=PUBLIC, capture_output=True, text=True, timeout=60,
+                          check=True).stdout
+
+def test_offline_tools_do_not_import_the_bridge():
+    out = _run("-c", "import sys, mt5_execution_report, mt5_backtest; print('mt5_bridge' in sys.modules, "
+                     "'fastapi' in sys.modules)")
+    assert out.split() == ["False", "False"]
+
+def test_report_matches_the_journal(bridge, client):
+    for side in ("BUY", "SELL", "BUY"):
+        placed = client.post("/place_order", json={"symbol": "GBPUSD", "trade_type": side, "volume": 0.1,
+                                                     "magic_number": 4242}).json()
+        assert placed["success"], placed
+    deadline = time.monotonic() + 5
+    while bridge.trade_journal.pending() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.2)
+    summary = json.loads(_run("mt5_execution_report.py", "--journal", bridge.trade_journal.path, "--magic", "4242",
+                              "--by", "side", "--json"))
+    # The journal is shared by the whole run; the magic number keeps to this test's orders
+    assert summary["overall"]["filled"] == summary["executions"] == 3
+    assert summary["groups"]["1"]["count"] == 2 * summary["groups"]["-1"]["count"]
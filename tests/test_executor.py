@@ -0,0 +1,58 @@
+"""Terminal executor: lane priority, lane limits and coalescing"""
+
+import threading
+
+import pytest
+
+def _blocked(bridge, limits=None):
+    executor = bridge.MT5Executor(name="test-executor", limits=limits)
+    gate = threading.Event()
+    started = threading.Event()
+    executor.submit(lambda: (started.set(), gate.wait(5)), lane="read")
+    assert started.wait(5)
+    return executor, gate
+
+def test_close_jumps_the_read_backlog(bridge):
+    executor, gate = _blocked(bridge)
+    ran = []
+    futures = [executor.submit(ran.append, f"read-{i}", lane="read") for i in range(3)]
+    futures.append(executor.submit(ran.append, "order", lane="order"))
+    futures.append(executor.submit(ran.append, "close", lane="close"))
+    gate.set()
+    for future in futures:
+        future.result(5)
+    assert ran == ["close", "order", "read-0", "read-1", "read-2"]
+
+def test_full_lane_refuses_only_its_own_jobs(bridge):
+    executor, gate = _blocked(bridge, limits={"read": 2})
+    executor.submit(int, lane="read")
+    executor.submit(int, lane="read")
+    with pytest.raises(bridge.ExecutorOverloaded):
+        executor.submit(int, lane="read")
+    close = executor.submit(int, lane="close")
+    gate.set()
+    assert close.result(5) == 0
+
+def test_identical_queued_reads_are_coalesced(bridge):
+    executor, gate = _blocked(bridge)
+    calls = []
+    def read(symbol):
+        calls.append(symbol)
+        return symbol
+    first = executor.submit(read, "EURUSD", lane="read", coalesce=True)
+    second = executor.submit(read, "EURUSD", lane="read", coalesce=True)
+    other = executor.submit(read, "GBPUSD", lane="read", coalesce=True)
+    assert second is first and other is not first
+    gate.set()
+    assert (first.result(5), other.result(5)) == ("EURUSD", "GBPUSD")
+    assert calls == ["EURUSD", "GBPUSD"]
+
+def test_cancelled_job_is_skipped(bridge):
+    executor, gate = _blocked(bridge)
+    ran = []
+    withdrawn = executor.submit(ran.append, "withdrawn", lane="order")
+    kept = executor.submit(ran.append, "kept", lane="order")
+    assert withdrawn.cancel()
+    gate.set()
+    kept.result(5)
+    assert ran == ["kept"]
@@ -0,0 +1,73 @@
+"""Idempotency keys: one order per key, however often it is retried"""
+
+import pytest
+
+import mt5_bridge
+from mt5_bridge import IdempotencyTable
+
+def test_replay_returns_the_first_attempts_future():
+    table = IdempotencyTable(ttl=60, max_entries=10)
+    future, owner = table.claim("a", "fp")
+    replay, replay_owner = table.claim("a", "fp")
+    assert owner and not replay_owner
+    assert replay is future
+
+def test_key_reused_for_a_different_request_is_refused():
+    table = IdempotencyTable(ttl=60, max_entries=10)
+    table.claim("a", "fp")
+    with pytest.raises(ValueError):
+        table.claim("a", "other")
+
+def test_full_table_evicts_oldest_done_key():
+    table = IdempotencyTable(ttl=60, max_entries=2)
+    first, _ = table.claim("a", "fp")
+    second, _ = table.claim("b", "fp")
+    first.set_result(1)
+    second.set_result(2)
+    table.claim("c", "fp")
+    assert len(table) == 2
+    # "a" was oldest: claiming it again starts a new attempt, "b" still replays
+    assert table.claim("b", "fp") == (second, False)
+    assert table.claim("a", "fp")[1]
+
+def test_full_table_never_evicts_a_key_in_flight():
+    table = IdempotencyTable(ttl=60, max_entries=2)
+    pending, _ = table.claim("a", "fp")
+    done, _ = table.claim("b", "fp")
+    done.set_result(2)
+    table.claim("c", "fp")
+    # "b" made room; the still-running "a" keeps its owner
+    assert table.claim("a", "fp") == (pending, False)
+    assert table.claim("b", "fp")[1]
+
+def test_replays_do_not_extend_a_keys_life(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(mt5_bridge.time, "monotonic", lambda: clock[0])
+    table = IdempotencyTable(ttl=10, max_entries=10)
+    future, _ = table.claim("a", "fp")
+    future.set_result(1)
+    for _ in range(3):
+        clock[0] += 3
+        assert table.claim("a", "fp") == (future, False)
+    # 12s after it was first claimed, however recently it was replayed
+    clock[0] += 3
+    assert table.claim("a", "fp")[1]
+
+def test_expired_key_still_in_flight_is_kept(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(mt5_bridge.time, "monotonic", lambda: clock[0])
+    table = IdempotencyTable(ttl=10, max_entries=10)
+    future, _ = table.claim("a", "fp")
+    clock[0] += 60
+    assert table.claim("a", "fp") == (future, False)
+
+def test_retried_order_is_sent_once(bridge, client):
+    order = {"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1, "idempotency_key": "retried-order"}
+    first = client.post("/place_order", json=order).json()
+    assert first["success"], first
+    sent = bridge.mt5.backend.calls["order_send"]
+    replay = client.post("/place_order", json=order).json()
+    assert replay["trade_info"]["ticket"] == first["trade_info"]["ticket"]
+    assert bridge.mt5.backend.calls["order_send"] == sent
+    refused = client.post("/place_order", json=dict(order, volume=0.2)).json()
+    assert not refused["success"] and "different request" in refused["error"]
@@ -0,0 +1,88 @@
+"""Incremental indicators must agree with their batch versions"""
+
+import numpy as np
+import pytest
+
+from mt5_indicators import (ATR, EMA, MACD, RSI, Bollinger, atr_batch, bollinger_batch, ema_batch, macd_batch,
+                            rsi_batch)
+
+TOLERANCE = 1e-9
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(7)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, 600))
+    spread = np.abs(rng.normal(0, 0.0003, 600))
+    return close + spread, close - spread, close
+
+def _series(values):
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+def assert_series_equal(incremental, batch):
+    np.testing.assert_array_equal(np.isnan(incremental), np.isnan(batch))
+    np.testing.assert_allclose(incremental, batch, rtol=0, atol=TOLERANCE, equal_nan=True)
+
+@pytest.mark.parametrize("period", [1, 5, 20])
+def test_ema(bars, period):
+    close = bars[2]
+    ema = EMA(period)
+    assert_series_equal(_series(map(ema.update, close)), ema_batch(close, period))
+
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi(bars, period):
+    close = bars[2]
+    rsi = RSI(period)
+    assert_series_equal(_series(map(rsi.update, close)), rsi_batch(close, period))
+
+def test_macd(bars):
+    close = bars[2]
+    macd = MACD(12, 26, 9)
+    values = [macd.update(price) for price in close]
+    batch = macd_batch(close, 12, 26, 9)
+    for column, expected in enumerate(batch):
+        assert_series_equal(_series(None if v is None else v[column] for v in values), expected)
+
+def test_atr(bars):
+    high, low, close = bars
+    atr = ATR(14)
+    assert_series_equal(_series(map(atr.update, high, low, close)), atr_batch(high, low, close, 14))
+
+def test_bollinger(bars):
+    # Long enough for several rebuilds of the running sums
+    close = bars[2]
+    bollinger = Bollinger(20, 2.0)
+    values = [bollinger.update(price) for price in close]
+    batch = bollinger_batch(close, 20, 2.0)
+    for column, expected in enumerate(batch):
+        assert_series_equal(_series(None if v is None else v[column] for v in values), expected)
+
+def test_warm_up_leaves_incremental_state(bars):
+    high, low, close = bars
+    head, tail = slice(0, 500), slice(500, None)
+    pairs = [
+        (EMA(20), EMA(20), lambda ind, s: ind.warm_up(close[s]), lambda ind, i: ind.update(close[i])),
+        (RSI(14), RSI(14), lambda ind, s: ind.warm_up(close[s]), lambda ind, i: ind.update(close[i])),
+        (MACD(), MACD(), lambda ind, s: ind.warm_up(close[s]), lambda ind, i: ind.update(close[i])),
+        (ATR(14), ATR(14), lambda ind, s: ind.warm_up(high[s], low[s], close[s]),
+         lambda ind, i: ind.update(high[i], low[i], close[i])),
+        (Bollinger(20), Bollinger(20), lambda ind, s: ind.warm_up(close[s]), lambda ind, i: ind.update(close[i])),
+    ]
+    for warmed, stepped, warm_up, update in pairs:
+        warm_up(warmed, head)
+        for i in range(head.stop):
+            update(stepped, i)
+        for i in range(tail.start, len(close)):
+            np.testing.assert_allclose(update(warmed, i), update(stepped, i), rtol=0, atol=TOLERANCE)
+
+def test_warm_up_after_a_partial_seed(bars):
+    # update() has run, but fewer times than the period
+    high, low, close = bars
+    for make in (lambda: EMA(20), lambda: MACD()):
+        warmed, stepped = make(), make()
+        for price in close[:5]:
+            warmed.update(price)
+            stepped.update(price)
+        warmed.warm_up(close[5:40])
+        for price in close[5:40]:
+            stepped.update(price)
+        np.testing.assert_allclose(warmed.update(close[40]), stepped.update(close[40]), rtol=0, atol=TOLERANCE)
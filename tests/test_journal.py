@@ -0,0 +1,41 @@
+"""Orders sent on the simulator end up in the trade journal, once"""
+
+import time
+
+def _journaled(client, ticket, since, timeout=5.0):
+    # Simulator tickets restart with every test, so only this test's entries count
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        entries = client.post("/history", json={"ticket": ticket, "since": since}).json()["entries"]
+        if entries:
+            return entries
+        time.sleep(0.05)
+    return []
+
+def test_place_order_is_journaled(bridge, client):
+    since = time.time()
+    order = {"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1, "idempotency_key": "journal-round-trip"}
+    placed = client.post("/place_order", json=order).json()
+    assert placed["success"], placed
+    ticket = placed["trade_info"]["ticket"]
+    entries = _journaled(client, ticket, since)
+    assert len(entries) == 1
+    entry = entries[0]
+    assert (entry["kind"], entry["symbol"], entry["side"], entry["volume"]) == ("open", "EURUSD", "BUY", 0.1)
+    assert entry["retcode"] == bridge.mt5.TRADE_RETCODE_DONE
+    assert entry["request"]["symbol"] == "EURUSD"
+    # A replay returns the first result and sends nothing
+    replay = client.post("/place_order", json=order).json()
+    assert replay["trade_info"]["ticket"] == ticket
+    time.sleep(0.2)
+    assert len(_journaled(client, ticket, since)) == 1
+
+def test_history_filters_by_symbol(client):
+    since = time.time()
+    for symbol in ("EURUSD", "GBPUSD"):
+        placed = client.post("/place_order", json={"symbol": symbol, "trade_type": "SELL", "volume": 0.2}).json()
+        assert placed["success"], placed
+        _journaled(client, placed["trade_info"]["ticket"], since)
+    entries = client.post("/history", json={"symbol": "GBPUSD", "since": since}).json()["entries"]
+    assert len(entries) == 1
+    assert entries and {entry["symbol"] for entry in entries} == {"GBPUSD"}
@@ -0,0 +1,96 @@
+"""Pre-trade risk checks against the exposure book"""
+
+import mt5_bridge
+from mt5_bridge import ExposureBook, RiskEngine
+
+LIMITS = {name: 0.0 for name in mt5_bridge.RISK_LIMITS}
+
+def _engine(**limits):
+    book = ExposureBook()
+    book._currencies.update({"EURUSD": ("EUR", "USD"), "GBPUSD": ("GBP", "USD")})
+    return book, RiskEngine(book, dict(LIMITS, **limits))
+
+def test_no_limits_allow_everything():
+    _, engine = _engine()
+    assert engine.check("EURUSD", True, 100.0) is None
+
+def test_kill_switch():
+    _, engine = _engine()
+    engine.halted = True
+    assert "kill switch" in engine.check("EURUSD", True, 0.01)
+
+def test_max_order_lots():
+    _, engine = _engine(max_order_lots=1.0)
+    assert engine.check("EURUSD", True, 1.0) is None
+    assert "lot limit" in engine.check("EURUSD", True, 1.01)
+
+def test_max_symbol_lots_counts_direction():
+    book, engine = _engine(max_symbol_lots=1.0)
+    book.positions[1] = ("EURUSD", 0.8, 0)
+    book._apply("EURUSD", 0.8, 0, 1)
+    assert "EURUSD exposure" in engine.check("EURUSD", True, 0.3)
+    # Selling reduces the net position
+    assert engine.check("EURUSD", False, 1.5) is None
+
+def test_max_currency_lots_nets_across_symbols():
+    book, engine = _engine(max_currency_lots=1.0)
+    book._apply("EURUSD", 0.6, 0, 1)
+    # Short USD on both: 0.6 + 0.5
+    assert "USD exposure" in engine.check("GBPUSD", True, 0.5)
+    assert engine.check("GBPUSD", False, 0.5) is None
+
+def test_max_positions():
+    book, engine = _engine(max_positions=2)
+    book.positions.update({1: ("EURUSD", 0.1, 0)})
+    assert engine.check("EURUSD", True, 0.1) is None
+    book.positions[2] = ("EURUSD", 0.1, 0)
+    assert "positions are already open" in engine.check("EURUSD", True, 0.1)
+
+def test_max_daily_loss():
+    book, engine = _engine(max_daily_loss=100)
+    book.reconcile([], {"balance": 1000.0, "equity": 950.0, "margin": 0, "margin_level": 0})
+    assert engine.check("EURUSD", True, 0.1) is None
+    book.equity = 900.0
+    assert "Daily loss" in engine.check("EURUSD", True, 0.1)
+
+def test_min_margin_level():
+    book, engine = _engine(min_margin_level=200)
+    book.reconcile([], {"balance": 1000.0, "equity": 1000.0, "margin": 10.0, "margin_level": 150.0})
+    assert "Margin level" in engine.check("EURUSD", True, 0.1)
+    book.reconcile([], {"balance": 1000.0, "equity": 1000.0, "margin": 0, "margin_level": 0})
+    assert engine.check("EURUSD", True, 0.1) is None
+
+def test_order_rate_limit(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(mt5_bridge.time, "monotonic", lambda: clock[0])
+    _, engine = _engine(max_orders_per_second=2)
+    clock[0] += 1
+    assert [engine.check("EURUSD", True, 0.1) for _ in range(3)][2] == "Order rate limit reached"
+    clock[0] += 0.5
+    assert engine.check("EURUSD", True, 0.1) is None
+
+def test_fills_update_the_book():
+    book, _ = _engine()
+    fill = type("Result", (), {"volume": 0.5, "order": 7})
+    book.apply_fill({"symbol": "EURUSD", "type": mt5_bridge.mt5.ORDER_TYPE_BUY, "volume": 0.5, "magic": 3}, fill)
+    assert book.symbol_lots["EURUSD"] == 0.5 and book.count("EURUSD", 3) == 1
+    close = type("Result", (), {"volume": 0.5, "order": 8})
+    book.apply_fill({"position": 7, "volume": 0.5}, close)
+    assert book.positions == {} and book.count("EURUSD", 3) == 0
+
+def test_fractional_order_rate(monkeypatch):
+    # One order every two seconds
+    clock = [1000.0]
+    monkeypatch.setattr(mt5_bridge.time, "monotonic", lambda: clock[0])
+    _, engine = _engine(max_orders_per_second=0.5)
+    clock[0] += 2
+    assert engine.check("EURUSD", True, 0.1) is None
+    assert engine.check("EURUSD", True, 0.1) == "Order rate limit reached"
+    clock[0] += 1
+    assert engine.check("EURUSD", True, 0.1) == "Order rate limit reached"
+    clock[0] += 1
+    assert engine.check("EURUSD", True, 0.1) is None
+    # Idle time never banks more than one order
+    clock[0] += 60
+    assert engine.check("EURUSD", True, 0.1) is None
+    assert engine.check("EURUSD", True, 0.1) == "Order rate limit reached"
@@ -0,0 +1,63 @@
+"""Session supervisor: slow terminal work is not mistaken for a dead session"""
+
+import threading
+import time
+
+import pytest
+
+@pytest.fixture
+def supervisor(bridge, client):
+    executor = bridge.MT5Executor(name="mt5-test-executor")
+    supervisor = bridge.SessionSupervisor(executor, interval=60, timeout=0.05, max_failures=1, hold=0,
+                                          base_backoff=0.01, max_backoff=0.02)
+    supervisor.reconnect_timeout = 0.05
+    return supervisor
+
+def _block(executor, seconds):
+    release = threading.Event()
+    executor.submit(release.wait, seconds, lane="close")
+    return release
+
+def test_heartbeat_queued_behind_a_slow_job_is_not_a_failure(supervisor):
+    release = _block(supervisor.executor, 5)
+    assert supervisor._heartbeat() is None
+    assert supervisor._heartbeat() is None
+    release.set()
+    assert supervisor._heartbeat() is True
+
+def test_heartbeat_that_hangs_is_a_failure(supervisor, monkeypatch):
+    def hung():
+        supervisor._beat_started = time.monotonic()
+        time.sleep(0.3)
+        return True
+    monkeypatch.setattr(supervisor, "_beat", hung)
+    results = [supervisor._heartbeat() for _ in range(3)]
+    assert False in results
+    assert "timed out" in supervisor.last_error
+
+def _recover(supervisor, monkeypatch, reconnect_seconds=0.0):
+    calls = []
+    def reconnect():
+        calls.append(time.monotonic())
+        time.sleep(reconnect_seconds)
+        return {"success": True}
+    monkeypatch.setattr(supervisor, "_reconnect", reconnect)
+    return calls
+
+def test_reconnects_stuck_in_the_queue_are_withdrawn(supervisor, monkeypatch):
+    calls = _recover(supervisor, monkeypatch)
+    release = _block(supervisor.executor, 5)
+    threading.Timer(0.4, release.set).start()
+    supervisor._recover()
+    # Let anything still queued run before counting
+    supervisor.executor.submit(lambda: None, lane="close").result(timeout=5)
+    assert len(calls) == 1
+    assert supervisor.state == "connected"
+    assert supervisor.reconnect_attempts > 1
+
+def test_slow_reconnect_is_waited_on_not_resubmitted(supervisor, monkeypatch):
+    calls = _recover(supervisor, monkeypatch, reconnect_seconds=0.3)
+    supervisor._recover()
+    supervisor.executor.submit(lambda: None, lane="close").result(timeout=5)
+    assert len(calls) == 1
+    assert supervisor.reconnect_attempts == 1
@@ -0,0 +1,95 @@
+"""Sliced parent orders and the timer wheel that paces them"""
+
+import asyncio
+import time
+
+from mt5_bridge import TimerWheel
+
+# Timer wheel
+
+def _run_wheel(wheel, scenario, settle):
+    async def main():
+        fired = []
+        scenario(fired)
+        await asyncio.sleep(settle)
+        return fired
+    return asyncio.run(main())
+
+def test_timers_fire_in_due_order_and_not_early():
+    wheel = TimerWheel(0.005, size=8)
+
+    def scenario(fired):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        # Several laps of an 8-slot wheel, scheduled out of order
+        for delay in (0.12, 0.01, 0.07, 0.03, 0.045):
+            wheel.schedule(delay, lambda delay=delay: fired.append((delay, loop.time() - start)))
+
+    fired = _run_wheel(wheel, scenario, 0.25)
+    assert [delay for delay, _ in fired] == [0.01, 0.03, 0.045, 0.07, 0.12]
+    for delay, at in fired:
+        assert at >= delay - 1e-6
+    assert len(wheel) == 0
+    assert wheel.lateness.count == 5
+
+def test_cancelled_timer_never_fires():
+    wheel = TimerWheel(0.005)
+
+    def scenario(fired):
+        keep = wheel.schedule(0.02, lambda: fired.append("keep"))
+        drop = wheel.schedule(0.02, lambda: fired.append("drop"))
+        wheel.cancel(drop)
+        wheel.cancel(drop)
+        wheel.cancel(None)
+        assert len(wheel) == 1
+        assert keep[1] is not None
+
+    assert _run_wheel(wheel, scenario, 0.1) == ["keep"]
+    assert len(wheel) == 0
+
+def test_wheel_restarts_after_going_idle():
+    wheel = TimerWheel(0.005)
+
+    async def main():
+        fired = []
+        wheel.schedule(0.01, lambda: fired.append(1))
+        await asyncio.sleep(0.05)
+        wheel.schedule(0.01, lambda: fired.append(2))
+        await asyncio.sleep(0.05)
+        return fired
+
+    assert asyncio.run(main()) == [1, 2]
+
+# Sliced orders
+
+def _wait_finished(client, parent_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        parent = client.post("/sliced_orders", json={"parent_id": parent_id}).json()["sliced_order"]
+        if parent["status"] != "working":
+            return parent
+        time.sleep(0.02)
+    return parent
+
+def _start(client, **settings):
+    order = dict({"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.3, "algo": "twap", "duration_seconds": 0.3,
+                  "slices": 3}, **settings)
+    started = client.post("/place_sliced_order", json=order).json()
+    assert started["success"], started
+    return started["sliced_order"]["parent_id"]
+
+def test_twap_fills_in_even_slices(client):
+    parent = _wait_finished(client, _start(client))
+    assert parent["status"] == "completed"
+    assert [child["volume"] for child in parent["children"]] == [0.1, 0.1, 0.1]
+    times = [child["time"] for child in parent["children"]]
+    assert times[2] - times[0] >= 0.2 - 0.02
+
+def test_twap_expires_with_its_window(client):
+    # The limit is never reached: every slot is skipped, and the parent ends with its window
+    started = time.monotonic()
+    parent = _wait_finished(client, _start(client, limit_price=0.5))
+    assert parent["status"] == "expired"
+    assert parent["slices"]["skipped"] == 3 and parent["slices"]["sent"] == 3
+    assert parent["filled_volume"] == 0
+    assert time.monotonic() - started < 1.0
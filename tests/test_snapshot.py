@@ -0,0 +1,44 @@
+"""Account and position snapshots shared by every poller"""
+
+import asyncio
+import threading
+
+def _blocked_cache(bridge):
+    executor = bridge.MT5Executor(name="test-executor")
+    gate = threading.Event()
+    started = threading.Event()
+    executor.submit(lambda: (started.set(), gate.wait(5)), lane="read")
+    assert started.wait(5)
+    return bridge.SnapshotCache(executor, interval=60), gate
+
+def test_concurrent_readers_share_one_refresh(bridge, client):
+    cache, gate = _blocked_cache(bridge)
+
+    async def main():
+        readers = [asyncio.create_task(cache.latest()) for _ in range(20)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        return await asyncio.gather(*readers)
+
+    views = asyncio.run(main())
+    # One terminal read served all twenty
+    assert cache.version == 1
+    assert {view["snapshot"]["version"] for view in views} == {1}
+    assert views[0]["account"]["balance"] > 0
+
+def test_fresh_snapshot_is_served_without_the_terminal(bridge):
+    cache, gate = _blocked_cache(bridge)
+    gate.set()
+    cache.current()
+    for _ in range(50):
+        assert cache.current()["snapshot"]["version"] == 1
+    # An invalidated snapshot is refreshed by the next reader
+    cache.invalidate()
+    assert cache.current()["snapshot"]["version"] == 2
+
+def test_new_position_shows_up_on_the_next_poll(client):
+    client.post("/positions")
+    placed = client.post("/place_order", json={"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.3}).json()
+    assert placed["success"], placed
+    positions = client.post("/positions").json()["positions"]
+    assert placed["trade_info"]["ticket"] in {position["ticket"] for position in positions}
@@ -0,0 +1,58 @@
+"""Auto trading instances: orders go through the same checks and retries as /place_order"""
+
+import threading
+import time
+
+import pytest
+
+from mt5_strategies import BarStrategy
+
+SETTINGS = {"symbol": "EURUSD", "trading_strategy": "scalping", "lot_size": 0.1, "max_trades": 5,
+            "stop_loss_pips": 50, "take_profit_pips": 100, "magic_number": 4242}
+
+class AlwaysBuy:
+    def on_tick(self, tick):
+        return "BUY"
+
+@pytest.fixture
+def instances(bridge, client, monkeypatch):
+    monkeypatch.setattr(bridge.risk_engine, "limits", dict(bridge.risk_engine.limits, max_positions=1))
+    bridge.exposure_book.reconcile([], None)
+
+    def make(instance_id):
+        instance = bridge.StrategyInstance(instance_id, dict(SETTINGS))
+        instance.strategy = AlwaysBuy()
+        return instance
+    return make
+
+def test_bar_strategies_must_implement_on_bar():
+    class NoBars(BarStrategy):
+        pass
+    with pytest.raises(TypeError):
+        NoBars({})
+
+def test_instances_cannot_both_pass_a_limit(bridge, instances):
+    # Both decide while the terminal is busy; only the first order may use the last free position
+    first, second = instances("a"), instances("b")
+    tick = bridge.mt5_executor.call(bridge.mt5.symbol_info_tick, "EURUSD")
+    bridge.symbol_cache.require("EURUSD")
+    release = threading.Event()
+    bridge.mt5_executor.submit(release.wait, 5, lane="close")
+    threads = [threading.Thread(target=instance._on_tick, args=(tick, 0.0)) for instance in (first, second)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert first.trades + second.trades == 1
+    rejected = first if second.trades else second
+    assert rejected.last_error.startswith("Risk check failed")
+
+def test_failed_send_sets_last_error(bridge, instances, monkeypatch):
+    instance = instances("c")
+    monkeypatch.setattr(bridge.mt5.backend, "order_send", lambda request: None)
+    tick = bridge.mt5_executor.call(bridge.mt5.symbol_info_tick, "EURUSD")
+    instance._on_tick(tick, 0.0)
+    assert instance.trades == 0
+    assert instance.last_error.startswith("Order failed")
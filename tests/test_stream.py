@@ -0,0 +1,71 @@
+"""/ws streaming: deltas, and merging for clients that fall behind"""
+
+import asyncio
+
+from mt5_bridge import StreamSubscriber, _merge_account_deltas, _merge_position_deltas
+
+def _positions(added=(), changed=(), closed=()):
+    return {"topic": "positions", "added": list(added), "changed": list(changed), "closed": list(closed)}
+
+def test_position_opened_and_closed_before_delivery_is_never_sent():
+    merged = _merge_position_deltas(_positions(added=[{"ticket": 1, "profit": 0.0}]), _positions(closed=[1]))
+    assert merged == _positions()
+
+def test_changes_fold_into_an_undelivered_add():
+    merged = _merge_position_deltas(_positions(added=[{"ticket": 1, "sl": 0.0, "profit": 0.0}]),
+                                    _positions(changed=[{"ticket": 1, "sl": 1.08}]))
+    assert merged == _positions(added=[{"ticket": 1, "sl": 1.08, "profit": 0.0}])
+
+def test_later_changes_win_and_closes_drop_pending_changes():
+    old = _positions(changed=[{"ticket": 1, "profit": 1.0}, {"ticket": 2, "profit": 5.0}])
+    new = _positions(changed=[{"ticket": 1, "profit": 2.0, "sl": 1.1}], closed=[2])
+    assert _merge_position_deltas(old, new) == _positions(changed=[{"ticket": 1, "profit": 2.0, "sl": 1.1}], closed=[2])
+
+def test_account_deltas_keep_the_newest_value_per_field():
+    merged = _merge_account_deltas({"topic": "account", "changed": {"equity": 1.0, "margin": 2.0}},
+                                   {"topic": "account", "changed": {"equity": 3.0}})
+    assert merged["changed"] == {"equity": 3.0, "margin": 2.0}
+
+def test_slow_client_gets_one_message_per_slot():
+    class Socket:
+        def __init__(self):
+            self.sent = []
+
+        async def send_json(self, message):
+            self.sent.append(message)
+
+    async def main():
+        socket = Socket()
+        subscriber = StreamSubscriber(socket)
+        for bid in (1.0, 1.1, 1.2):
+            subscriber.push(("tick", "EURUSD"), {"topic": "tick", "symbol": "EURUSD", "bid": bid})
+        subscriber.push(("positions",), _positions(added=[{"ticket": 7}]), _merge_position_deltas)
+        subscriber.push(("positions",), _positions(closed=[3]), _merge_position_deltas)
+        sender = asyncio.create_task(subscriber.send_loop())
+        await asyncio.sleep(0.05)
+        sender.cancel()
+        return subscriber, socket.sent
+
+    subscriber, sent = asyncio.run(main())
+    assert subscriber.dropped == 3
+    assert sent == [{"topic": "tick", "symbol": "EURUSD", "bid": 1.2}, _positions(added=[{"ticket": 7}], closed=[3])]
+
+def test_ws_streams_ticks_and_new_positions(client):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"action": "subscribe", "topics": ["ticks", "positions"], "symbols": ["EURUSD"]})
+        first = ws.receive_json()
+        assert first["topic"] == "positions" and first["changed"] == []
+        placed = client.post("/place_order", json={"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1}).json()
+        assert placed["success"], placed
+        ticket = placed["trade_info"]["ticket"]
+        for _ in range(50):
+            message = ws.receive_json()
+            if message["topic"] == "positions" and ticket in {pos["ticket"] for pos in message["added"]}:
+                break
+        else:
+            raise AssertionError(f"position {ticket} never streamed")
+
+def test_ws_rejects_unknown_topics(client):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_json({"action": "subscribe", "topics": ["news"]})
+        assert ws.receive_json() == {"topic": "error", "error": "Unknown topics: ['news']"}
@@ -0,0 +1,54 @@
+"""Symbol metadata: pip sizing, local volume/stop validation and the cache"""
+
+import pytest
+
+@pytest.fixture
+def spec(bridge, client):
+    return lambda symbol: bridge.SymbolSpec(bridge.mt5.symbol_info(symbol))
+
+def test_pip_follows_the_quote_digits(spec):
+    assert spec("EURUSD").pip == pytest.approx(0.0001)
+    assert spec("USDJPY").pip == pytest.approx(0.01)
+    # Two-digit gold has no fractional pip
+    assert spec("XAUUSD").pip == pytest.approx(0.01)
+
+def test_volume_is_rounded_to_the_step(spec):
+    eurusd = spec("EURUSD")
+    assert eurusd.normalize_volume(0.123) == 0.12
+    assert eurusd.normalize_volume(0.3000000001) == 0.3
+    with pytest.raises(ValueError, match="below the minimum"):
+        eurusd.normalize_volume(0.004)
+    with pytest.raises(ValueError, match="above the maximum"):
+        eurusd.normalize_volume(150)
+
+def test_stops_must_be_outside_the_stop_level(spec):
+    eurusd = spec("EURUSD")
+    eurusd.check_stops(True, 1.08500, 1.08400, 1.08600)
+    with pytest.raises(ValueError, match="wrong side"):
+        eurusd.check_stops(True, 1.08500, 1.08600, None)
+    with pytest.raises(ValueError, match="wrong side"):
+        eurusd.check_stops(False, 1.08500, None, 1.08600)
+    # The simulator's stop level is 10 points
+    with pytest.raises(ValueError, match="closer than 10 points"):
+        eurusd.check_stops(False, 1.08500, 1.08505, None)
+
+@pytest.mark.parametrize("order, error", [
+    ({"volume": 0.001}, "below the minimum"),
+    ({"volume": 0.1, "price": 1.085, "stop_loss": 1.09}, "wrong side"),
+    ({"volume": 0.1, "symbol": "NOSUCH", "price": 1.0}, "Unknown symbol"),
+])
+def test_bad_orders_never_reach_the_terminal(bridge, client, order, error):
+    sent = bridge.mt5.backend.calls.get("order_send", 0)
+    placed = client.post("/place_order", json={"symbol": "EURUSD", "trade_type": "BUY", **order}).json()
+    assert not placed["success"] and error in placed["error"]
+    assert bridge.mt5.backend.calls.get("order_send", 0) == sent
+
+def test_symbol_info_is_read_once_per_ttl(bridge, client, monkeypatch):
+    cache = bridge.SymbolCache(bridge.mt5_executor, ttl=60)
+    reads = bridge.mt5.backend.calls.get("symbol_info", 0)
+    assert cache.require("EURUSD") is cache.require("EURUSD")
+    assert bridge.mt5.backend.calls["symbol_info"] - reads == 1
+    clock = bridge.time.monotonic() + 61
+    monkeypatch.setattr(bridge.time, "monotonic", lambda: clock)
+    cache.require("EURUSD")
+    assert bridge.mt5.backend.calls["symbol_info"] - reads == 2
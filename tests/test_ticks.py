@@ -0,0 +1,80 @@
+"""Tick ring: readers get every published tick once, and never a torn or overwritten one"""
+
+import os
+
+import numpy as np
+import pytest
+
+from mt5_ticks import TickRingReader, TickRingWriter
+
+SLOTS = 8
+
+@pytest.fixture
+def feed():
+    writer = TickRingWriter(f"mt5_ticks_test_{os.getpid()}", max_symbols=4, slots=SLOTS)
+    reader = TickRingReader(writer.name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+def publish(writer, symbol, first, count):
+    for n in range(first, first + count):
+        writer.publish(symbol, 1000 + n, 1.0 + n / 1e5, 1.0002 + n / 1e5)
+
+def test_reads_new_ticks_in_order(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, 5)
+    ticks, cursor, lost = reader.read("EURUSD", 0)
+    assert (cursor, lost) == (5, 0)
+    assert list(ticks["seq"]) == [1, 2, 3, 4, 5]
+    assert list(ticks["time_msc"]) == [1000, 1001, 1002, 1003, 1004]
+    publish(writer, "EURUSD", 5, 2)
+    ticks, cursor, lost = reader.read("EURUSD", cursor)
+    assert (list(ticks["time_msc"]), cursor, lost) == ([1005, 1006], 7, 0)
+    ticks, cursor, lost = reader.read("EURUSD", cursor)
+    assert (len(ticks), cursor, lost) == (0, 7, 0)
+    assert int(reader.latest("EURUSD")["time_msc"]) == 1006
+
+def test_symbols_have_their_own_rings(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, 3)
+    publish(writer, "GBPUSD", 100, 1)
+    assert reader.symbols() == ["EURUSD", "GBPUSD"]
+    assert reader.head("EURUSD") == 3
+    ticks, _, _ = reader.read("GBPUSD", 0)
+    assert list(ticks["time_msc"]) == [1100]
+
+def test_overwritten_ticks_are_reported_lost(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, SLOTS + 5)
+    ticks, cursor, lost = reader.read("EURUSD", 0)
+    assert (cursor, lost) == (SLOTS + 5, 5)
+    # Across the wrap, oldest first
+    assert list(ticks["seq"]) == list(range(6, SLOTS + 6))
+    assert list(ticks["time_msc"]) == [1000 + n for n in range(5, SLOTS + 5)]
+
+def test_record_being_written_is_not_returned(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, 4)
+    # The writer zeroes seq before it touches the fields: catch it mid-write on slot 2
+    writer._segment.seqs[0, 2] = 0
+    writer._segment.rings["bid"][0, 2] = -1.0
+    ticks, cursor, lost = reader.read("EURUSD", 0)
+    assert (cursor, lost) == (4, 1)
+    assert list(ticks["seq"]) == [1, 2, 4]
+    assert (ticks["bid"] > 0).all()
+
+def test_record_overwritten_by_a_later_lap_is_not_returned(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, 4)
+    # Slot 1 already holds tick SLOTS + 1 from the next lap, while the head is still being read as 4
+    writer._segment.seqs[0, 1] = SLOTS + 2
+    ticks, cursor, lost = reader.read("EURUSD", 0)
+    assert (cursor, lost) == (4, 1)
+    assert list(ticks["seq"]) == [1, 3, 4]
+
+def test_reader_rows_are_read_only(feed):
+    writer, reader = feed
+    publish(writer, "EURUSD", 0, 1)
+    with pytest.raises(ValueError):
+        reader.ring("EURUSD")["bid"][0] = np.float64(0)
@@ -0,0 +1,74 @@
+"""Server-side trailing stops"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+def _table(bridge, *rows):
+    table = bridge.TrailTable(SimpleNamespace(digits=5, point=0.00001))
+    for ticket, is_buy, sl, activation in rows:
+        table.upsert({"ticket": ticket, "is_buy": is_buy, "price_open": 1.08500, "sl": sl, "tp": 0.0,
+                      "distance": 0.00100, "step": 0.00020, "activation": activation})
+    return table
+
+def _moved(table, bid, ask=None):
+    indices, stops = table.moves(bid, bid + 0.00010 if ask is None else ask)
+    return {int(table.columns["ticket"][i]): round(float(stops[i]), 5) for i in indices}
+
+def test_stop_follows_the_price_in_steps(bridge):
+    table = _table(bridge, (1, True, 0.0, 0.0))
+    assert _moved(table, 1.08500) == {1: 1.08400}
+    table.update(1, sl=1.08400)
+    # Less than a step of progress leaves the stop where it is
+    assert _moved(table, 1.08510) == {}
+    assert _moved(table, 1.08520) == {1: 1.08420}
+    # A stop never moves back
+    assert _moved(table, 1.08300) == {}
+
+def test_sell_stop_trails_the_ask(bridge):
+    table = _table(bridge, (2, False, 1.08600, 0.0))
+    assert _moved(table, 1.08470, ask=1.08480) == {2: 1.08580}
+    assert _moved(table, 1.08500, ask=1.08510) == {}
+
+def test_trailing_waits_for_the_activation_profit(bridge):
+    table = _table(bridge, (3, True, 0.0, 0.00100))
+    assert _moved(table, 1.08590) == {}
+    assert _moved(table, 1.08600) == {3: 1.08500}
+
+def _trailed(bridge):
+    return {row["ticket"] for rows in bridge.trailing_stops.status().values() for row in rows}
+
+def _trail(client, **request):
+    placed = client.post("/place_order", json={"symbol": "EURUSD", "trade_type": "BUY", "volume": 0.1}).json()
+    assert placed["success"], placed
+    ticket = placed["trade_info"]["ticket"]
+    return ticket, client.post("/trailing_stop", json={"ticket": ticket, **request}).json()
+
+def test_trailing_stop_moves_the_position_stop(bridge, client):
+    ticket, trailing = _trail(client, distance_pips=5)
+    assert trailing["success"], trailing
+    assert trailing["trailing_stop"]["distance"] == pytest.approx(0.0005)
+    deadline = time.monotonic() + 5
+    sl = 0.0
+    while not sl and time.monotonic() < deadline:
+        time.sleep(0.1)
+        positions = {pos["ticket"]: pos for pos in client.post("/positions").json()["positions"]}
+        sl = positions[ticket]["sl"]
+    assert sl > 0
+    assert client.post("/cancel_trailing_stop", json={"ticket": ticket}).json() == {"success": True, "ticket": ticket}
+    assert ticket not in _trailed(bridge)
+
+def test_trailing_inside_the_stop_level_is_refused(client):
+    _, trailing = _trail(client, distance_pips=0.05)
+    assert trailing == {"success": False, "error": "Trailing distance must be at least 10 points"}
+
+def test_closed_position_stops_trailing(bridge, client):
+    ticket, trailing = _trail(client, distance_pips=50, activation_pips=1000)
+    assert trailing["success"], trailing
+    assert client.post("/close_order", json={"ticket": ticket}).json()["success"]
+    deadline = time.monotonic() + 5
+    while ticket in _trailed(bridge) and time.monotonic() < deadline:
+        client.post("/positions")
+        time.sleep(0.1)
+    assert ticket not in _trailed(bridge)